@@ -9,6 +9,7 @@ from .base_provider import (
     ProviderStatus,
     ToolCall,
     ToolResult,
+    collect_stream,
 )
 from .provider_manager import AIProviderManager
 
@@ -22,4 +23,5 @@ __all__ = [
     "ToolCall",
     "ToolResult",
     "AIProviderManager",
+    "collect_stream",
 ]
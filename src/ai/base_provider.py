@@ -11,6 +11,27 @@ from enum import Enum
 from pathlib import Path
 from typing import Any, AsyncIterator, Dict, List, Optional
 
+# Average characters per token for English text and source code
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the token count of a text.
+
+    Uses the common ~4 characters per token rule of thumb. Unlike splitting
+    into words this is constant time, allocates nothing and does not
+    undercount code where punctuation and indentation produce many tokens.
+
+    Args:
+        text: Text to estimate
+
+    Returns:
+        Estimated number of tokens
+    """
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
 
 class ProviderStatus(Enum):
     """Status of an AI provider."""
@@ -22,7 +43,7 @@ class ProviderStatus(Enum):
     OFFLINE = "offline"
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolCall:
     """Represents a tool/function call made by the AI."""
 
@@ -31,7 +52,7 @@ class ToolCall:
     id: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolResult:
     """Result from a tool execution."""
 
@@ -41,7 +62,7 @@ class ToolResult:
     execution_time_ms: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class AIMessage:
     """Universal message format across all providers."""
 
@@ -53,7 +74,7 @@ class AIMessage:
     timestamp: datetime = field(default_factory=datetime.utcnow)
 
 
-@dataclass
+@dataclass(slots=True)
 class AIStreamUpdate:
     """Real-time update during streaming response."""
 
@@ -64,7 +85,28 @@ class AIStreamUpdate:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+async def collect_stream(updates: AsyncIterator[AIStreamUpdate]) -> str:
+    """Concatenate the content of a streamed response.
+
+    Deltas are joined once at the end, which stays linear in the response
+    length. Prefer this over building the text with ``+=`` per update. The
+    stream is consumed to its end so the provider's own cleanup after the
+    final update still runs.
+
+    Args:
+        updates: Stream updates, e.g. from ``stream_message``
+
+    Returns:
+        Full response text
+    """
+    parts = []
+    async for update in updates:
+        if update.content_delta:
+            parts.append(update.content_delta)
+    return "".join(parts)
+
+
+@dataclass(slots=True)
 class AIResponse:
     """Universal response format from AI providers."""
 
@@ -182,6 +224,27 @@ class BaseAIProvider(ABC):
         """
         pass
 
+    async def send_batch(self, requests: List[Dict[str, Any]]) -> List[Any]:
+        """Send several messages in one provider round-trip.
+
+        Providers with a native batch endpoint should override this. The
+        default implementation sends the requests in turn, because a
+        provider rejects new requests while it is busy.
+
+        Args:
+            requests: Keyword arguments for each ``send_message`` call
+
+        Returns:
+            AIResponse or raised exception for each request, in order
+        """
+        results: List[Any] = []
+        for request in requests:
+            try:
+                results.append(await self.send_message(**request))
+            except Exception as e:
+                results.append(e)
+        return results
+
     @abstractmethod
     async def get_capabilities(self) -> ProviderCapabilities:
         """Get provider capabilities and limits.
@@ -200,6 +263,19 @@ class BaseAIProvider(ABC):
         """
         pass
 
+    def use_http_session(self, http_session: Any) -> None:
+        """Attach a shared HTTP client session owned by the provider manager.
+
+        HTTP-based providers override this to reuse the manager's pooled
+        connections instead of opening their own. The provider must not
+        close a session it was given.
+
+        Args:
+            http_session: Shared ``aiohttp.ClientSession``
+        """
+        # Default implementation - providers without HTTP transport ignore it
+        pass
+
     async def create_session(
         self,
         working_directory: Path,
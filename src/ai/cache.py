@@ -0,0 +1,529 @@
+"""Response caches for deterministic AI requests.
+
+Identical requests sent with a temperature of zero produce the same answer,
+so providers can serve repeats from ``LLMCache`` instead of paying for another
+API round trip. Storage is pluggable through ``CacheBackend``; the default
+``MemoryBackend`` is an in-process LRU with per-entry expiry.
+
+``SemanticCache`` additionally matches paraphrased prompts by embedding
+similarity. It is opt-in and needs an embedding function, by default a local
+``sentence-transformers`` model when that package is installed.
+
+Providers use both through ``ResponseCaches``, which runs the lookup and
+store sequence shared by every provider.
+"""
+
+import asyncio
+import functools
+import hashlib
+import json
+import math
+import operator
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import structlog
+
+from .base_provider import AIResponse, ToolCall, ToolResult
+
+logger = structlog.get_logger()
+
+DEFAULT_CACHE_SIZE = 256
+DEFAULT_CACHE_TTL_SECONDS = 3600
+DEFAULT_SIMILARITY_THRESHOLD = 0.92
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Async function mapping a text to its embedding vector
+Embedder = Callable[[str], Awaitable[List[float]]]
+
+
+class CacheBackend(ABC):
+    """Storage for serialized responses."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a stored value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Stored value, or None if missing or expired
+        """
+
+    @abstractmethod
+    async def set(self, key: str, value: Dict[str, Any], ttl: float) -> None:
+        """Store a value.
+
+        Args:
+            key: Cache key
+            value: JSON-compatible value
+            ttl: Seconds until the value expires
+        """
+
+    async def clear(self) -> None:
+        """Remove all stored values."""
+
+
+class MemoryBackend(CacheBackend):
+    """In-process LRU backend with per-entry expiry."""
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        """Initialize the backend.
+
+        Args:
+            maxsize: Maximum number of entries kept
+        """
+        self._maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a stored value, refreshing its LRU position."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: float) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    async def clear(self) -> None:
+        """Remove all stored values."""
+        self._entries.clear()
+
+
+class LLMCache:
+    """Exact-match cache of AI responses keyed by request parameters."""
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        ttl: float = DEFAULT_CACHE_TTL_SECONDS,
+    ):
+        """Initialize the cache.
+
+        Args:
+            backend: Storage backend (defaults to an in-memory LRU)
+            ttl: Seconds a cached response stays valid
+        """
+        self.backend = backend or MemoryBackend()
+        self.ttl = ttl
+
+    @classmethod
+    def from_config(cls, config: Any) -> Optional["LLMCache"]:
+        """Create a cache from application settings.
+
+        Args:
+            config: Application settings
+
+        Returns:
+            Configured cache, or None if caching is disabled
+        """
+        size = getattr(config, "ai_response_cache_size", DEFAULT_CACHE_SIZE)
+        if size <= 0:
+            return None
+        ttl = getattr(
+            config, "ai_response_cache_ttl_seconds", DEFAULT_CACHE_TTL_SECONDS
+        )
+        return cls(MemoryBackend(size), ttl)
+
+    @staticmethod
+    def is_cacheable(temperature: Optional[float]) -> bool:
+        """Check whether a request is deterministic enough to cache.
+
+        Args:
+            temperature: Sampling temperature of the request
+
+        Returns:
+            True if the temperature is explicitly zero (or below)
+        """
+        return temperature is not None and temperature <= 0
+
+    @staticmethod
+    def make_key(**request: Any) -> str:
+        """Build a cache key from request parameters.
+
+        Args:
+            **request: Model, messages and sampling parameters
+
+        Returns:
+            Hex digest identifying the request
+        """
+        encoded = json.dumps(request, sort_keys=True, default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    async def get_response(
+        self, key: str, session_id: Optional[str] = None
+    ) -> Optional[AIResponse]:
+        """Get a cached response.
+
+        Args:
+            key: Cache key from ``make_key``
+            session_id: Session ID to stamp on the returned response
+
+        Returns:
+            Cached response marked with ``metadata["cache_hit"]``, or None
+        """
+        data = await self.backend.get(key)
+        if data is None:
+            return None
+
+        response = _response_from_dict(data)
+        response.metadata["cache_hit"] = True
+        # Nothing was spent serving this response
+        response.cost = 0.0
+        if session_id:
+            response.session_id = session_id
+        return response
+
+    async def set_response(self, key: str, response: AIResponse) -> None:
+        """Cache a response.
+
+        Args:
+            key: Cache key from ``make_key``
+            response: Response to store
+        """
+        await self.backend.set(key, _response_to_dict(response), self.ttl)
+
+
+class SemanticCache:
+    """Cache of AI responses matched by prompt embedding similarity.
+
+    Entries are compared by cosine similarity within a scope (typically the
+    model name), so paraphrases of an earlier prompt reuse its answer.
+    """
+
+    def __init__(
+        self,
+        embed: Embedder,
+        threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+        maxsize: int = DEFAULT_CACHE_SIZE,
+        ttl: float = DEFAULT_CACHE_TTL_SECONDS,
+    ):
+        """Initialize the cache.
+
+        Args:
+            embed: Async function returning the embedding of a text
+            threshold: Minimum cosine similarity for a hit
+            maxsize: Maximum number of entries kept
+            ttl: Seconds a cached response stays valid
+        """
+        self._embed = embed
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # (scope, unit vector, expiry, serialized response), oldest first
+        self._entries: List[Tuple[str, List[float], float, Dict[str, Any]]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @classmethod
+    def from_config(cls, config: Any) -> Optional["SemanticCache"]:
+        """Create a semantic cache from application settings.
+
+        Args:
+            config: Application settings
+
+        Returns:
+            Configured cache, or None if disabled or no embedder is available
+        """
+        if not getattr(config, "ai_semantic_cache_enabled", False):
+            return None
+
+        embed = _sentence_transformer_embedder(
+            getattr(config, "ai_semantic_cache_model", DEFAULT_EMBEDDING_MODEL)
+        )
+        if embed is None:
+            return None
+
+        return cls(
+            embed,
+            threshold=getattr(
+                config, "ai_semantic_cache_threshold", DEFAULT_SIMILARITY_THRESHOLD
+            ),
+            maxsize=getattr(config, "ai_response_cache_size", DEFAULT_CACHE_SIZE),
+            ttl=getattr(
+                config, "ai_response_cache_ttl_seconds", DEFAULT_CACHE_TTL_SECONDS
+            ),
+        )
+
+    async def embed(self, text: str) -> List[float]:
+        """Embed a prompt as a unit vector.
+
+        Args:
+            text: Prompt text to embed
+
+        Returns:
+            Normalized embedding, reusable by ``get_response`` and
+            ``set_response`` for the same prompt
+        """
+        return _normalize(await self._embed(text))
+
+    async def get_response(
+        self,
+        scope: str,
+        text: str,
+        session_id: Optional[str] = None,
+        vector: Optional[List[float]] = None,
+    ) -> Optional[AIResponse]:
+        """Get the cached response of the most similar earlier prompt.
+
+        Args:
+            scope: Namespace entries are matched within (e.g. model name)
+            text: Prompt text to match
+            session_id: Session ID to stamp on the returned response
+            vector: Embedding of ``text`` from ``embed``, if already known
+
+        Returns:
+            Cached response marked with ``metadata["cache_hit"]``, or None
+        """
+        if not self._entries:
+            return None
+
+        if vector is None:
+            vector = await self.embed(text)
+        now = time.monotonic()
+        self._entries = [entry for entry in self._entries if entry[2] > now]
+
+        best_score = self.threshold
+        best: Optional[Dict[str, Any]] = None
+        for entry_scope, entry_vector, _, data in self._entries:
+            if entry_scope != scope:
+                continue
+            score = sum(map(operator.mul, vector, entry_vector))
+            if score >= best_score:
+                best_score, best = score, data
+
+        if best is None:
+            return None
+
+        response = _response_from_dict(best)
+        response.metadata["cache_hit"] = True
+        response.metadata["similarity"] = round(best_score, 4)
+        response.cost = 0.0
+        if session_id:
+            response.session_id = session_id
+        return response
+
+    async def set_response(
+        self,
+        scope: str,
+        text: str,
+        response: AIResponse,
+        vector: Optional[List[float]] = None,
+    ) -> None:
+        """Cache a response under the embedding of its prompt.
+
+        Args:
+            scope: Namespace entries are matched within (e.g. model name)
+            text: Prompt text the response answers
+            response: Response to store
+            vector: Embedding of ``text`` from ``embed``, if already known
+        """
+        if vector is None:
+            vector = await self.embed(text)
+        self._entries.append(
+            (
+                scope,
+                vector,
+                time.monotonic() + self.ttl,
+                _response_to_dict(response),
+            )
+        )
+        if len(self._entries) > self.maxsize:
+            del self._entries[: len(self._entries) - self.maxsize]
+
+
+@dataclass
+class CacheKeys:
+    """Keys of one request in the exact and semantic caches."""
+
+    # Exact-match key, set for every deterministic request
+    request: Optional[str] = None
+    # Semantic scope, set when the semantic cache is enabled
+    semantic_scope: Optional[str] = None
+    # Prompt embedding from the semantic lookup, reused when storing
+    prompt_vector: Optional[List[float]] = None
+
+
+class ResponseCaches:
+    """Exact-match and semantic caches consulted together by a provider."""
+
+    def __init__(
+        self,
+        exact: Optional[LLMCache] = None,
+        semantic: Optional[SemanticCache] = None,
+    ):
+        """Initialize the caches.
+
+        Args:
+            exact: Exact-match cache, or None if disabled
+            semantic: Semantic cache, or None if disabled
+        """
+        self.exact = exact
+        self.semantic = semantic
+
+    @classmethod
+    def from_config(cls, config: Any) -> "ResponseCaches":
+        """Create the caches from application settings.
+
+        Args:
+            config: Application settings
+
+        Returns:
+            Caches, each disabled when its settings turn it off
+        """
+        return cls(LLMCache.from_config(config), SemanticCache.from_config(config))
+
+    def make_keys(
+        self,
+        temperature: Optional[float],
+        request: Dict[str, Any],
+        scope: Dict[str, Any],
+    ) -> CacheKeys:
+        """Build the cache keys of a request.
+
+        Args:
+            temperature: Sampling temperature of the request
+            request: Parameters that fully determine the answer
+            scope: Parameters paraphrased prompts must share, i.e. the
+                request without the user prompt
+
+        Returns:
+            Keys to pass to ``get`` and then ``set``; both None if the
+            request is not deterministic
+        """
+        if not LLMCache.is_cacheable(temperature):
+            return CacheKeys()
+        return CacheKeys(
+            LLMCache.make_key(**request),
+            LLMCache.make_key(**scope) if self.semantic is not None else None,
+        )
+
+    async def get(
+        self, keys: CacheKeys, prompt: str, session_id: Optional[str] = None
+    ) -> Optional[AIResponse]:
+        """Look a request up in the exact cache, then the semantic cache.
+
+        Args:
+            keys: Keys from ``make_keys``
+            prompt: User prompt, matched by the semantic cache
+            session_id: Session ID to stamp on the returned response
+
+        Returns:
+            Cached response, or None on a miss
+        """
+        if keys.request and self.exact is not None:
+            cached = await self.exact.get_response(keys.request, session_id)
+            if cached is not None:
+                return cached
+        if keys.semantic_scope:
+            # Embedded once here; ``set`` stores a miss under the same vector
+            keys.prompt_vector = await self.semantic.embed(prompt)
+            return await self.semantic.get_response(
+                keys.semantic_scope, prompt, session_id, keys.prompt_vector
+            )
+        return None
+
+    async def set(self, keys: CacheKeys, prompt: str, response: AIResponse) -> None:
+        """Store a response in every enabled cache.
+
+        Args:
+            keys: Keys from ``make_keys``
+            prompt: User prompt the response answers
+            response: Response to store
+        """
+        if keys.request and self.exact is not None:
+            await self.exact.set_response(keys.request, response)
+        if keys.semantic_scope:
+            await self.semantic.set_response(
+                keys.semantic_scope, prompt, response, keys.prompt_vector
+            )
+
+
+def _normalize(vector: List[float]) -> List[float]:
+    """Scale a vector to unit length so dot products are cosines."""
+    norm = math.sqrt(sum(x * x for x in vector))
+    if not norm:
+        return list(vector)
+    return [x / norm for x in vector]
+
+
+@functools.lru_cache(maxsize=None)
+def _sentence_transformer_embedder(model_name: str) -> Optional[Embedder]:
+    """Build an embedder backed by a local sentence-transformers model.
+
+    One embedder is shared per model name, so every provider's cache uses
+    the same loaded model. The model is loaded once on first use and
+    encoding runs in the default executor so it does not block the event
+    loop.
+
+    Args:
+        model_name: sentence-transformers model to load
+
+    Returns:
+        Embedding function, or None if sentence-transformers is not installed
+    """
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        logger.warning(
+            "sentence-transformers package not installed, semantic cache "
+            "disabled. Install with: pip install sentence-transformers"
+        )
+        return None
+
+    model: Optional[Any] = None
+    # Concurrent first calls run in separate executor threads
+    load_lock = threading.Lock()
+
+    def encode(text: str) -> List[float]:
+        nonlocal model
+        with load_lock:
+            if model is None:
+                model = SentenceTransformer(model_name)
+        return model.encode(text).tolist()
+
+    async def embed(text: str) -> List[float]:
+        return await asyncio.get_running_loop().run_in_executor(None, encode, text)
+
+    return embed
+
+
+def _response_to_dict(response: AIResponse) -> Dict[str, Any]:
+    """Convert a response to a JSON-compatible dict."""
+    data = asdict(response)
+    data["timestamp"] = response.timestamp.isoformat()
+    return data
+
+
+def _response_from_dict(data: Dict[str, Any]) -> AIResponse:
+    """Rebuild a response from ``_response_to_dict`` output."""
+    data = dict(data)
+    data["metadata"] = dict(data["metadata"])
+    data["timestamp"] = datetime.fromisoformat(data["timestamp"])
+    if data["tool_calls"] is not None:
+        data["tool_calls"] = [ToolCall(**call) for call in data["tool_calls"]]
+    if data["tool_results"] is not None:
+        data["tool_results"] = [ToolResult(**result) for result in data["tool_results"]]
+    return AIResponse(**data)
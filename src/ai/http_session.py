@@ -0,0 +1,31 @@
+"""Pooled HTTP client sessions for HTTP-based AI providers.
+
+The provider manager owns one session built here and hands it to every
+provider through ``BaseAIProvider.use_http_session``; providers used on
+their own build a private one the same way.
+"""
+
+import aiohttp
+
+# Connection pool tuning
+HTTP_POOL_LIMIT = 100
+HTTP_POOL_LIMIT_PER_HOST = 32
+HTTP_DNS_CACHE_TTL_SECONDS = 300
+# Keep idle connections open across gaps between chat messages
+# (aiohttp's default of 15s drops them mid-conversation)
+HTTP_KEEPALIVE_TIMEOUT_SECONDS = 120
+
+
+def create_http_session() -> aiohttp.ClientSession:
+    """Create a client session with a tuned connection pool.
+
+    Returns:
+        New client session; the caller is responsible for closing it
+    """
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_POOL_LIMIT,
+        limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL_SECONDS,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT_SECONDS,
+    )
+    return aiohttp.ClientSession(connector=connector)
@@ -4,9 +4,13 @@ This module manages multiple AI providers, handles routing, fallbacks,
 and provides a unified interface for the bot to use.
 """
 
+import asyncio
+import logging
+import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Type
+from typing import Any, Dict, List, Optional, Tuple, Type
 
+import aiohttp
 import structlog
 
 from ..config.settings import Settings
@@ -19,9 +23,14 @@ from .base_provider import (
     ProviderCapabilities,
     ProviderStatus,
 )
+from .http_session import create_http_session
 
 logger = structlog.get_logger()
 
+# stdlib logger backing the structlog logger, used for cheap level checks so
+# per-request events are not built when INFO is disabled
+_level_logger = logging.getLogger(__name__)
+
 
 class AIProviderManager:
     """Manages multiple AI providers and provides unified interface."""
@@ -35,8 +44,22 @@ class AIProviderManager:
         self.config = config
         self.providers: Dict[str, BaseAIProvider] = {}
         self.default_provider: Optional[str] = None
+        self.http_session: Optional[aiohttp.ClientSession] = None
         self._initialized = False
 
+        # Micro-batching of concurrent send_message calls per provider
+        self._batch_window = getattr(config, "ai_batch_window_ms", 0) / 1000
+        self._pending_batches: Dict[
+            str, List[Tuple[asyncio.Future[AIResponse], Dict[str, Any]]]
+        ] = {}
+        self._batch_tasks: Dict[str, asyncio.Task[None]] = {}
+
+        # Recent health check results: provider name -> (checked_at, healthy)
+        self._health_ttl = getattr(config, "ai_health_check_ttl_seconds", 2.0)
+        self._health_cache: Dict[str, Tuple[float, bool]] = {}
+        # Upper bound on one probe, so a hung provider cannot stall the others
+        self._health_timeout = getattr(config, "ai_health_check_timeout_seconds", 5.0)
+
     async def initialize(self) -> None:
         """Initialize all configured providers."""
         if self._initialized:
@@ -50,6 +73,8 @@ class AIProviderManager:
         # providers are registered.
         self.default_provider = getattr(self.config, "default_ai_provider", None)
 
+        self._get_http_session()
+
         self._initialized = True
         logger.info(
             "AI provider manager initialized",
@@ -57,6 +82,16 @@ class AIProviderManager:
             provider_count=len(self.providers),
         )
 
+    def _get_http_session(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session, creating it on first use.
+
+        Returns:
+            Pooled client session shared by all HTTP-based providers
+        """
+        if self.http_session is None or self.http_session.closed:
+            self.http_session = create_http_session()
+        return self.http_session
+
     async def register_provider(
         self,
         provider: BaseAIProvider,
@@ -68,22 +103,71 @@ class AIProviderManager:
             provider: AI provider instance
             set_as_default: Whether to set this as default provider
         """
+        if await self._initialize_provider(provider):
+            self._add_provider(provider, set_as_default)
+
+    async def register_providers(
+        self,
+        providers: List[BaseAIProvider],
+        default: Optional[str] = None,
+    ) -> None:
+        """Register several AI providers, initializing them concurrently.
+
+        Providers are added in the given order once all initializations have
+        finished, so startup takes as long as the slowest provider rather
+        than the sum of all of them.
+
+        Args:
+            providers: AI provider instances
+            default: Name of the provider to set as default, if any
+        """
+        results = await asyncio.gather(
+            *(self._initialize_provider(provider) for provider in providers)
+        )
+
+        for provider, success in zip(providers, results):
+            if success:
+                self._add_provider(provider, provider.name == default)
+
+    async def _initialize_provider(self, provider: BaseAIProvider) -> bool:
+        """Initialize a provider before it is registered.
+
+        Args:
+            provider: AI provider instance
+
+        Returns:
+            True if the provider initialized successfully
+        """
         provider_name = provider.name
 
         logger.info(f"Registering provider: {provider_name}")
 
+        # Share pooled HTTP connections with the provider
+        provider.use_http_session(self._get_http_session())
+
         # Initialize the provider
         try:
             success = await provider.initialize()
             if not success:
                 logger.error(f"Failed to initialize provider: {provider_name}")
-                return
+                return False
         except Exception as e:
             logger.error(
                 f"Error initializing provider: {provider_name}",
                 error=str(e),
             )
-            return
+            return False
+
+        return True
+
+    def _add_provider(self, provider: BaseAIProvider, set_as_default: bool) -> None:
+        """Add an initialized provider to the registry.
+
+        Args:
+            provider: Initialized AI provider instance
+            set_as_default: Whether to set this as default provider
+        """
+        provider_name = provider.name
 
         # Register the provider
         self.providers[provider_name] = provider
@@ -117,13 +201,15 @@ class AIProviderManager:
         if provider_name is None:
             raise ConfigurationError("No default provider configured")
 
-        if provider_name not in self.providers:
+        # Single lookup on the hot path; the error message is only built on miss
+        provider = self.providers.get(provider_name)
+        if provider is None:
             raise ConfigurationError(
                 f"Provider '{provider_name}' not found. "
                 f"Available: {list(self.providers.keys())}"
             )
 
-        return self.providers[provider_name]
+        return provider
 
     async def send_message(
         self,
@@ -149,29 +235,37 @@ class AIProviderManager:
             ConfigurationError: If provider not available
         """
         provider = self.get_provider(provider_name)
+        log_info = _level_logger.isEnabledFor(logging.INFO)
 
-        logger.info(
-            "Sending message to AI provider",
-            provider=provider.name,
-            prompt_length=len(prompt),
-            session_id=session_id,
-        )
-
-        try:
-            response = await provider.send_message(
-                prompt=prompt,
-                working_directory=working_directory,
-                session_id=session_id,
-                **kwargs,
-            )
-
+        if log_info:
             logger.info(
-                "Received AI response",
+                "Sending message to AI provider",
                 provider=provider.name,
-                tokens=response.tokens_used,
-                cost=response.cost,
+                prompt_length=len(prompt),
+                session_id=session_id,
             )
 
+        request = {
+            "prompt": prompt,
+            "working_directory": working_directory,
+            "session_id": session_id,
+            **kwargs,
+        }
+
+        try:
+            if self._batch_window > 0:
+                response = await self._enqueue_batched(provider, request)
+            else:
+                response = await provider.send_message(**request)
+
+            if log_info:
+                logger.info(
+                    "Received AI response",
+                    provider=provider.name,
+                    tokens=response.tokens_used,
+                    cost=response.cost,
+                )
+
             return response
 
         except Exception as e:
@@ -182,6 +276,205 @@ class AIProviderManager:
             )
             raise
 
+    async def send_message_hedged(
+        self,
+        prompt: str,
+        working_directory: Path,
+        provider_name: Optional[str] = None,
+        fallbacks: Optional[List[str]] = None,
+        fallback_after: float = 2.0,
+        session_id: Optional[str] = None,
+        **kwargs,
+    ) -> AIResponse:
+        """Send a message, racing fallback providers if the primary stalls.
+
+        The primary provider gets a head start of ``fallback_after`` seconds
+        (or until it fails). After that the fallbacks are started and the
+        first successful response wins; the remaining requests are cancelled.
+        Every started request is billed, so only one fallback is raced unless
+        the caller lists more.
+
+        Args:
+            prompt: User message
+            working_directory: Current working directory
+            provider_name: Primary provider (None = default)
+            fallbacks: Fallback provider names (None = the provider
+                registered after the primary)
+            fallback_after: Seconds to wait for the primary before hedging
+            session_id: Optional session ID, only passed to the primary
+            **kwargs: Additional provider-specific parameters
+
+        Returns:
+            First successful AI response, with the winning provider recorded
+            in ``metadata["hedged_provider"]``
+
+        Raises:
+            ConfigurationError: If a provider is not available
+            Exception: The last provider error if every provider failed
+        """
+        primary = self.get_provider(provider_name)
+        if fallbacks is None:
+            fallbacks = self._next_provider_names(primary.name)[:1]
+        fallback_providers = [self.get_provider(name) for name in fallbacks]
+
+        request = {"prompt": prompt, "working_directory": working_directory, **kwargs}
+        tasks: Dict[asyncio.Task[AIResponse], BaseAIProvider] = {
+            asyncio.create_task(
+                self._send_hedge(primary, {**request, "session_id": session_id})
+            ): primary
+        }
+
+        # Give the primary a head start before hedging
+        done, pending = await asyncio.wait(set(tasks), timeout=fallback_after)
+
+        started_fallbacks = False
+        last_error: Optional[BaseException] = None
+        try:
+            while True:
+                # Retrieve every finished error, even when another leg won
+                winner: Optional[asyncio.Task[AIResponse]] = None
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        winner = winner or task
+                        continue
+                    last_error = error
+                    logger.warning(
+                        "Hedged AI request failed",
+                        provider=tasks[task].name,
+                        error=str(error),
+                    )
+
+                if winner is not None:
+                    response = winner.result()
+                    response.metadata["hedged_provider"] = tasks[winner].name
+                    return response
+
+                # Start fallbacks once the primary is slow or has failed
+                if not started_fallbacks:
+                    started_fallbacks = True
+                    for provider in fallback_providers:
+                        task = asyncio.create_task(self._send_hedge(provider, request))
+                        tasks[task] = provider
+                        pending.add(task)
+
+                if not pending:
+                    break
+
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+        finally:
+            for task in pending:
+                task.cancel()
+            # Let the cancelled legs reset their provider status
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        if last_error is None:
+            raise ConfigurationError("No providers available for hedged request")
+        raise last_error
+
+    def _next_provider_names(self, provider_name: str) -> List[str]:
+        """List the other providers, starting after the given one.
+
+        Args:
+            provider_name: Provider to start after
+
+        Returns:
+            Provider names in registration order, wrapping around
+        """
+        names = list(self.providers)
+        index = names.index(provider_name)
+        return names[index + 1 :] + names[:index]
+
+    async def _send_hedge(
+        self, provider: BaseAIProvider, request: Dict[str, Any]
+    ) -> AIResponse:
+        """Send one leg of a hedged request.
+
+        Args:
+            provider: Provider to send to
+            request: Keyword arguments for ``send_message``
+
+        Returns:
+            AI response
+        """
+        try:
+            return await provider.send_message(**request)
+        except asyncio.CancelledError:
+            # Providers only reset their status on regular errors
+            if provider.status == ProviderStatus.BUSY:
+                provider.status = ProviderStatus.READY
+            raise
+
+    async def _enqueue_batched(
+        self, provider: BaseAIProvider, request: Dict[str, Any]
+    ) -> AIResponse:
+        """Queue a request to be sent with other concurrent requests.
+
+        Args:
+            provider: Provider that will handle the request
+            request: Keyword arguments for ``send_message``
+
+        Returns:
+            AI response for this request
+        """
+        future: asyncio.Future[AIResponse] = asyncio.get_running_loop().create_future()
+        self._pending_batches.setdefault(provider.name, []).append((future, request))
+
+        if provider.name not in self._batch_tasks:
+            self._batch_tasks[provider.name] = asyncio.create_task(
+                self._flush_batch(provider)
+            )
+
+        return await future
+
+    async def _flush_batch(self, provider: BaseAIProvider) -> None:
+        """Send all requests queued for a provider once the window closes.
+
+        Args:
+            provider: Provider whose queued requests should be sent
+        """
+        await asyncio.sleep(self._batch_window)
+
+        batch = self._pending_batches.pop(provider.name, [])
+        self._batch_tasks.pop(provider.name, None)
+
+        logger.debug(
+            "Flushing AI request batch",
+            provider=provider.name,
+            batch_size=len(batch),
+        )
+
+        try:
+            results = await provider.send_batch([request for _, request in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+
+        # Results are matched to requests by position, so a short or long
+        # list cannot be trusted; fail every caller instead of leaving some
+        # waiting on futures that would never resolve
+        if len(results) != len(batch):
+            logger.error(
+                "AI batch returned wrong number of results",
+                provider=provider.name,
+                batch_size=len(batch),
+                result_count=len(results),
+            )
+            error = RuntimeError(
+                f"Provider {provider.name} returned {len(results)} results "
+                f"for {len(batch)} batched requests"
+            )
+            results = [error] * len(batch)
+
+        for (future, _), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
     async def stream_message(
         self,
         prompt: str,
@@ -207,11 +500,12 @@ class AIProviderManager:
         """
         provider = self.get_provider(provider_name)
 
-        logger.info(
-            "Starting message stream",
-            provider=provider.name,
-            prompt_length=len(prompt),
-        )
+        if _level_logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Starting message stream",
+                provider=provider.name,
+                prompt_length=len(prompt),
+            )
 
         async for update in provider.stream_message(
             prompt=prompt,
@@ -239,6 +533,10 @@ class AIProviderManager:
     async def health_check(self, provider_name: Optional[str] = None) -> bool:
         """Check health of a provider.
 
+        Results are cached for a short TTL so frequent readiness polling
+        does not probe upstream services on every call. A check that does
+        not finish within the health check timeout counts as unhealthy.
+
         Args:
             provider_name: Provider name (None = default)
 
@@ -247,7 +545,25 @@ class AIProviderManager:
         """
         try:
             provider = self.get_provider(provider_name)
-            return await provider.health_check()
+
+            now = time.monotonic()
+            cached = self._health_cache.get(provider.name)
+            if cached is not None and now - cached[0] < self._health_ttl:
+                return cached[1]
+
+            try:
+                healthy = await asyncio.wait_for(
+                    provider.health_check(), self._health_timeout
+                )
+            except asyncio.TimeoutError:
+                logger.warning(
+                    "Health check timed out",
+                    provider=provider.name,
+                    timeout=self._health_timeout,
+                )
+                healthy = False
+            self._health_cache[provider.name] = (now, healthy)
+            return healthy
         except Exception as e:
             logger.error(
                 "Health check failed",
@@ -257,15 +573,17 @@ class AIProviderManager:
             return False
 
     async def health_check_all(self) -> Dict[str, bool]:
-        """Check health of all providers.
+        """Check health of all providers concurrently.
 
         Returns:
             Dictionary mapping provider names to health status
         """
-        results = {}
-        for provider_name in self.providers.keys():
-            results[provider_name] = await self.health_check(provider_name)
-        return results
+        provider_names = list(self.providers.keys())
+        results = await asyncio.gather(
+            *(self.health_check(name) for name in provider_names),
+            return_exceptions=True,
+        )
+        return {name: result is True for name, result in zip(provider_names, results)}
 
     def list_providers(self) -> List[str]:
         """List all registered provider names.
@@ -293,6 +611,15 @@ class AIProviderManager:
         """Shutdown all providers and cleanup resources."""
         logger.info("Shutting down AI provider manager")
 
+        for task in self._batch_tasks.values():
+            task.cancel()
+        for batch in self._pending_batches.values():
+            for future, _ in batch:
+                future.cancel()
+        self._batch_tasks.clear()
+        self._pending_batches.clear()
+        self._health_cache.clear()
+
         for provider_name, provider in self.providers.items():
             try:
                 logger.info(f"Shutting down provider: {provider_name}")
@@ -303,6 +630,10 @@ class AIProviderManager:
                     error=str(e),
                 )
 
+        if self.http_session:
+            await self.http_session.close()
+            self.http_session = None
+
         self.providers.clear()
         self.default_provider = None
         self._initialized = False
@@ -1,13 +1,33 @@
-"""AI provider implementations."""
+"""AI provider implementations.
 
-from .blackbox import BlackboxProvider
-from .claude import ClaudeProvider
-from .deepseek import DeepSeekProvider
-from .gemini import GeminiProvider
-from .groq import GroqProvider
-from .ollama import OllamaProvider
-from .openai import OpenAIProvider
-from .windsurf import WindsurfProvider
+Providers are imported lazily on first attribute access so that only the
+SDKs of providers that are actually used get loaded.
+"""
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .blackbox import BlackboxProvider
+    from .claude import ClaudeProvider
+    from .deepseek import DeepSeekProvider
+    from .gemini import GeminiProvider
+    from .groq import GroqProvider
+    from .ollama import OllamaProvider
+    from .openai import OpenAIProvider
+    from .windsurf import WindsurfProvider
+
+# Provider class name -> subpackage that defines it
+_PROVIDER_MODULES = {
+    "ClaudeProvider": ".claude",
+    "GeminiProvider": ".gemini",
+    "BlackboxProvider": ".blackbox",
+    "WindsurfProvider": ".windsurf",
+    "OpenAIProvider": ".openai",
+    "OllamaProvider": ".ollama",
+    "DeepSeekProvider": ".deepseek",
+    "GroqProvider": ".groq",
+}
 
 __all__ = [
     "ClaudeProvider",
@@ -19,3 +39,19 @@ __all__ = [
     "DeepSeekProvider",
     "GroqProvider",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    """Import provider classes on first access (PEP 562)."""
+    module_name = _PROVIDER_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    provider_class = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = provider_class
+    return provider_class
+
+
+def __dir__() -> list:
+    """List lazily importable provider classes."""
+    return sorted(list(globals().keys()) + __all__)
@@ -8,7 +8,7 @@ or use their web interface.
 """
 
 import asyncio
-import json
+import codecs
 from pathlib import Path
 from typing import AsyncIterator, Optional
 
@@ -16,6 +16,7 @@ import aiohttp
 import structlog
 
 from ....config.settings import Settings
+from ... import serialization
 from ...base_provider import (
     AIMessage,
     AIResponse,
@@ -23,10 +24,55 @@ from ...base_provider import (
     BaseAIProvider,
     ProviderCapabilities,
     ProviderStatus,
+    collect_stream,
+    estimate_tokens,
 )
+from ...http_session import create_http_session
 
 logger = structlog.get_logger()
 
+# Size of raw body chunks read from the streaming response
+STREAM_CHUNK_SIZE = 1024
+
+# Request fields that never change, serialized once at import time
+# Note: This is based on reverse-engineering Blackbox's web interface
+# May need updates if their API changes
+BLACKBOX_PAYLOAD_STATIC_FIELDS = serialization.dumps(
+    {
+        "previewToken": None,
+        "codeModelMode": True,  # Enable code-focused mode
+        "agentMode": {},
+        "trendingAgentMode": {},
+        "isMicMode": False,
+        "isChromeExt": False,
+        "githubToken": None,
+    }
+)
+
+
+def _encode_payload(content: str) -> bytes:
+    """Encode a chat request body, splicing the prompt into the template.
+
+    Args:
+        content: Full user prompt
+
+    Returns:
+        JSON request body
+    """
+    return (
+        b'{"messages":[{"role":"user","content":'
+        + serialization.dumps(content)
+        + b"}],"
+        + BLACKBOX_PAYLOAD_STATIC_FIELDS[1:]
+    )
+
+
+# Static instructions placed between the working directory and user prompt
+BLACKBOX_PROMPT_PREAMBLE = (
+    "\n\nYou are a code generation AI assistant. "
+    "Provide concise, working code solutions.\n\n\n"
+)
+
 
 class BlackboxProvider(BaseAIProvider):
     """Blackbox AI provider.
@@ -38,6 +84,15 @@ class BlackboxProvider(BaseAIProvider):
     3. Handle authentication if required
     """
 
+    # Request constants shared by every call (ClientTimeout is immutable)
+    _POST_HEADERS = {
+        "Content-Type": "application/json",
+        "User-Agent": "Mozilla/5.0 (compatible; ClaudeCodeBot/1.0)",
+    }
+    _GET_TIMEOUT = aiohttp.ClientTimeout(total=10)
+    _POST_TIMEOUT = aiohttp.ClientTimeout(total=60)
+    _HEALTH_TIMEOUT = aiohttp.ClientTimeout(total=5)
+
     def __init__(self, config: Settings):
         """Initialize Blackbox provider.
 
@@ -48,6 +103,17 @@ class BlackboxProvider(BaseAIProvider):
         self._config = config
         self._api_url = "https://www.blackbox.ai/api/chat"
         self._session: Optional[aiohttp.ClientSession] = None
+        self._owns_session = False
+        self._capabilities: Optional[ProviderCapabilities] = None
+
+    def use_http_session(self, http_session: aiohttp.ClientSession) -> None:
+        """Reuse the provider manager's pooled HTTP session.
+
+        Args:
+            http_session: Shared client session
+        """
+        self._session = http_session
+        self._owns_session = False
 
     @property
     def name(self) -> str:
@@ -63,13 +129,15 @@ class BlackboxProvider(BaseAIProvider):
         try:
             logger.info("Initializing Blackbox provider")
 
-            # Create aiohttp session
-            self._session = aiohttp.ClientSession()
+            # Create aiohttp session unless a shared one was provided
+            if self._session is None or self._session.closed:
+                self._session = create_http_session()
+                self._owns_session = True
 
             # Check if Blackbox is accessible
             try:
                 async with self._session.get(
-                    "https://www.blackbox.ai", timeout=aiohttp.ClientTimeout(total=10)
+                    "https://www.blackbox.ai", timeout=self._GET_TIMEOUT
                 ) as response:
                     if response.status == 200:
                         self.status = ProviderStatus.READY
@@ -110,6 +178,67 @@ class BlackboxProvider(BaseAIProvider):
         Returns:
             AI response from Blackbox
         """
+        # Consume the stream so response parsing lives in one place
+        content = await collect_stream(
+            self.stream_message(
+                prompt=prompt,
+                working_directory=working_directory,
+                session_id=session_id,
+                system_prompt=system_prompt,
+                **kwargs,
+            )
+        )
+
+        # Blackbox returns text responses
+        content = content.strip()
+
+        if not content:
+            content = "I couldn't generate a response. Please try again."
+
+        # Estimate tokens (rough)
+        tokens_used = estimate_tokens(content)
+
+        # Blackbox pricing (estimated - they don't have public pricing)
+        # Assume free tier or minimal cost
+        cost = 0.0
+
+        # Create universal response
+        return AIResponse(
+            content=content,
+            session_id=session_id or f"blackbox_{id(self)}",
+            tokens_used=tokens_used,
+            cost=cost,
+            provider_name="blackbox",
+            model_name="blackbox-code",
+            metadata={
+                "working_directory": str(working_directory),
+                "code_mode": True,
+            },
+        )
+
+    async def stream_message(
+        self,
+        prompt: str,
+        working_directory: Path,
+        session_id: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        **kwargs,
+    ) -> AsyncIterator[AIStreamUpdate]:
+        """Stream response from Blackbox.
+
+        Blackbox sends plain text, so raw body chunks are yielded as they
+        arrive instead of buffering the whole response.
+
+        Args:
+            prompt: User message
+            working_directory: Working directory
+            session_id: Optional session ID
+            system_prompt: Optional system instructions
+            **kwargs: Additional parameters
+
+        Yields:
+            Stream updates
+        """
         if self.status != ProviderStatus.READY:
             raise RuntimeError(f"Blackbox provider not ready: {self.status}")
 
@@ -122,59 +251,35 @@ class BlackboxProvider(BaseAIProvider):
             # Build context-aware prompt
             full_prompt = self._build_prompt(prompt, working_directory, system_prompt)
 
-            # Prepare request payload
-            # Note: This is based on reverse-engineering Blackbox's web interface
-            # May need updates if their API changes
-            payload = {
-                "messages": [{"role": "user", "content": full_prompt}],
-                "previewToken": None,
-                "codeModelMode": True,  # Enable code-focused mode
-                "agentMode": {},
-                "trendingAgentMode": {},
-                "isMicMode": False,
-                "isChromeExt": False,
-                "githubToken": None,
-            }
-
             # Send request
             async with self._session.post(
                 self._api_url,
-                json=payload,
-                headers={
-                    "Content-Type": "application/json",
-                    "User-Agent": "Mozilla/5.0 (compatible; ClaudeCodeBot/1.0)",
-                },
-                timeout=aiohttp.ClientTimeout(total=60),
+                data=_encode_payload(full_prompt),
+                headers=self._POST_HEADERS,
+                timeout=self._POST_TIMEOUT,
             ) as response:
                 if response.status != 200:
                     raise RuntimeError(
                         f"Blackbox API returned status {response.status}"
                     )
 
-                # Parse response
-                response_text = await response.text()
-
-                # Blackbox returns text responses
-                content = response_text.strip()
-
-                if not content:
-                    content = "I couldn't generate a response. Please try again."
-
-            # Estimate tokens (rough)
-            tokens_used = len(content.split()) * 1.3
-
-            # Blackbox pricing (estimated - they don't have public pricing)
-            # Assume free tier or minimal cost
-            cost = 0.0
-
-            # Create universal response
-            ai_response = AIResponse(
-                content=content,
-                session_id=session_id or f"blackbox_{id(self)}",
-                tokens_used=int(tokens_used),
-                cost=cost,
-                provider_name="blackbox",
-                model_name="blackbox-code",
+                # Decode incrementally so multi-byte characters split across
+                # chunk boundaries are not mangled
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+                async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                    content_delta = decoder.decode(chunk)
+                    if content_delta:
+                        yield AIStreamUpdate(
+                            content_delta=content_delta,
+                            is_complete=False,
+                        )
+
+                content_delta = decoder.decode(b"", final=True)
+
+            # Final update
+            yield AIStreamUpdate(
+                content_delta=content_delta,
+                is_complete=True,
                 metadata={
                     "working_directory": str(working_directory),
                     "code_mode": True,
@@ -182,92 +287,62 @@ class BlackboxProvider(BaseAIProvider):
             )
 
             self.status = ProviderStatus.READY
-            return ai_response
+
+        except (GeneratorExit, asyncio.CancelledError):
+            # Consumer stopped early or the task was cancelled; the provider
+            # itself is still usable
+            self.status = ProviderStatus.READY
+            raise
 
         except Exception as e:
-            logger.error("Error sending message to Blackbox", error=str(e))
+            logger.error("Error streaming from Blackbox", error=str(e))
             self.status = ProviderStatus.ERROR
             raise
 
-    async def stream_message(
-        self,
-        prompt: str,
-        working_directory: Path,
-        session_id: Optional[str] = None,
-        system_prompt: Optional[str] = None,
-        **kwargs,
-    ) -> AsyncIterator[AIStreamUpdate]:
-        """Stream response from Blackbox.
-
-        Note: Blackbox may not support streaming. Falls back to complete response.
-
-        Args:
-            prompt: User message
-            working_directory: Working directory
-            session_id: Optional session ID
-            system_prompt: Optional system instructions
-            **kwargs: Additional parameters
-
-        Yields:
-            Stream updates
-        """
-        # Blackbox doesn't publicly support streaming yet
-        # Return complete response as single update
-        response = await self.send_message(
-            prompt=prompt,
-            working_directory=working_directory,
-            session_id=session_id,
-            system_prompt=system_prompt,
-            **kwargs,
-        )
-
-        yield AIStreamUpdate(
-            content_delta=response.content,
-            is_complete=True,
-            metadata=response.metadata,
-        )
-
     async def get_capabilities(self) -> ProviderCapabilities:
         """Get Blackbox capabilities.
 
         Returns:
             Provider capabilities
         """
-        return ProviderCapabilities(
-            name="blackbox",
-            supports_streaming=False,  # Not publicly available
-            supports_tools=False,  # Not in current version
-            supports_vision=False,
-            supports_code_execution=False,
-            max_tokens=4096,  # Estimated
-            max_context_window=8192,  # Estimated
-            supported_languages=[
-                "python",
-                "javascript",
-                "typescript",
-                "java",
-                "cpp",
-                "csharp",
-                "go",
-                "rust",
-                "ruby",
-                "php",
-                "swift",
-                "kotlin",
-                "sql",
-                "html",
-                "css",
-            ],
-            cost_per_1k_input_tokens=0.0,  # Unknown/Free tier
-            cost_per_1k_output_tokens=0.0,
-            rate_limit_requests_per_minute=20,  # Conservative estimate
-            metadata={
-                "model": "blackbox-code",
-                "provider": "blackbox.ai",
-                "note": "Using web API - may be unstable",
-                "code_focused": True,
-            },
-        )
+        # Capabilities are static for the provider's lifetime
+        if self._capabilities is None:
+            self._capabilities = ProviderCapabilities(
+                name="blackbox",
+                supports_streaming=True,  # Plain-text body streamed in chunks
+                supports_tools=False,  # Not in current version
+                supports_vision=False,
+                supports_code_execution=False,
+                max_tokens=4096,  # Estimated
+                max_context_window=8192,  # Estimated
+                supported_languages=[
+                    "python",
+                    "javascript",
+                    "typescript",
+                    "java",
+                    "cpp",
+                    "csharp",
+                    "go",
+                    "rust",
+                    "ruby",
+                    "php",
+                    "swift",
+                    "kotlin",
+                    "sql",
+                    "html",
+                    "css",
+                ],
+                cost_per_1k_input_tokens=0.0,  # Unknown/Free tier
+                cost_per_1k_output_tokens=0.0,
+                rate_limit_requests_per_minute=20,  # Conservative estimate
+                metadata={
+                    "model": "blackbox-code",
+                    "provider": "blackbox.ai",
+                    "note": "Using web API - may be unstable",
+                    "code_focused": True,
+                },
+            )
+        return self._capabilities
 
     async def health_check(self) -> bool:
         """Check if Blackbox is accessible.
@@ -284,7 +359,7 @@ class BlackboxProvider(BaseAIProvider):
 
             # Quick connectivity check
             async with self._session.get(
-                "https://www.blackbox.ai", timeout=aiohttp.ClientTimeout(total=5)
+                "https://www.blackbox.ai", timeout=self._HEALTH_TIMEOUT
             ) as response:
                 return response.status == 200
 
@@ -308,30 +383,22 @@ class BlackboxProvider(BaseAIProvider):
         Returns:
             Full prompt with context
         """
-        parts = []
-
         # Add system prompt if provided
-        if system_prompt:
-            parts.append(f"System: {system_prompt}\n")
-
-        # Add context
-        parts.append(f"Working Directory: {working_directory}\n")
-        parts.append(
-            "You are a code generation AI assistant. "
-            "Provide concise, working code solutions.\n"
-        )
+        system_part = f"System: {system_prompt}\n\n" if system_prompt else ""
 
-        # Add user prompt
-        parts.append(f"\n{prompt}")
-
-        return "\n".join(parts)
+        # Add context, static instructions and user prompt in one pass
+        return (
+            f"{system_part}Working Directory: {working_directory}"
+            f"{BLACKBOX_PROMPT_PREAMBLE}{prompt}"
+        )
 
     async def shutdown(self) -> None:
         """Shutdown Blackbox provider."""
         logger.info("Shutting down Blackbox provider")
 
-        if self._session:
+        if self._session and self._owns_session:
             await self._session.close()
-            self._session = None
+        self._session = None
+        self._owns_session = False
 
         await super().shutdown()
@@ -19,12 +19,15 @@ from ...base_provider import (
     BaseAIProvider,
     ProviderCapabilities,
     ProviderStatus,
-    ToolCall,
     ToolResult,
 )
 
 logger = structlog.get_logger()
 
+# Claude 3.5 Sonnet pricing per token, averaged assuming a 50/50
+# input/output split ($0.003 and $0.015 per 1K tokens)
+CLAUDE_BLENDED_COST_PER_TOKEN = (0.003 + 0.015) / 2 / 1000
+
 
 class ClaudeProvider(BaseAIProvider):
     """Claude AI provider using existing Claude integration."""
@@ -38,6 +41,7 @@ class ClaudeProvider(BaseAIProvider):
         super().__init__(config)
         self.claude = ClaudeFacade(config)
         self._config = config
+        self._capabilities: Optional[ProviderCapabilities] = None
 
     @property
     def name(self) -> str:
@@ -156,37 +160,40 @@ class ClaudeProvider(BaseAIProvider):
         Returns:
             Provider capabilities
         """
-        return ProviderCapabilities(
-            name="claude",
-            supports_streaming=False,  # Not yet implemented in wrapper
-            supports_tools=True,
-            supports_vision=False,  # Requires vision API update
-            supports_code_execution=True,
-            max_tokens=4096,  # Claude Sonnet default
-            max_context_window=200000,  # Claude 3.5 Sonnet context window
-            supported_languages=[
-                "python",
-                "javascript",
-                "typescript",
-                "java",
-                "cpp",
-                "csharp",
-                "go",
-                "rust",
-                "ruby",
-                "php",
-                "swift",
-                "kotlin",
-            ],
-            cost_per_1k_input_tokens=0.003,  # Claude 3.5 Sonnet pricing
-            cost_per_1k_output_tokens=0.015,
-            rate_limit_requests_per_minute=50,
-            metadata={
-                "model": "claude-3-5-sonnet-20241022",
-                "provider": "anthropic",
-                "integration_type": "sdk" if self._config.use_sdk else "cli",
-            },
-        )
+        # Capabilities are static for the provider's lifetime
+        if self._capabilities is None:
+            self._capabilities = ProviderCapabilities(
+                name="claude",
+                supports_streaming=False,  # Not yet implemented in wrapper
+                supports_tools=True,
+                supports_vision=False,  # Requires vision API update
+                supports_code_execution=True,
+                max_tokens=4096,  # Claude Sonnet default
+                max_context_window=200000,  # Claude 3.5 Sonnet context window
+                supported_languages=[
+                    "python",
+                    "javascript",
+                    "typescript",
+                    "java",
+                    "cpp",
+                    "csharp",
+                    "go",
+                    "rust",
+                    "ruby",
+                    "php",
+                    "swift",
+                    "kotlin",
+                ],
+                cost_per_1k_input_tokens=0.003,  # Claude 3.5 Sonnet pricing
+                cost_per_1k_output_tokens=0.015,
+                rate_limit_requests_per_minute=50,
+                metadata={
+                    "model": "claude-3-5-sonnet-20241022",
+                    "provider": "anthropic",
+                    "integration_type": "sdk" if self._config.use_sdk else "cli",
+                },
+            )
+        return self._capabilities
 
     async def health_check(self) -> bool:
         """Check if Claude is accessible.
@@ -211,36 +218,23 @@ class ClaudeProvider(BaseAIProvider):
         Returns:
             Universal AI response
         """
-        # Extract tool calls if present
-        tool_calls = []
-        if hasattr(claude_response, "tool_uses") and claude_response.tool_uses:
-            for tool_use in claude_response.tool_uses:
-                tool_calls.append(
-                    ToolCall(
-                        name=tool_use.get("name", "unknown"),
-                        input=tool_use.get("input", {}),
-                        id=tool_use.get("id"),
-                    )
-                )
-
-        # Calculate cost (rough estimate based on tokens)
-        capabilities = None
-        cost = 0.0
-        if hasattr(claude_response, "tokens_used"):
-            # Rough estimate: assume 50/50 input/output split
-            input_tokens = claude_response.tokens_used // 2
-            output_tokens = claude_response.tokens_used // 2
-            cost = (input_tokens / 1000 * 0.003) + (output_tokens / 1000 * 0.015)
+        # Prefer the cost reported by Claude, otherwise estimate from tokens
+        tokens_used = claude_response.tokens_used
+        cost = claude_response.cost or tokens_used * CLAUDE_BLENDED_COST_PER_TOKEN
 
         return AIResponse(
             content=claude_response.content,
             session_id=claude_response.session_id,
-            tokens_used=getattr(claude_response, "tokens_used", 0),
+            tokens_used=tokens_used,
             cost=cost,
-            tool_calls=tool_calls if tool_calls else None,
             metadata={
                 "claude_specific": True,
-                "raw_response": str(claude_response)[:500],  # Truncate for safety
+                # Claude already ran these tools, so they are reported
+                # by name rather than as tool calls for the caller to execute
+                "tools_used": [tool["name"] for tool in claude_response.tools_used],
+                "num_turns": claude_response.num_turns,
+                "duration_ms": claude_response.duration_ms,
+                "is_error": claude_response.is_error,
             },
             provider_name="claude",
             model_name="claude-3-5-sonnet-20241022",
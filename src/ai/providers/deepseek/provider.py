@@ -11,14 +11,19 @@ For production use:
 Note: DeepSeek API is OpenAI-compatible!
 """
 
-import json
+import asyncio
+import contextlib
+import gzip
+import time
+from dataclasses import replace
 from pathlib import Path
-from typing import AsyncIterator, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 import aiohttp
 import structlog
 
 from ....config.settings import Settings
+from ... import serialization
 from ...base_provider import (
     AIMessage,
     AIResponse,
@@ -28,9 +33,50 @@ from ...base_provider import (
     ProviderStatus,
     ToolCall,
 )
+from ...cache import ResponseCaches
+from ...http_session import create_http_session
+from ...rate_limit import (
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    RATE_LIMIT_MAX_RETRIES,
+    RequestThrottle,
+    retry_delay,
+)
+from ...streaming import iter_sse_batches
 
 logger = structlog.get_logger()
 
+# How long a health check result is reused
+HEALTH_CHECK_TTL_SECONDS = 30
+
+# Batch job polling: start interval, cap and terminal failure states
+BATCH_POLL_INTERVAL_SECONDS = 5.0
+BATCH_MAX_POLL_INTERVAL_SECONDS = 60.0
+BATCH_FAILED_STATUSES = frozenset({"failed", "expired", "cancelled"})
+
+# Request rate DeepSeek allows; requests are throttled to stay under it
+DEEPSEEK_REQUESTS_PER_MINUTE = 60
+
+# Request bodies larger than this are gzipped before upload. Level 1 keeps
+# the CPU cost low while still shrinking source-code prompts several times.
+GZIP_MIN_BODY_BYTES = 4096
+GZIP_COMPRESS_LEVEL = 1
+
+# Default system prompt. It is sent as its own leading message, with the
+# working directory in a second message, so consecutive requests share an
+# identical prefix that DeepSeek's server-side prefix cache can reuse.
+DEEPSEEK_SYSTEM_PROMPT = (
+    "You are DeepSeek Coder, an expert AI programming assistant. "
+    "Provide high-quality, well-documented code that is:\n"
+    "- Correct and efficient\n"
+    "- Following best practices\n"
+    "- Well-commented\n"
+    "- Production-ready"
+)
+DEEPSEEK_SYSTEM_MESSAGE = {"role": "system", "content": DEEPSEEK_SYSTEM_PROMPT}
+
+# Sampling parameters used when a request does not override them
+DEEPSEEK_DEFAULT_PARAMS = {"max_tokens": 4096, "temperature": 0.7, "top_p": 0.95}
+
 
 class DeepSeekProvider(BaseAIProvider):
     """DeepSeek AI provider.
@@ -51,9 +97,38 @@ class DeepSeekProvider(BaseAIProvider):
         super().__init__(config)
         self._config = config
         self._api_key = None
-        self._api_url = "https://api.deepseek.com/v1/chat/completions"
+        self._api_base = "https://api.deepseek.com/v1"
+        self._api_url = f"{self._api_base}/chat/completions"
         self._session: Optional[aiohttp.ClientSession] = None
+        self._owns_session = False
+        self._headers: Dict[str, str] = {}
+        self._gzip_headers: Dict[str, str] = {}
+        self._compress_requests = getattr(config, "deepseek_compress_requests", True)
         self._model = "deepseek-coder"  # Default model
+        self._default_params = {"model": self._model, **DEEPSEEK_DEFAULT_PARAMS}
+        self._caches = ResponseCaches.from_config(config)
+        self._capabilities: Optional[ProviderCapabilities] = None
+        self._last_health: Optional[Tuple[float, bool]] = None
+        self._health_lock = asyncio.Lock()
+        # Deterministic requests in flight, keyed like the response cache
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Calls currently running; the provider is BUSY while any are
+        self._active_calls = 0
+        self._throttle = RequestThrottle(
+            DEEPSEEK_REQUESTS_PER_MINUTE,
+            getattr(
+                config, "ai_max_concurrent_requests", DEFAULT_MAX_CONCURRENT_REQUESTS
+            ),
+        )
+
+    def use_http_session(self, http_session: aiohttp.ClientSession) -> None:
+        """Reuse the provider manager's pooled HTTP session.
+
+        Args:
+            http_session: Shared client session
+        """
+        self._session = http_session
+        self._owns_session = False
 
     @property
     def name(self) -> str:
@@ -87,14 +162,21 @@ class DeepSeekProvider(BaseAIProvider):
 
             # Get model preference
             self._model = getattr(self._config, "deepseek_model", "deepseek-coder")
+            self._capabilities = None  # Reported model may have changed
+            # Request defaults are resolved once instead of on every call
+            self._default_params = {"model": self._model, **DEEPSEEK_DEFAULT_PARAMS}
+
+            # Auth is sent per request so the session can be shared
+            self._headers = {
+                "Authorization": f"Bearer {self._api_key}",
+                "Content-Type": "application/json",
+            }
+            self._gzip_headers = {**self._headers, "Content-Encoding": "gzip"}
 
-            # Create aiohttp session
-            self._session = aiohttp.ClientSession(
-                headers={
-                    "Authorization": f"Bearer {self._api_key}",
-                    "Content-Type": "application/json",
-                }
-            )
+            # Create aiohttp session unless a shared one was provided
+            if self._session is None or self._session.closed:
+                self._session = create_http_session()
+                self._owns_session = True
 
             self.status = ProviderStatus.READY
             logger.info(f"DeepSeek provider initialized with model: {self._model}")
@@ -125,109 +207,132 @@ class DeepSeekProvider(BaseAIProvider):
         Returns:
             AI response from DeepSeek
         """
-        if self.status != ProviderStatus.READY:
+        # Concurrent requests are bounded by the throttle, not the status
+        if self.status not in (ProviderStatus.READY, ProviderStatus.BUSY):
             raise RuntimeError(f"DeepSeek provider not ready: {self.status}")
 
         if not self._session:
             raise RuntimeError("DeepSeek session not initialized")
 
-        self.status = ProviderStatus.BUSY
+        self._begin_call()
+        failed = False
 
         try:
-            # Build messages array (OpenAI-compatible format)
-            messages = []
+            payload = self._build_payload(
+                prompt, working_directory, system_prompt, kwargs
+            )
+            messages = payload["messages"]
+
+            # Serve repeated deterministic requests from the caches;
+            # paraphrases only match under the same model and system prompt
+            cache_keys = self._caches.make_keys(
+                payload["temperature"],
+                payload,
+                {**payload, "messages": messages[:-1]},
+            )
+            cached = await self._caches.get(cache_keys, prompt, session_id)
+            if cached is not None:
+                return cached
+            request_key = cache_keys.request
+
+            # Join an identical deterministic request that is already running
+            inflight = self._inflight.get(request_key) if request_key else None
+            if inflight is not None:
+                # Shielded so a cancelled follower does not cancel the leader
+                shared = await asyncio.shield(inflight)
+                return replace(
+                    shared,
+                    session_id=session_id or shared.session_id,
+                    metadata={**shared.metadata, "coalesced": True},
+                )
 
-            # Add system prompt
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
-            else:
-                # Default system prompt optimized for coding
-                messages.append(
-                    {
-                        "role": "system",
-                        "content": (
-                            f"You are DeepSeek Coder, an expert AI programming assistant. "
-                            f"Working directory: {working_directory}\n"
-                            f"Provide high-quality, well-documented code that is:\n"
-                            f"- Correct and efficient\n"
-                            f"- Following best practices\n"
-                            f"- Well-commented\n"
-                            f"- Production-ready"
-                        ),
-                    }
+            future: Optional[asyncio.Future] = None
+            if request_key:
+                future = asyncio.get_running_loop().create_future()
+                self._inflight[request_key] = future
+            try:
+                ai_response = await self._complete(
+                    payload, working_directory, session_id
                 )
+            except BaseException as e:
+                if future is not None:
+                    # Followers see a plain error, not their own cancellation
+                    if isinstance(e, asyncio.CancelledError):
+                        e = RuntimeError("Coalesced DeepSeek request was cancelled")
+                    future.set_exception(e)
+                    future.exception()  # There may be no followers to retrieve it
+                raise
+            finally:
+                if request_key:
+                    self._inflight.pop(request_key, None)
+
+            if future is not None:
+                future.set_result(ai_response)
+            await self._caches.set(cache_keys, prompt, ai_response)
+
+            return ai_response
 
-            # Add user message
-            messages.append({"role": "user", "content": prompt})
+        except Exception as e:
+            logger.error("Error sending message to DeepSeek", error=str(e))
+            failed = True
+            raise
 
-            # Prepare request payload (OpenAI-compatible)
-            payload = {
-                "model": kwargs.get("model", self._model),
-                "messages": messages,
-                "max_tokens": kwargs.get("max_tokens", 4096),
-                "temperature": kwargs.get("temperature", 0.7),
-                "top_p": kwargs.get("top_p", 0.95),
-            }
+        finally:
+            self._end_call(failed)
 
-            # Send request to DeepSeek
-            async with self._session.post(
-                self._api_url, json=payload, timeout=aiohttp.ClientTimeout(total=60)
-            ) as response:
-                if response.status == 401:
-                    raise RuntimeError(
-                        "Invalid DeepSeek API key. Get one from https://platform.deepseek.com/"
-                    )
-                elif response.status == 429:
-                    raise RuntimeError(
-                        "DeepSeek rate limit exceeded. Please try again later."
-                    )
-                elif response.status != 200:
-                    error_text = await response.text()
-                    raise RuntimeError(
-                        f"DeepSeek API returned status {response.status}: {error_text}"
-                    )
+    def _begin_call(self) -> None:
+        """Mark the provider busy for one more running call."""
+        self._active_calls += 1
+        self.status = ProviderStatus.BUSY
 
-                # Parse response (OpenAI-compatible format)
-                data = await response.json()
-                choice = data.get("choices", [{}])[0]
-                message = choice.get("message", {})
-                content = message.get("content", "")
-
-                if not content:
-                    content = "No response generated. Please try again."
-
-                # Extract usage stats
-                usage = data.get("usage", {})
-                tokens_used = usage.get("total_tokens", 0)
-                prompt_tokens = usage.get("prompt_tokens", 0)
-                completion_tokens = usage.get("completion_tokens", 0)
-
-                # Calculate cost (DeepSeek is very affordable)
-                cost = self._calculate_cost(prompt_tokens, completion_tokens)
-
-                # Create universal response
-                ai_response = AIResponse(
-                    content=content,
-                    session_id=session_id or f"deepseek_{id(self)}",
-                    tokens_used=tokens_used,
-                    cost=cost,
-                    provider_name="deepseek",
-                    model_name=self._model,
-                    metadata={
-                        "working_directory": str(working_directory),
-                        "prompt_tokens": prompt_tokens,
-                        "completion_tokens": completion_tokens,
-                        "finish_reason": choice.get("finish_reason"),
-                    },
-                )
+    def _end_call(self, failed: bool) -> None:
+        """Settle the status once the last running call finishes.
 
-                self.status = ProviderStatus.READY
-                return ai_response
+        A failure only marks the provider errored if no other call is still
+        running, so one bad request does not reject its concurrent peers. A
+        status set meanwhile (e.g. OFFLINE after shutdown) is left alone.
 
-        except Exception as e:
-            logger.error("Error sending message to DeepSeek", error=str(e))
-            self.status = ProviderStatus.ERROR
-            raise
+        Args:
+            failed: Whether the finishing call raised an error
+        """
+        self._active_calls -= 1
+        if self._active_calls == 0 and self.status == ProviderStatus.BUSY:
+            self.status = ProviderStatus.ERROR if failed else ProviderStatus.READY
+
+    async def _complete(
+        self,
+        payload: Dict[str, Any],
+        working_directory: Path,
+        session_id: Optional[str] = None,
+    ) -> AIResponse:
+        """Send a chat completion request and convert its result.
+
+        Args:
+            payload: Request body
+            working_directory: Working directory (for context)
+            session_id: Optional session ID
+
+        Returns:
+            AI response from DeepSeek
+        """
+        async with self._post(payload, aiohttp.ClientTimeout(total=60)) as response:
+            if response.status == 401:
+                raise RuntimeError(
+                    "Invalid DeepSeek API key. Get one from https://platform.deepseek.com/"
+                )
+            elif response.status == 429:
+                raise RuntimeError(
+                    "DeepSeek rate limit exceeded. Please try again later."
+                )
+            elif response.status != 200:
+                error_text = await response.text()
+                raise RuntimeError(
+                    f"DeepSeek API returned status {response.status}: {error_text}"
+                )
+
+            # Parse response (OpenAI-compatible format)
+            data = serialization.loads(await response.read())
+            return self._to_ai_response(data, working_directory, session_id)
 
     async def stream_message(
         self,
@@ -249,39 +354,25 @@ class DeepSeekProvider(BaseAIProvider):
         Yields:
             Stream updates from DeepSeek
         """
-        if self.status != ProviderStatus.READY:
+        # Streams may run alongside other calls, like send_message
+        if self.status not in (ProviderStatus.READY, ProviderStatus.BUSY):
             raise RuntimeError(f"DeepSeek provider not ready: {self.status}")
 
         if not self._session:
             raise RuntimeError("DeepSeek session not initialized")
 
-        self.status = ProviderStatus.BUSY
+        self._begin_call()
+        failed = False
 
         try:
-            # Build messages
-            messages = []
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
-            else:
-                messages.append(
-                    {
-                        "role": "system",
-                        "content": f"You are DeepSeek Coder. Working directory: {working_directory}",
-                    }
-                )
-            messages.append({"role": "user", "content": prompt})
-
-            # Prepare streaming request
-            payload = {
-                "model": kwargs.get("model", self._model),
-                "messages": messages,
-                "max_tokens": kwargs.get("max_tokens", 4096),
-                "temperature": kwargs.get("temperature", 0.7),
-                "stream": True,
-            }
+            # Same request as send_message, streamed
+            payload = self._build_payload(
+                prompt, working_directory, system_prompt, kwargs
+            )
+            payload["stream"] = True
 
-            async with self._session.post(
-                self._api_url, json=payload, timeout=aiohttp.ClientTimeout(total=120)
+            async with self._post(
+                payload, aiohttp.ClientTimeout(total=120)
             ) as response:
                 if response.status != 200:
                     error_text = await response.text()
@@ -290,118 +381,428 @@ class DeepSeekProvider(BaseAIProvider):
                     )
 
                 # Process SSE stream (OpenAI-compatible)
-                async for line in response.content:
-                    line = line.decode("utf-8").strip()
-
-                    if not line or line == "data: [DONE]":
-                        continue
-
-                    if line.startswith("data: "):
-                        try:
-                            data = json.loads(line[6:])
-                            choice = data.get("choices", [{}])[0]
-                            delta = choice.get("delta", {})
-                            content_delta = delta.get("content", "")
-
-                            if content_delta:
-                                yield AIStreamUpdate(
-                                    content_delta=content_delta,
-                                    is_complete=False,
-                                )
-
-                            # Check if done
-                            if choice.get("finish_reason"):
-                                yield AIStreamUpdate(
-                                    content_delta="",
-                                    is_complete=True,
-                                )
-                                break
-
-                        except json.JSONDecodeError:
-                            continue
-
-            self.status = ProviderStatus.READY
+                finished = False
+                async for events in iter_sse_batches(response.content):
+                    for data in events:
+                        choice = data.get("choices", [{}])[0]
+                        content_delta = choice.get("delta", {}).get("content", "")
+
+                        if content_delta:
+                            yield AIStreamUpdate(
+                                content_delta=content_delta,
+                                is_complete=False,
+                            )
+
+                        # Check if done
+                        if choice.get("finish_reason"):
+                            yield AIStreamUpdate(
+                                content_delta="",
+                                is_complete=True,
+                            )
+                            finished = True
+                            break
+
+                    if finished:
+                        break
 
         except Exception as e:
             logger.error("Error streaming from DeepSeek", error=str(e))
-            self.status = ProviderStatus.ERROR
+            failed = True
             raise
 
+        finally:
+            # Also runs when the consumer stops early or is cancelled
+            self._end_call(failed)
+
+    async def send_offline_batch(
+        self,
+        requests: List[Dict[str, Any]],
+        poll_interval: float = BATCH_POLL_INTERVAL_SECONDS,
+    ) -> List[Any]:
+        """Run many independent requests as one asynchronous batch job.
+
+        Uses the OpenAI-compatible batch flow: upload a JSONL file of
+        requests, create a batch for it, poll until it completes and
+        download the results. Jobs may take up to 24 hours, so this is meant
+        for bulk work (summaries, reviews), not interactive chat; unlike
+        ``send_batch`` it does not mark the provider busy.
+
+        Args:
+            requests: Keyword arguments for ``send_message`` per request
+            poll_interval: Initial seconds between status checks, doubled
+                up to ``BATCH_MAX_POLL_INTERVAL_SECONDS``
+
+        Returns:
+            Response or exception per request, in request order
+        """
+        if not self._session:
+            raise RuntimeError("DeepSeek session not initialized")
+
+        lines = []
+        for index, request in enumerate(requests):
+            params = dict(request)
+            payload = self._build_payload(
+                params.pop("prompt"),
+                params.pop("working_directory"),
+                params.pop("system_prompt", None),
+                params,
+            )
+            lines.append(
+                {
+                    "custom_id": str(index),
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": payload,
+                }
+            )
+        batch_file = b"\n".join(serialization.dumps(line) for line in lines)
+
+        # Upload the requests (multipart, so no JSON content type)
+        auth_headers = {"Authorization": self._headers["Authorization"]}
+        form = aiohttp.FormData()
+        form.add_field("purpose", "batch")
+        form.add_field(
+            "file",
+            batch_file,
+            filename="batch.jsonl",
+            content_type="application/jsonl",
+        )
+        upload = await self._request_json(
+            "POST", "/files", data=form, headers=auth_headers
+        )
+
+        batch = await self._request_json(
+            "POST",
+            "/batches",
+            data=serialization.dumps(
+                {
+                    "input_file_id": upload["id"],
+                    "endpoint": "/v1/chat/completions",
+                    "completion_window": "24h",
+                }
+            ),
+        )
+        logger.info("Submitted DeepSeek batch", batch_id=batch["id"], size=len(lines))
+
+        # Poll with exponential backoff until the job finishes
+        while batch["status"] != "completed":
+            if batch["status"] in BATCH_FAILED_STATUSES:
+                raise RuntimeError(
+                    f"DeepSeek batch {batch['id']} {batch['status']}: "
+                    f"{batch.get('errors')}"
+                )
+            await asyncio.sleep(poll_interval)
+            poll_interval = min(poll_interval * 2, BATCH_MAX_POLL_INTERVAL_SECONDS)
+            batch = await self._request_json("GET", f"/batches/{batch['id']}")
+
+        # Failed requests are reported in a separate error file; a job in
+        # which every request failed has no output file at all
+        output: List[bytes] = []
+        for file_id in (batch.get("output_file_id"), batch.get("error_file_id")):
+            if file_id:
+                output.extend((await self._download_batch_file(file_id)).splitlines())
+
+        results: List[Any] = [
+            RuntimeError("DeepSeek batch returned no result") for _ in requests
+        ]
+        for line in output:
+            if not line.strip():
+                continue
+            item = serialization.loads(line)
+            index = int(item["custom_id"])
+            result = item.get("response") or {}
+            if result.get("status_code") == 200:
+                results[index] = self._to_ai_response(
+                    result["body"],
+                    requests[index]["working_directory"],
+                    requests[index].get("session_id"),
+                )
+                results[index].metadata["batch_id"] = batch["id"]
+            else:
+                results[index] = RuntimeError(
+                    f"DeepSeek batch request failed: {item.get('error') or result}"
+                )
+        return results
+
+    async def _download_batch_file(self, file_id: str) -> bytes:
+        """Download the content of a batch result file.
+
+        Args:
+            file_id: ID of the output or error file of a batch
+
+        Returns:
+            JSONL file content
+        """
+        async with self._session.get(
+            f"{self._api_base}/files/{file_id}/content",
+            headers=self._headers,
+            timeout=aiohttp.ClientTimeout(total=300),
+        ) as response:
+            if response.status != 200:
+                raise RuntimeError(
+                    f"DeepSeek batch output download failed: {response.status}"
+                )
+            return await response.read()
+
+    async def _request_json(self, method: str, path: str, **kwargs) -> Dict[str, Any]:
+        """Call a DeepSeek API endpoint and decode its JSON response.
+
+        Args:
+            method: HTTP method
+            path: Path relative to the API base URL
+            **kwargs: Arguments for ``aiohttp.ClientSession.request``
+
+        Returns:
+            Decoded response body
+        """
+        kwargs.setdefault("headers", self._headers)
+        kwargs.setdefault("timeout", aiohttp.ClientTimeout(total=60))
+        async with self._session.request(
+            method, f"{self._api_base}{path}", **kwargs
+        ) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                raise RuntimeError(
+                    f"DeepSeek API returned status {response.status}: {error_text}"
+                )
+            return serialization.loads(await response.read())
+
     async def get_capabilities(self) -> ProviderCapabilities:
         """Get DeepSeek capabilities.
 
         Returns:
             Provider capabilities
         """
-        return ProviderCapabilities(
-            name="deepseek",
-            supports_streaming=True,
-            supports_tools=False,  # DeepSeek doesn't support function calling yet
-            supports_vision=False,
-            supports_code_execution=False,
-            max_tokens=4096,
-            max_context_window=16384,  # DeepSeek Coder context
-            supported_languages=[
-                "python",
-                "javascript",
-                "typescript",
-                "java",
-                "cpp",
-                "c",
-                "csharp",
-                "go",
-                "rust",
-                "ruby",
-                "php",
-                "swift",
-                "kotlin",
-                "scala",
-                "r",
-                "julia",
-                "dart",
-                "lua",
-                "perl",
-                "shell",
-            ],
-            cost_per_1k_input_tokens=0.0014,  # Very affordable!
-            cost_per_1k_output_tokens=0.0028,
-            rate_limit_requests_per_minute=60,
-            metadata={
-                "model": self._model,
-                "provider": "deepseek",
-                "api_compatible": "openai",
-                "specialized": "code_generation",
-            },
-        )
+        # Capabilities are static until the model changes
+        if self._capabilities is None:
+            self._capabilities = ProviderCapabilities(
+                name="deepseek",
+                supports_streaming=True,
+                supports_tools=False,  # DeepSeek doesn't support function calling yet
+                supports_vision=False,
+                supports_code_execution=False,
+                max_tokens=4096,
+                max_context_window=16384,  # DeepSeek Coder context
+                supported_languages=[
+                    "python",
+                    "javascript",
+                    "typescript",
+                    "java",
+                    "cpp",
+                    "c",
+                    "csharp",
+                    "go",
+                    "rust",
+                    "ruby",
+                    "php",
+                    "swift",
+                    "kotlin",
+                    "scala",
+                    "r",
+                    "julia",
+                    "dart",
+                    "lua",
+                    "perl",
+                    "shell",
+                ],
+                cost_per_1k_input_tokens=0.0014,  # Very affordable!
+                cost_per_1k_output_tokens=0.0028,
+                rate_limit_requests_per_minute=DEEPSEEK_REQUESTS_PER_MINUTE,
+                metadata={
+                    "model": self._model,
+                    "provider": "deepseek",
+                    "api_compatible": "openai",
+                    "specialized": "code_generation",
+                },
+            )
+        return self._capabilities
 
     async def health_check(self) -> bool:
         """Check if DeepSeek is accessible.
 
+        Lists the available models, which needs a valid key but costs no
+        tokens. The result is cached for ``HEALTH_CHECK_TTL_SECONDS`` and
+        concurrent callers share a single in-flight check.
+
         Returns:
             True if healthy
         """
-        try:
-            if self.status == ProviderStatus.OFFLINE:
-                return False
+        if self.status == ProviderStatus.OFFLINE:
+            return False
 
-            if not self._session or not self._api_key:
-                return False
+        if not self._session or not self._api_key:
+            return False
 
-            # Simple health check
-            payload = {
-                "model": self._model,
-                "messages": [{"role": "user", "content": "test"}],
-                "max_tokens": 1,
-            }
+        healthy = self._cached_health()
+        if healthy is not None:
+            return healthy
+
+        async with self._health_lock:
+            # Another caller may have refreshed it while we waited
+            healthy = self._cached_health()
+            if healthy is not None:
+                return healthy
+
+            try:
+                async with self._session.get(
+                    f"{self._api_base}/models",
+                    headers=self._headers,
+                    timeout=aiohttp.ClientTimeout(total=3),
+                ) as response:
+                    healthy = response.status in (200, 429)
+            except Exception as e:
+                logger.error("DeepSeek health check failed", error=str(e))
+                healthy = False
+
+            self._last_health = (time.monotonic(), healthy)
+            return healthy
+
+    def _cached_health(self) -> Optional[bool]:
+        """Get the last health check result if it is still fresh."""
+        if self._last_health is None:
+            return None
+        checked_at, healthy = self._last_health
+        if time.monotonic() - checked_at >= HEALTH_CHECK_TTL_SECONDS:
+            return None
+        return healthy
+
+    @contextlib.asynccontextmanager
+    async def _post(
+        self, payload: Dict[str, Any], timeout: aiohttp.ClientTimeout
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """POST to the chat API within the request throttle.
+
+        Rate limited (HTTP 429) responses are retried after the server's
+        ``Retry-After`` hint or an exponential backoff; the last attempt's
+        response, or a 429 whose hint exceeds the longest honoured wait, is
+        handed to the caller whatever its status.
 
-            async with self._session.post(
-                self._api_url, json=payload, timeout=aiohttp.ClientTimeout(total=5)
-            ) as response:
-                return response.status in [200, 429]
+        Args:
+            payload: Request body
+            timeout: Request timeout
 
-        except Exception as e:
-            logger.error("DeepSeek health check failed", error=str(e))
-            return False
+        Yields:
+            API response
+        """
+        # Encode (and compress large prompts) once, outside the retry loop
+        body = serialization.dumps(payload)
+        headers = self._headers
+        if self._compress_requests and len(body) > GZIP_MIN_BODY_BYTES:
+            body = gzip.compress(body, compresslevel=GZIP_COMPRESS_LEVEL)
+            headers = self._gzip_headers
+
+        for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+            async with self._throttle:
+                async with self._session.post(
+                    self._api_url,
+                    data=body,
+                    headers=headers,
+                    timeout=timeout,
+                ) as response:
+                    delay = None
+                    if response.status == 429 and attempt < RATE_LIMIT_MAX_RETRIES:
+                        # None when the hint is too long to wait out
+                        delay = retry_delay(
+                            response.headers.get("Retry-After"), attempt
+                        )
+                    if delay is None:
+                        yield response
+                        return
+
+            logger.warning(
+                "DeepSeek rate limit exceeded, retrying",
+                attempt=attempt + 1,
+                delay=delay,
+            )
+            await asyncio.sleep(delay)
+
+    def _build_payload(
+        self,
+        prompt: str,
+        working_directory: Path,
+        system_prompt: Optional[str],
+        params: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Build a chat completion request body.
+
+        Args:
+            prompt: User message
+            working_directory: Working directory (for context)
+            system_prompt: Optional system instructions
+            params: Additional request parameters
+
+        Returns:
+            OpenAI-compatible request payload
+        """
+        # Build messages array (OpenAI-compatible format) in one literal
+        if system_prompt:
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt},
+            ]
+        else:
+            # Default system prompt optimized for coding, constant part first
+            messages = [
+                DEEPSEEK_SYSTEM_MESSAGE,
+                {
+                    "role": "system",
+                    "content": f"Working directory: {working_directory}",
+                },
+                {"role": "user", "content": prompt},
+            ]
+
+        payload = {**self._default_params, "messages": messages}
+        # Only known request parameters may override the defaults
+        for key in self._default_params.keys() & params.keys():
+            payload[key] = params[key]
+        return payload
+
+    def _to_ai_response(
+        self,
+        data: Dict[str, Any],
+        working_directory: Path,
+        session_id: Optional[str] = None,
+    ) -> AIResponse:
+        """Convert a chat completion result to a universal response.
+
+        Args:
+            data: Decoded OpenAI-compatible completion
+            working_directory: Working directory of the request
+            session_id: Optional session ID
+
+        Returns:
+            Universal AI response
+        """
+        choice = data.get("choices", [{}])[0]
+        message = choice.get("message", {})
+        content = message.get("content", "")
+
+        if not content:
+            content = "No response generated. Please try again."
+
+        # Extract usage stats
+        usage = data.get("usage", {})
+        tokens_used = usage.get("total_tokens", 0)
+        prompt_tokens = usage.get("prompt_tokens", 0)
+        completion_tokens = usage.get("completion_tokens", 0)
+
+        # Calculate cost (DeepSeek is very affordable)
+        cost = self._calculate_cost(prompt_tokens, completion_tokens)
+
+        return AIResponse(
+            content=content,
+            session_id=session_id or f"deepseek_{id(self)}",
+            tokens_used=tokens_used,
+            cost=cost,
+            provider_name="deepseek",
+            model_name=self._model,
+            metadata={
+                "working_directory": str(working_directory),
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "finish_reason": choice.get("finish_reason"),
+            },
+        )
 
     def _calculate_cost(self, prompt_tokens: int, completion_tokens: int) -> float:
         """Calculate cost based on token usage.
@@ -423,8 +824,9 @@ class DeepSeekProvider(BaseAIProvider):
         """Shutdown DeepSeek provider."""
         logger.info("Shutting down DeepSeek provider")
 
-        if self._session:
+        if self._session and self._owns_session:
             await self._session.close()
-            self._session = None
+        self._session = None
+        self._owns_session = False
 
         await super().shutdown()
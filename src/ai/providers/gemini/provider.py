@@ -4,12 +4,19 @@ This provides integration with Google's Gemini models through the
 Google AI Studio API.
 """
 
-import asyncio
+from functools import lru_cache
 from pathlib import Path
 from typing import AsyncIterator, Optional
 
 import structlog
 
+try:
+    # Imported once with this module (loaded lazily by the providers package)
+    # rather than on every initialize()
+    import google.generativeai as genai
+except ImportError:  # pragma: no cover - depends on environment
+    genai = None  # type: ignore[assignment]
+
 from ....config.settings import Settings
 from ...base_provider import (
     AIMessage,
@@ -18,10 +25,48 @@ from ...base_provider import (
     BaseAIProvider,
     ProviderCapabilities,
     ProviderStatus,
+    estimate_tokens,
 )
+from ...cache import ResponseCaches
+from ...rate_limit import DEFAULT_MAX_CONCURRENT_REQUESTS, RequestThrottle
 
 logger = structlog.get_logger()
 
+# Request rate of the Gemini free tier; requests are throttled to stay under it
+GEMINI_REQUESTS_PER_MINUTE = 60
+
+# Fixed instructions that open every prompt, so consecutive requests share a
+# common prefix that Gemini's implicit context cache can reuse
+GEMINI_PROMPT_PREAMBLE = (
+    "You are an AI coding assistant helping via Telegram. "
+    "Provide concise, practical code solutions.\n"
+)
+
+# Number of assembled prompts kept for repeated or retried requests
+PROMPT_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=PROMPT_CACHE_SIZE)
+def _build_prompt_cached(
+    prompt: str, working_directory: str, system_prompt: Optional[str]
+) -> str:
+    """Assemble a full Gemini prompt, memoized on its string inputs.
+
+    Args:
+        prompt: User message
+        working_directory: Current directory
+        system_prompt: Optional system instructions
+
+    Returns:
+        Full prompt with context
+    """
+    # Constant instructions first, request-specific context last
+    system_part = f"System Instructions: {system_prompt}\n\n" if system_prompt else ""
+    return (
+        f"{GEMINI_PROMPT_PREAMBLE}\n{system_part}"
+        f"Working Directory: {working_directory}\n\n\nUser: {prompt}"
+    )
+
 
 class GeminiProvider(BaseAIProvider):
     """Google Gemini AI provider.
@@ -42,6 +87,14 @@ class GeminiProvider(BaseAIProvider):
         self._config = config
         self._model = None
         self._api_key = None
+        self._caches = ResponseCaches.from_config(config)
+        self._capabilities: Optional[ProviderCapabilities] = None
+        self._throttle = RequestThrottle(
+            GEMINI_REQUESTS_PER_MINUTE,
+            getattr(
+                config, "ai_max_concurrent_requests", DEFAULT_MAX_CONCURRENT_REQUESTS
+            ),
+        )
 
     @property
     def name(self) -> str:
@@ -68,25 +121,7 @@ class GeminiProvider(BaseAIProvider):
                 self.status = ProviderStatus.OFFLINE
                 return False
 
-            try:
-                import google.generativeai as genai
-
-                # Configure Gemini
-                genai.configure(api_key=self._api_key)
-
-                # Initialize model
-                model_name = getattr(
-                    self._config, "gemini_model", "gemini-1.5-pro-latest"
-                )
-                self._model = genai.GenerativeModel(model_name)
-
-                self.status = ProviderStatus.READY
-                logger.info(
-                    "Gemini provider initialized successfully", model=model_name
-                )
-                return True
-
-            except ImportError:
+            if genai is None:
                 logger.error(
                     "google-generativeai package not installed. "
                     "Install with: pip install google-generativeai"
@@ -94,6 +129,17 @@ class GeminiProvider(BaseAIProvider):
                 self.status = ProviderStatus.OFFLINE
                 return False
 
+            # Configure Gemini
+            genai.configure(api_key=self._api_key)
+
+            # Initialize model
+            model_name = getattr(self._config, "gemini_model", "gemini-1.5-pro-latest")
+            self._model = genai.GenerativeModel(model_name)
+
+            self.status = ProviderStatus.READY
+            logger.info("Gemini provider initialized successfully", model=model_name)
+            return True
+
         except Exception as e:
             logger.error("Failed to initialize Gemini provider", error=str(e))
             self.status = ProviderStatus.ERROR
@@ -127,18 +173,45 @@ class GeminiProvider(BaseAIProvider):
         try:
             # Build context-aware prompt
             full_prompt = self._build_prompt(prompt, working_directory, system_prompt)
+            model_name = getattr(self._config, "gemini_model", "gemini-1.5-pro")
+            generation_config = self._generation_config(kwargs)
+
+            # Serve repeated deterministic requests from the caches;
+            # paraphrases only match under the same model and context
+            cache_keys = self._caches.make_keys(
+                generation_config.get("temperature"),
+                dict(model=model_name, prompt=full_prompt, **generation_config),
+                dict(
+                    model=model_name,
+                    working_directory=str(working_directory),
+                    system_prompt=system_prompt,
+                    **generation_config,
+                ),
+            )
+            cached = await self._caches.get(cache_keys, prompt, session_id)
+            if cached is not None:
+                self.status = ProviderStatus.READY
+                return cached
 
             # Generate response
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None, self._model.generate_content, full_prompt
-            )
+            async with self._throttle:
+                if generation_config:
+                    response = await self._model.generate_content_async(
+                        full_prompt, generation_config=generation_config
+                    )
+                else:
+                    response = await self._model.generate_content_async(full_prompt)
 
             # Extract text
             content = response.text if hasattr(response, "text") else str(response)
 
-            # Count tokens (rough estimate)
-            tokens_used = len(content.split()) * 1.3  # Rough token estimate
+            # Token counts reported by the API, estimated if unavailable
+            usage = getattr(response, "usage_metadata", None)
+            prompt_tokens = getattr(usage, "prompt_token_count", 0)
+            completion_tokens = getattr(usage, "candidates_token_count", 0)
+            tokens_used = getattr(usage, "total_token_count", 0)
+            if not tokens_used:
+                tokens_used = estimate_tokens(content)
 
             # Gemini free tier has no cost
             cost = 0.0
@@ -147,16 +220,20 @@ class GeminiProvider(BaseAIProvider):
             ai_response = AIResponse(
                 content=content,
                 session_id=session_id or f"gemini_{id(self)}",
-                tokens_used=int(tokens_used),
+                tokens_used=tokens_used,
                 cost=cost,
                 provider_name="gemini",
-                model_name=getattr(self._config, "gemini_model", "gemini-1.5-pro"),
+                model_name=model_name,
                 metadata={
                     "working_directory": str(working_directory),
                     "free_tier": True,
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
                 },
             )
 
+            await self._caches.set(cache_keys, prompt, ai_response)
+
             self.status = ProviderStatus.READY
             return ai_response
 
@@ -195,19 +272,18 @@ class GeminiProvider(BaseAIProvider):
             full_prompt = self._build_prompt(prompt, working_directory, system_prompt)
 
             # Stream response
-            loop = asyncio.get_event_loop()
-            response_stream = await loop.run_in_executor(
-                None,
-                lambda: self._model.generate_content(full_prompt, stream=True),
-            )
+            async with self._throttle:
+                response_stream = await self._model.generate_content_async(
+                    full_prompt, stream=True
+                )
 
-            # Yield chunks
-            for chunk in response_stream:
-                if hasattr(chunk, "text"):
-                    yield AIStreamUpdate(
-                        content_delta=chunk.text,
-                        is_complete=False,
-                    )
+                # Yield chunks
+                async for chunk in response_stream:
+                    if hasattr(chunk, "text"):
+                        yield AIStreamUpdate(
+                            content_delta=chunk.text,
+                            is_complete=False,
+                        )
 
             # Final update
             yield AIStreamUpdate(
@@ -228,39 +304,42 @@ class GeminiProvider(BaseAIProvider):
         Returns:
             Provider capabilities
         """
-        return ProviderCapabilities(
-            name="gemini",
-            supports_streaming=True,
-            supports_tools=True,  # Gemini 1.5 supports function calling
-            supports_vision=True,  # Gemini supports multimodal
-            supports_code_execution=True,  # Gemini 1.5 has code execution
-            max_tokens=8192,
-            max_context_window=1000000,  # Gemini 1.5 has 1M token context!
-            supported_languages=[
-                "python",
-                "javascript",
-                "typescript",
-                "java",
-                "cpp",
-                "csharp",
-                "go",
-                "rust",
-                "ruby",
-                "php",
-                "swift",
-                "kotlin",
-                "sql",
-            ],
-            cost_per_1k_input_tokens=0.0,  # Free tier
-            cost_per_1k_output_tokens=0.0,  # Free tier
-            rate_limit_requests_per_minute=60,
-            metadata={
-                "model": "gemini-1.5-pro",
-                "provider": "google",
-                "free_tier": True,
-                "max_context": "1M tokens",
-            },
-        )
+        # Capabilities are static for the provider's lifetime
+        if self._capabilities is None:
+            self._capabilities = ProviderCapabilities(
+                name="gemini",
+                supports_streaming=True,
+                supports_tools=True,  # Gemini 1.5 supports function calling
+                supports_vision=True,  # Gemini supports multimodal
+                supports_code_execution=True,  # Gemini 1.5 has code execution
+                max_tokens=8192,
+                max_context_window=1000000,  # Gemini 1.5 has 1M token context!
+                supported_languages=[
+                    "python",
+                    "javascript",
+                    "typescript",
+                    "java",
+                    "cpp",
+                    "csharp",
+                    "go",
+                    "rust",
+                    "ruby",
+                    "php",
+                    "swift",
+                    "kotlin",
+                    "sql",
+                ],
+                cost_per_1k_input_tokens=0.0,  # Free tier
+                cost_per_1k_output_tokens=0.0,  # Free tier
+                rate_limit_requests_per_minute=GEMINI_REQUESTS_PER_MINUTE,
+                metadata={
+                    "model": "gemini-1.5-pro",
+                    "provider": "google",
+                    "free_tier": True,
+                    "max_context": "1M tokens",
+                },
+            )
+        return self._capabilities
 
     async def health_check(self) -> bool:
         """Check if Gemini is accessible.
@@ -282,6 +361,25 @@ class GeminiProvider(BaseAIProvider):
             logger.error("Gemini health check failed", error=str(e))
             return False
 
+    @staticmethod
+    def _generation_config(kwargs: dict) -> dict:
+        """Map request parameters onto Gemini generation config fields.
+
+        Args:
+            kwargs: Additional request parameters
+
+        Returns:
+            Generation config with only the parameters that were given
+        """
+        generation_config = {}
+        if "temperature" in kwargs:
+            generation_config["temperature"] = kwargs["temperature"]
+        if "max_tokens" in kwargs:
+            generation_config["max_output_tokens"] = kwargs["max_tokens"]
+        if "top_p" in kwargs:
+            generation_config["top_p"] = kwargs["top_p"]
+        return generation_config
+
     def _build_prompt(
         self,
         prompt: str,
@@ -298,23 +396,7 @@ class GeminiProvider(BaseAIProvider):
         Returns:
             Full prompt with context
         """
-        parts = []
-
-        # Add system prompt if provided
-        if system_prompt:
-            parts.append(f"System Instructions: {system_prompt}\n")
-
-        # Add context
-        parts.append(f"Working Directory: {working_directory}\n")
-        parts.append(
-            "You are an AI coding assistant helping via Telegram. "
-            "Provide concise, practical code solutions.\n"
-        )
-
-        # Add user prompt
-        parts.append(f"\nUser: {prompt}")
-
-        return "\n".join(parts)
+        return _build_prompt_cached(prompt, str(working_directory), system_prompt)
 
     async def shutdown(self) -> None:
         """Shutdown Gemini provider."""
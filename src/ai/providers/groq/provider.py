@@ -11,14 +11,15 @@ For production use:
 Note: Groq API is OpenAI-compatible!
 """
 
-import json
+from functools import lru_cache
 from pathlib import Path
-from typing import AsyncIterator, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 import aiohttp
 import structlog
 
 from ....config.settings import Settings
+from ... import serialization
 from ...base_provider import (
     AIMessage,
     AIResponse,
@@ -28,9 +29,55 @@ from ...base_provider import (
     ProviderStatus,
     ToolCall,
 )
+from ...cache import ResponseCaches
+from ...http_session import create_http_session
+from ...streaming import iter_sse_batches
 
 logger = structlog.get_logger()
 
+# Sampling parameters used when a request does not override them
+GROQ_DEFAULT_PARAMS = {"max_tokens": 8192, "temperature": 0.7, "top_p": 1.0}
+
+# Number of system messages kept for reuse across requests
+SYSTEM_MESSAGE_CACHE_SIZE = 64
+
+
+def _default_system_prompt(working_directory: str) -> str:
+    """Build the default system prompt for a working directory.
+
+    Args:
+        working_directory: Working directory (for context)
+
+    Returns:
+        System prompt
+    """
+    return (
+        f"You are a helpful AI coding assistant. "
+        f"Working directory: {working_directory}\n"
+        f"Provide clear, concise, and high-quality code solutions."
+    )
+
+
+@lru_cache(maxsize=SYSTEM_MESSAGE_CACHE_SIZE)
+def _system_message(
+    working_directory: str, system_prompt: Optional[str]
+) -> Dict[str, str]:
+    """Build the system message for a request context.
+
+    The returned dict is shared between requests and must not be modified.
+
+    Args:
+        working_directory: Working directory (for context)
+        system_prompt: Optional system instructions replacing the default
+
+    Returns:
+        OpenAI-compatible system message
+    """
+    return {
+        "role": "system",
+        "content": system_prompt or _default_system_prompt(working_directory),
+    }
+
 
 class GroqProvider(BaseAIProvider):
     """Groq AI provider.
@@ -43,6 +90,11 @@ class GroqProvider(BaseAIProvider):
     Known for incredible speed powered by LPU technology.
     """
 
+    # Request timeouts shared by every call (ClientTimeout is immutable)
+    _SEND_TIMEOUT = aiohttp.ClientTimeout(total=30)
+    _STREAM_TIMEOUT = aiohttp.ClientTimeout(total=60)
+    _HEALTH_TIMEOUT = aiohttp.ClientTimeout(total=5)
+
     def __init__(self, config: Settings):
         """Initialize Groq provider.
 
@@ -50,11 +102,24 @@ class GroqProvider(BaseAIProvider):
             config: Application settings
         """
         super().__init__(config)
-        self._config = config
         self._api_key = None
         self._api_url = "https://api.groq.com/openai/v1/chat/completions"
         self._session: Optional[aiohttp.ClientSession] = None
+        self._owns_session = False
+        self._headers: Dict[str, str] = {}
         self._model = "llama3-70b-8192"  # Default model
+        self._default_params = {"model": self._model, **GROQ_DEFAULT_PARAMS}
+        self._caches = ResponseCaches.from_config(config)
+        self._capabilities: Optional[ProviderCapabilities] = None
+
+    def use_http_session(self, http_session: aiohttp.ClientSession) -> None:
+        """Reuse the provider manager's pooled HTTP session.
+
+        Args:
+            http_session: Shared client session
+        """
+        self._session = http_session
+        self._owns_session = False
 
     @property
     def name(self) -> str:
@@ -71,7 +136,7 @@ class GroqProvider(BaseAIProvider):
             logger.info("Initializing Groq provider")
 
             # Get API key from config
-            self._api_key = getattr(self._config, "groq_api_key", None)
+            self._api_key = getattr(self.config, "groq_api_key", None)
             if self._api_key:
                 # Unwrap SecretStr if needed
                 if hasattr(self._api_key, "get_secret_value"):
@@ -87,15 +152,21 @@ class GroqProvider(BaseAIProvider):
                 return False
 
             # Get model preference
-            self._model = getattr(self._config, "groq_model", "llama3-70b-8192")
-
-            # Create aiohttp session
-            self._session = aiohttp.ClientSession(
-                headers={
-                    "Authorization": f"Bearer {self._api_key}",
-                    "Content-Type": "application/json",
-                }
-            )
+            self._model = getattr(self.config, "groq_model", "llama3-70b-8192")
+            # Request defaults are resolved once instead of on every call
+            self._default_params = {"model": self._model, **GROQ_DEFAULT_PARAMS}
+            self._capabilities = None  # Reported model may have changed
+
+            # Auth is sent per request so the session can be shared
+            self._headers = {
+                "Authorization": f"Bearer {self._api_key}",
+                "Content-Type": "application/json",
+            }
+
+            # Create aiohttp session unless a shared one was provided
+            if self._session is None or self._session.closed:
+                self._session = create_http_session()
+                self._owns_session = True
 
             self.status = ProviderStatus.READY
             logger.info(f"Groq provider initialized with model: {self._model}")
@@ -136,39 +207,29 @@ class GroqProvider(BaseAIProvider):
 
         try:
             # Build messages array (OpenAI-compatible format)
-            messages = []
-
-            # Add system prompt
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
-            else:
-                # Default system prompt
-                messages.append(
-                    {
-                        "role": "system",
-                        "content": (
-                            f"You are a helpful AI coding assistant. "
-                            f"Working directory: {working_directory}\n"
-                            f"Provide clear, concise, and high-quality code solutions."
-                        ),
-                    }
-                )
-
-            # Add user message
-            messages.append({"role": "user", "content": prompt})
+            messages = self._build_messages(prompt, working_directory, system_prompt)
 
             # Prepare request payload (OpenAI-compatible)
-            payload = {
-                "model": kwargs.get("model", self._model),
-                "messages": messages,
-                "max_tokens": kwargs.get("max_tokens", 8192),
-                "temperature": kwargs.get("temperature", 0.7),
-                "top_p": kwargs.get("top_p", 1.0),
-            }
+            payload = self._build_payload(messages, kwargs)
+
+            # Serve repeated deterministic requests from the caches;
+            # paraphrases only match under the same model and system prompt
+            cache_keys = self._caches.make_keys(
+                payload["temperature"],
+                payload,
+                {**payload, "messages": messages[:-1]},
+            )
+            cached = await self._caches.get(cache_keys, prompt, session_id)
+            if cached is not None:
+                self.status = ProviderStatus.READY
+                return cached
 
             # Send request to Groq
             async with self._session.post(
-                self._api_url, json=payload, timeout=aiohttp.ClientTimeout(total=30)
+                self._api_url,
+                data=serialization.dumps(payload),
+                headers=self._headers,
+                timeout=self._SEND_TIMEOUT,
             ) as response:
                 if response.status == 401:
                     raise RuntimeError(
@@ -185,7 +246,7 @@ class GroqProvider(BaseAIProvider):
                     )
 
                 # Parse response (OpenAI-compatible format)
-                data = await response.json()
+                data = serialization.loads(await response.read())
                 choice = data.get("choices", [{}])[0]
                 message = choice.get("message", {})
                 content = message.get("content", "")
@@ -219,6 +280,8 @@ class GroqProvider(BaseAIProvider):
                     },
                 )
 
+                await self._caches.set(cache_keys, prompt, ai_response)
+
                 self.status = ProviderStatus.READY
                 return ai_response
 
@@ -257,29 +320,17 @@ class GroqProvider(BaseAIProvider):
 
         try:
             # Build messages
-            messages = []
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
-            else:
-                messages.append(
-                    {
-                        "role": "system",
-                        "content": f"You are a helpful AI assistant. Working directory: {working_directory}",
-                    }
-                )
-            messages.append({"role": "user", "content": prompt})
+            messages = self._build_messages(prompt, working_directory, system_prompt)
 
             # Prepare streaming request
-            payload = {
-                "model": kwargs.get("model", self._model),
-                "messages": messages,
-                "max_tokens": kwargs.get("max_tokens", 8192),
-                "temperature": kwargs.get("temperature", 0.7),
-                "stream": True,
-            }
+            payload = self._build_payload(messages, kwargs)
+            payload["stream"] = True
 
             async with self._session.post(
-                self._api_url, json=payload, timeout=aiohttp.ClientTimeout(total=60)
+                self._api_url,
+                data=serialization.dumps(payload),
+                headers=self._headers,
+                timeout=self._STREAM_TIMEOUT,
             ) as response:
                 if response.status != 200:
                     error_text = await response.text()
@@ -287,36 +338,34 @@ class GroqProvider(BaseAIProvider):
                         f"Groq streaming failed: {response.status} - {error_text}"
                     )
 
-                # Process SSE stream (OpenAI-compatible)
-                async for line in response.content:
-                    line = line.decode("utf-8").strip()
-
-                    if not line or line == "data: [DONE]":
-                        continue
-
-                    if line.startswith("data: "):
-                        try:
-                            data = json.loads(line[6:])
-                            choice = data.get("choices", [{}])[0]
-                            delta = choice.get("delta", {})
-                            content_delta = delta.get("content", "")
-
-                            if content_delta:
-                                yield AIStreamUpdate(
-                                    content_delta=content_delta,
-                                    is_complete=False,
-                                )
-
-                            # Check if done
-                            if choice.get("finish_reason"):
-                                yield AIStreamUpdate(
-                                    content_delta="",
-                                    is_complete=True,
-                                )
-                                break
-
-                        except json.JSONDecodeError:
-                            continue
+                # Process SSE stream (OpenAI-compatible) from raw chunks;
+                # deltas that arrived together are yielded as one update
+                async for events in iter_sse_batches(response.content):
+                    deltas = []
+                    finished = False
+                    for data in events:
+                        choice = data.get("choices", [{}])[0]
+                        content_delta = choice.get("delta", {}).get("content", "")
+                        if content_delta:
+                            deltas.append(content_delta)
+
+                        # Check if done
+                        if choice.get("finish_reason"):
+                            finished = True
+                            break
+
+                    if deltas:
+                        yield AIStreamUpdate(
+                            content_delta="".join(deltas),
+                            is_complete=False,
+                        )
+
+                    if finished:
+                        yield AIStreamUpdate(
+                            content_delta="",
+                            is_complete=True,
+                        )
+                        break
 
             self.status = ProviderStatus.READY
 
@@ -331,49 +380,52 @@ class GroqProvider(BaseAIProvider):
         Returns:
             Provider capabilities
         """
-        # Context window varies by model
-        context_window = 8192
-        if "32768" in self._model:
-            context_window = 32768
-        elif "128k" in self._model:
-            context_window = 131072
-
-        return ProviderCapabilities(
-            name="groq",
-            supports_streaming=True,
-            supports_tools=True,  # Groq supports function calling
-            supports_vision=False,
-            supports_code_execution=False,
-            max_tokens=context_window,
-            max_context_window=context_window,
-            supported_languages=[
-                "python",
-                "javascript",
-                "typescript",
-                "java",
-                "cpp",
-                "c",
-                "csharp",
-                "go",
-                "rust",
-                "ruby",
-                "php",
-                "swift",
-                "kotlin",
-                "scala",
-            ],
-            cost_per_1k_input_tokens=0.0,  # FREE during beta
-            cost_per_1k_output_tokens=0.0,
-            rate_limit_requests_per_minute=30,  # Conservative estimate
-            metadata={
-                "model": self._model,
-                "provider": "groq",
-                "api_compatible": "openai",
-                "lpu_powered": True,
-                "ultra_fast": True,
-                "free_beta": True,
-            },
-        )
+        # Capabilities only change when initialize() picks a model
+        if self._capabilities is None:
+            # Context window varies by model
+            context_window = 8192
+            if "32768" in self._model:
+                context_window = 32768
+            elif "128k" in self._model:
+                context_window = 131072
+
+            self._capabilities = ProviderCapabilities(
+                name="groq",
+                supports_streaming=True,
+                supports_tools=True,  # Groq supports function calling
+                supports_vision=False,
+                supports_code_execution=False,
+                max_tokens=context_window,
+                max_context_window=context_window,
+                supported_languages=[
+                    "python",
+                    "javascript",
+                    "typescript",
+                    "java",
+                    "cpp",
+                    "c",
+                    "csharp",
+                    "go",
+                    "rust",
+                    "ruby",
+                    "php",
+                    "swift",
+                    "kotlin",
+                    "scala",
+                ],
+                cost_per_1k_input_tokens=0.0,  # FREE during beta
+                cost_per_1k_output_tokens=0.0,
+                rate_limit_requests_per_minute=30,  # Conservative estimate
+                metadata={
+                    "model": self._model,
+                    "provider": "groq",
+                    "api_compatible": "openai",
+                    "lpu_powered": True,
+                    "ultra_fast": True,
+                    "free_beta": True,
+                },
+            )
+        return self._capabilities
 
     async def health_check(self) -> bool:
         """Check if Groq is accessible.
@@ -396,7 +448,10 @@ class GroqProvider(BaseAIProvider):
             }
 
             async with self._session.post(
-                self._api_url, json=payload, timeout=aiohttp.ClientTimeout(total=5)
+                self._api_url,
+                data=serialization.dumps(payload),
+                headers=self._headers,
+                timeout=self._HEALTH_TIMEOUT,
             ) as response:
                 return response.status in [200, 429]
 
@@ -404,12 +459,52 @@ class GroqProvider(BaseAIProvider):
             logger.error("Groq health check failed", error=str(e))
             return False
 
+    @staticmethod
+    def _build_messages(
+        prompt: str,
+        working_directory: Path,
+        system_prompt: Optional[str] = None,
+    ) -> List[Dict[str, str]]:
+        """Build the chat messages of a request.
+
+        Args:
+            prompt: User message
+            working_directory: Working directory (for context)
+            system_prompt: Optional system instructions
+
+        Returns:
+            Reused system message followed by the user message
+        """
+        return [
+            _system_message(str(working_directory), system_prompt),
+            {"role": "user", "content": prompt},
+        ]
+
+    def _build_payload(
+        self, messages: List[Dict[str, str]], params: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Build a chat completion request body.
+
+        Args:
+            messages: Chat messages
+            params: Additional request parameters
+
+        Returns:
+            OpenAI-compatible request payload
+        """
+        payload = {**self._default_params, "messages": messages}
+        # Only known request parameters may override the defaults
+        for key in self._default_params.keys() & params.keys():
+            payload[key] = params[key]
+        return payload
+
     async def shutdown(self) -> None:
         """Shutdown Groq provider."""
         logger.info("Shutting down Groq provider")
 
-        if self._session:
+        if self._session and self._owns_session:
             await self._session.close()
-            self._session = None
+        self._session = None
+        self._owns_session = False
 
         await super().shutdown()
@@ -10,14 +10,16 @@ For production use:
 4. Optionally set OLLAMA_HOST (default: http://localhost:11434)
 """
 
-import json
+import asyncio
+from functools import lru_cache
 from pathlib import Path
-from typing import AsyncIterator, Optional
+from typing import Any, AsyncIterator, Dict, Optional
 
 import aiohttp
 import structlog
 
 from ....config.settings import Settings
+from ... import serialization
 from ...base_provider import (
     AIMessage,
     AIResponse,
@@ -26,9 +28,42 @@ from ...base_provider import (
     ProviderCapabilities,
     ProviderStatus,
 )
+from ...cache import ResponseCaches
+from ...http_session import create_http_session
+from ...streaming import iter_ndjson_batches
 
 logger = structlog.get_logger()
 
+# How long Ollama keeps the model loaded after each request
+DEFAULT_KEEP_ALIVE = "30m"
+
+# Generation options used when a request does not override them, and the
+# request parameters that map onto them
+OLLAMA_DEFAULT_OPTIONS = {"temperature": 0.7, "num_predict": 2048, "top_p": 0.9}
+OLLAMA_OPTION_NAMES = {
+    "temperature": "temperature",
+    "max_tokens": "num_predict",
+    "top_p": "top_p",
+}
+
+# Number of assembled prompt prefixes kept
+PROMPT_PREFIX_CACHE_SIZE = 128
+
+
+@lru_cache(maxsize=PROMPT_PREFIX_CACHE_SIZE)
+def _prompt_prefix(working_directory: str, system_prompt: Optional[str]) -> str:
+    """Build the system and context sections that precede the instruction.
+
+    Args:
+        working_directory: Current directory
+        system_prompt: Optional system instructions
+
+    Returns:
+        Prompt prefix, shared between requests with the same context
+    """
+    system_part = f"### System\n{system_prompt}\n\n" if system_prompt else ""
+    return f"{system_part}### Context\nWorking Directory: {working_directory}\n\n"
+
 
 class OllamaProvider(BaseAIProvider):
     """Ollama local AI provider.
@@ -41,6 +76,12 @@ class OllamaProvider(BaseAIProvider):
     - And many more...
     """
 
+    # Request timeouts shared by every call (ClientTimeout is immutable)
+    _SEND_TIMEOUT = aiohttp.ClientTimeout(total=120)  # Local models can be slow
+    _STREAM_TIMEOUT = aiohttp.ClientTimeout(total=180)
+    _HEALTH_TIMEOUT = aiohttp.ClientTimeout(total=5)
+    _WARMUP_TIMEOUT = aiohttp.ClientTimeout(total=120)
+
     def __init__(self, config: Settings):
         """Initialize Ollama provider.
 
@@ -48,10 +89,24 @@ class OllamaProvider(BaseAIProvider):
             config: Application settings
         """
         super().__init__(config)
-        self._config = config
         self._host = "http://localhost:11434"
         self._model = "codellama"
         self._session: Optional[aiohttp.ClientSession] = None
+        self._owns_session = False
+        self._headers = {"Content-Type": "application/json"}
+        self._caches = ResponseCaches.from_config(config)
+        self._capabilities: Optional[ProviderCapabilities] = None
+        self._keep_alive = DEFAULT_KEEP_ALIVE
+        self._warmup_task: Optional[asyncio.Task] = None
+
+    def use_http_session(self, http_session: aiohttp.ClientSession) -> None:
+        """Reuse the provider manager's pooled HTTP session.
+
+        Args:
+            http_session: Shared client session
+        """
+        self._session = http_session
+        self._owns_session = False
 
     @property
     def name(self) -> str:
@@ -68,24 +123,28 @@ class OllamaProvider(BaseAIProvider):
             logger.info("Initializing Ollama provider")
 
             # Get host and model from config
-            self._host = getattr(self._config, "ollama_host", "http://localhost:11434")
-            self._model = getattr(self._config, "ollama_model", "codellama")
-
-            # Create aiohttp session
-            self._session = aiohttp.ClientSession(
-                headers={"Content-Type": "application/json"}
+            self._host = getattr(self.config, "ollama_host", "http://localhost:11434")
+            self._model = getattr(self.config, "ollama_model", "codellama")
+            self._capabilities = None  # Reported model and host may have changed
+            self._keep_alive = getattr(
+                self.config, "ollama_keep_alive", DEFAULT_KEEP_ALIVE
             )
 
+            # Create aiohttp session unless a shared one was provided
+            if self._session is None or self._session.closed:
+                self._session = create_http_session()
+                self._owns_session = True
+
             # Check if Ollama is running
             try:
                 async with self._session.get(
-                    f"{self._host}/api/tags", timeout=aiohttp.ClientTimeout(total=5)
+                    f"{self._host}/api/tags", timeout=self._HEALTH_TIMEOUT
                 ) as response:
                     if response.status != 200:
                         raise RuntimeError(f"Ollama not accessible at {self._host}")
 
                     # Check if model is available
-                    data = await response.json()
+                    data = serialization.loads(await response.read())
                     models = [m["name"] for m in data.get("models", [])]
 
                     if not any(self._model in m for m in models):
@@ -103,6 +162,10 @@ class OllamaProvider(BaseAIProvider):
                 self.status = ProviderStatus.OFFLINE
                 return False
 
+            # Load the model in the background so the first request does
+            # not pay for it
+            self._warmup_task = asyncio.create_task(self._warm_up())
+
             self.status = ProviderStatus.READY
             logger.info(
                 f"Ollama provider initialized with model: {self._model} at {self._host}"
@@ -147,22 +210,31 @@ class OllamaProvider(BaseAIProvider):
             full_prompt = self._build_prompt(prompt, working_directory, system_prompt)
 
             # Prepare request payload
-            payload = {
-                "model": kwargs.get("model", self._model),
-                "prompt": full_prompt,
-                "stream": False,
-                "options": {
-                    "temperature": kwargs.get("temperature", 0.7),
-                    "num_predict": kwargs.get("max_tokens", 2048),
-                    "top_p": kwargs.get("top_p", 0.9),
-                },
-            }
+            payload = self._build_payload(full_prompt, kwargs, stream=False)
+
+            # Serve repeated deterministic requests from the caches;
+            # paraphrases only match under the same model and context
+            cache_keys = self._caches.make_keys(
+                payload["options"]["temperature"],
+                payload,
+                dict(
+                    model=payload["model"],
+                    options=payload["options"],
+                    working_directory=str(working_directory),
+                    system_prompt=system_prompt,
+                ),
+            )
+            cached = await self._caches.get(cache_keys, prompt, session_id)
+            if cached is not None:
+                self.status = ProviderStatus.READY
+                return cached
 
             # Send request to Ollama
             async with self._session.post(
                 f"{self._host}/api/generate",
-                json=payload,
-                timeout=aiohttp.ClientTimeout(total=120),  # Local models can be slow
+                data=serialization.dumps(payload),
+                headers=self._headers,
+                timeout=self._SEND_TIMEOUT,
             ) as response:
                 if response.status != 200:
                     error_text = await response.text()
@@ -171,7 +243,7 @@ class OllamaProvider(BaseAIProvider):
                     )
 
                 # Parse response
-                data = await response.json()
+                data = serialization.loads(await response.read())
                 content = data.get("response", "")
 
                 if not content:
@@ -208,6 +280,8 @@ class OllamaProvider(BaseAIProvider):
                     },
                 )
 
+                await self._caches.set(cache_keys, prompt, ai_response)
+
                 self.status = ProviderStatus.READY
                 return ai_response
 
@@ -249,20 +323,13 @@ class OllamaProvider(BaseAIProvider):
             full_prompt = self._build_prompt(prompt, working_directory, system_prompt)
 
             # Prepare streaming request
-            payload = {
-                "model": kwargs.get("model", self._model),
-                "prompt": full_prompt,
-                "stream": True,
-                "options": {
-                    "temperature": kwargs.get("temperature", 0.7),
-                    "num_predict": kwargs.get("max_tokens", 2048),
-                },
-            }
+            payload = self._build_payload(full_prompt, kwargs, stream=True)
 
             async with self._session.post(
                 f"{self._host}/api/generate",
-                json=payload,
-                timeout=aiohttp.ClientTimeout(total=180),
+                data=serialization.dumps(payload),
+                headers=self._headers,
+                timeout=self._STREAM_TIMEOUT,
             ) as response:
                 if response.status != 200:
                     error_text = await response.text()
@@ -270,35 +337,37 @@ class OllamaProvider(BaseAIProvider):
                         f"Ollama streaming failed: {response.status} - {error_text}"
                     )
 
-                # Process newline-delimited JSON stream
-                async for line in response.content:
-                    if not line:
-                        continue
-
-                    try:
-                        data = json.loads(line.decode("utf-8"))
+                # Process newline-delimited JSON stream from raw chunks;
+                # responses that arrived together are yielded as one update
+                async for objects in iter_ndjson_batches(response.content):
+                    deltas = []
+                    final = None
+                    for data in objects:
                         content_delta = data.get("response", "")
-
                         if content_delta:
-                            yield AIStreamUpdate(
-                                content_delta=content_delta,
-                                is_complete=False,
-                            )
+                            deltas.append(content_delta)
 
                         # Check if done
                         if data.get("done", False):
-                            yield AIStreamUpdate(
-                                content_delta="",
-                                is_complete=True,
-                                metadata={
-                                    "total_duration": data.get("total_duration", 0),
-                                    "eval_count": data.get("eval_count", 0),
-                                },
-                            )
+                            final = data
                             break
 
-                    except json.JSONDecodeError:
-                        continue
+                    if deltas:
+                        yield AIStreamUpdate(
+                            content_delta="".join(deltas),
+                            is_complete=False,
+                        )
+
+                    if final is not None:
+                        yield AIStreamUpdate(
+                            content_delta="",
+                            is_complete=True,
+                            metadata={
+                                "total_duration": final.get("total_duration", 0),
+                                "eval_count": final.get("eval_count", 0),
+                            },
+                        )
+                        break
 
             self.status = ProviderStatus.READY
 
@@ -313,44 +382,47 @@ class OllamaProvider(BaseAIProvider):
         Returns:
             Provider capabilities
         """
-        # Capabilities vary by model
-        # CodeLlama defaults shown here
-        return ProviderCapabilities(
-            name="ollama",
-            supports_streaming=True,
-            supports_tools=False,  # Depends on model
-            supports_vision=False,  # LLaVA models support vision
-            supports_code_execution=False,
-            max_tokens=4096,
-            max_context_window=4096,  # Varies by model
-            supported_languages=[
-                "python",
-                "javascript",
-                "typescript",
-                "java",
-                "cpp",
-                "c",
-                "csharp",
-                "go",
-                "rust",
-                "ruby",
-                "php",
-                "swift",
-                "kotlin",
-                "scala",
-            ],
-            cost_per_1k_input_tokens=0.0,  # FREE - runs locally
-            cost_per_1k_output_tokens=0.0,
-            rate_limit_requests_per_minute=0,  # No limit - local
-            metadata={
-                "model": self._model,
-                "provider": "ollama",
-                "host": self._host,
-                "local": True,
-                "privacy_focused": True,
-                "offline_capable": True,
-            },
-        )
+        # Capabilities only change when initialize() picks a model or host
+        if self._capabilities is None:
+            # Capabilities vary by model
+            # CodeLlama defaults shown here
+            self._capabilities = ProviderCapabilities(
+                name="ollama",
+                supports_streaming=True,
+                supports_tools=False,  # Depends on model
+                supports_vision=False,  # LLaVA models support vision
+                supports_code_execution=False,
+                max_tokens=4096,
+                max_context_window=4096,  # Varies by model
+                supported_languages=[
+                    "python",
+                    "javascript",
+                    "typescript",
+                    "java",
+                    "cpp",
+                    "c",
+                    "csharp",
+                    "go",
+                    "rust",
+                    "ruby",
+                    "php",
+                    "swift",
+                    "kotlin",
+                    "scala",
+                ],
+                cost_per_1k_input_tokens=0.0,  # FREE - runs locally
+                cost_per_1k_output_tokens=0.0,
+                rate_limit_requests_per_minute=0,  # No limit - local
+                metadata={
+                    "model": self._model,
+                    "provider": "ollama",
+                    "host": self._host,
+                    "local": True,
+                    "privacy_focused": True,
+                    "offline_capable": True,
+                },
+            )
+        return self._capabilities
 
     async def health_check(self) -> bool:
         """Check if Ollama is accessible.
@@ -367,7 +439,7 @@ class OllamaProvider(BaseAIProvider):
 
             # Check if Ollama is responding
             async with self._session.get(
-                f"{self._host}/api/tags", timeout=aiohttp.ClientTimeout(total=5)
+                f"{self._host}/api/tags", timeout=self._HEALTH_TIMEOUT
             ) as response:
                 return response.status == 200
 
@@ -375,6 +447,59 @@ class OllamaProvider(BaseAIProvider):
             logger.error("Ollama health check failed", error=str(e))
             return False
 
+    async def _warm_up(self) -> None:
+        """Load the model into memory ahead of the first request.
+
+        An empty prompt makes Ollama load the model without generating
+        anything; ``keep_alive`` keeps it resident afterwards.
+        """
+        try:
+            async with self._session.post(
+                f"{self._host}/api/generate",
+                data=serialization.dumps(
+                    {"model": self._model, "prompt": "", "keep_alive": self._keep_alive}
+                ),
+                headers=self._headers,
+                timeout=self._WARMUP_TIMEOUT,
+            ) as response:
+                if response.status != 200:
+                    logger.warning(
+                        "Ollama model warm-up failed",
+                        model=self._model,
+                        status=response.status,
+                    )
+                    return
+            logger.info("Ollama model loaded", model=self._model)
+        except Exception as e:
+            logger.warning(
+                "Ollama model warm-up failed", model=self._model, error=str(e)
+            )
+
+    def _build_payload(
+        self, full_prompt: str, params: Dict[str, Any], stream: bool
+    ) -> Dict[str, Any]:
+        """Build a generate request body.
+
+        Args:
+            full_prompt: Prompt with context
+            params: Additional request parameters
+            stream: Whether to stream the response
+
+        Returns:
+            Ollama generate request payload
+        """
+        options = dict(OLLAMA_DEFAULT_OPTIONS)
+        for param in OLLAMA_OPTION_NAMES.keys() & params.keys():
+            options[OLLAMA_OPTION_NAMES[param]] = params[param]
+
+        return {
+            "model": params.get("model", self._model),
+            "prompt": full_prompt,
+            "stream": stream,
+            "keep_alive": self._keep_alive,
+            "options": options,
+        }
+
     def _build_prompt(
         self,
         prompt: str,
@@ -391,29 +516,22 @@ class OllamaProvider(BaseAIProvider):
         Returns:
             Full prompt with context
         """
-        parts = []
-
-        # Add system prompt if provided
-        if system_prompt:
-            parts.append(f"### System\n{system_prompt}\n\n")
-
-        # Add context
-        parts.append(f"### Context\nWorking Directory: {working_directory}\n\n")
-
-        # Add instruction
-        parts.append(f"### Instruction\n{prompt}\n\n")
-
-        # Add response prefix
-        parts.append("### Response\n")
-
-        return "".join(parts)
+        return (
+            _prompt_prefix(str(working_directory), system_prompt)
+            + f"### Instruction\n{prompt}\n\n### Response\n"
+        )
 
     async def shutdown(self) -> None:
         """Shutdown Ollama provider."""
         logger.info("Shutting down Ollama provider")
 
-        if self._session:
+        if self._warmup_task and not self._warmup_task.done():
+            self._warmup_task.cancel()
+        self._warmup_task = None
+
+        if self._session and self._owns_session:
             await self._session.close()
-            self._session = None
+        self._session = None
+        self._owns_session = False
 
         await super().shutdown()
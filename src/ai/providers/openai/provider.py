@@ -9,14 +9,16 @@ For production use:
 3. Set OPENAI_API_KEY in environment
 """
 
-import json
+import uuid
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, AsyncIterator, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 import aiohttp
 import structlog
 
 from ....config.settings import Settings
+from ... import serialization
 from ...base_provider import (
     AIMessage,
     AIResponse,
@@ -26,9 +28,132 @@ from ...base_provider import (
     ProviderStatus,
     ToolCall,
 )
+from ...cache import ResponseCaches
+from ...http_session import create_http_session
+from ...rate_limit import DEFAULT_MAX_CONCURRENT_REQUESTS, RequestThrottle
+from ...streaming import iter_sse_batches
 
 logger = structlog.get_logger()
 
+# Request rate OpenAI allows; requests are throttled to stay under it
+OPENAI_REQUESTS_PER_MINUTE = 60
+
+# Pricing per 1K tokens (as of 2025) as (model, input, output), matched in
+# order against the model name; longer names must precede their prefixes
+OPENAI_PRICING = (
+    ("gpt-4-turbo-preview", 0.01, 0.03),
+    ("gpt-4-turbo", 0.01, 0.03),
+    ("gpt-4-32k", 0.06, 0.12),
+    ("gpt-4", 0.03, 0.06),
+    ("gpt-3.5-turbo-16k", 0.003, 0.004),
+    ("gpt-3.5-turbo", 0.0005, 0.0015),
+)
+# Pricing per 1K tokens for models not listed above
+OPENAI_DEFAULT_PRICING = (0.01, 0.03)
+
+# Context window in tokens as (model, window), matched in order against the
+# model name; other models are gpt-3.5-turbo variants
+OPENAI_CONTEXT_WINDOWS = (("gpt-4-turbo", 128000), ("gpt-4", 8192))
+OPENAI_DEFAULT_CONTEXT_WINDOW = 16385
+
+# Maximum completion length of the supported models
+OPENAI_MAX_OUTPUT_TOKENS = 4096
+
+# Sampling parameters used when a request does not override them
+OPENAI_DEFAULT_PARAMS = {"max_tokens": 2048, "temperature": 0.7, "top_p": 1.0}
+
+# Number of model names whose resolved pricing is kept
+PRICING_CACHE_SIZE = 32
+
+# Number of system messages kept for reuse across requests
+SYSTEM_MESSAGE_CACHE_SIZE = 64
+
+# Arguments sent for a function call without parameters
+EMPTY_ARGUMENTS = "{}"
+
+
+@lru_cache(maxsize=PRICING_CACHE_SIZE)
+def _resolve_pricing(model: str) -> Tuple[float, float]:
+    """Look up the prices of a model.
+
+    Args:
+        model: Model name
+
+    Returns:
+        Input and output cost per 1K tokens in USD
+    """
+    for model_key, cost_in, cost_out in OPENAI_PRICING:
+        if model_key in model:
+            return cost_in, cost_out
+    return OPENAI_DEFAULT_PRICING
+
+
+def _resolve_context_window(model: str) -> int:
+    """Look up the context window of a model.
+
+    Args:
+        model: Model name
+
+    Returns:
+        Context window in tokens
+    """
+    for model_key, context_window in OPENAI_CONTEXT_WINDOWS:
+        if model_key in model:
+            return context_window
+    return OPENAI_DEFAULT_CONTEXT_WINDOW
+
+
+def _parse_arguments(arguments: Optional[str]) -> Dict[str, Any]:
+    """Decode the JSON arguments of a function call.
+
+    Args:
+        arguments: Arguments as sent by the API, possibly missing
+
+    Returns:
+        New dict of decoded arguments
+    """
+    # Parameterless calls are common and need no parsing
+    if not arguments or arguments == EMPTY_ARGUMENTS:
+        return {}
+    return serialization.loads(arguments)
+
+
+def _default_system_prompt(working_directory: str) -> str:
+    """Build the default system prompt for a working directory.
+
+    Args:
+        working_directory: Working directory (for context)
+
+    Returns:
+        System prompt
+    """
+    return (
+        f"You are an expert coding assistant. "
+        f"Working directory: {working_directory}\n"
+        f"Provide high-quality, well-documented code that follows best practices."
+    )
+
+
+@lru_cache(maxsize=SYSTEM_MESSAGE_CACHE_SIZE)
+def _system_message(
+    working_directory: str, system_prompt: Optional[str]
+) -> Dict[str, str]:
+    """Build the system message for a request context.
+
+    The returned dict is shared between requests and must not be modified.
+
+    Args:
+        working_directory: Working directory (for context)
+        system_prompt: Optional system instructions replacing the default
+
+    Returns:
+        OpenAI system message
+    """
+    return {
+        "role": "system",
+        "content": system_prompt or _default_system_prompt(working_directory),
+    }
+
 
 class OpenAIProvider(BaseAIProvider):
     """OpenAI AI provider.
@@ -44,11 +169,33 @@ class OpenAIProvider(BaseAIProvider):
             config: Application settings
         """
         super().__init__(config)
-        self._config = config
         self._api_key = None
         self._api_url = "https://api.openai.com/v1/chat/completions"
         self._session: Optional[aiohttp.ClientSession] = None
+        # Session ID for requests without one; unlike id(self) it cannot be
+        # reused by another provider after this one is garbage collected
+        self._default_session_id = f"openai_{uuid.uuid4().hex}"
+        self._owns_session = False
+        self._headers: Dict[str, str] = {}
         self._model = "gpt-4-turbo-preview"  # Default model
+        self._default_params = {"model": self._model, **OPENAI_DEFAULT_PARAMS}
+        self._caches = ResponseCaches.from_config(config)
+        self._capabilities: Optional[ProviderCapabilities] = None
+        self._throttle = RequestThrottle(
+            OPENAI_REQUESTS_PER_MINUTE,
+            getattr(
+                config, "ai_max_concurrent_requests", DEFAULT_MAX_CONCURRENT_REQUESTS
+            ),
+        )
+
+    def use_http_session(self, http_session: aiohttp.ClientSession) -> None:
+        """Reuse the provider manager's pooled HTTP session.
+
+        Args:
+            http_session: Shared client session
+        """
+        self._session = http_session
+        self._owns_session = False
 
     @property
     def name(self) -> str:
@@ -65,7 +212,7 @@ class OpenAIProvider(BaseAIProvider):
             logger.info("Initializing OpenAI provider")
 
             # Get API key from config
-            self._api_key = getattr(self._config, "openai_api_key", None)
+            self._api_key = getattr(self.config, "openai_api_key", None)
             if self._api_key:
                 # Unwrap SecretStr if needed
                 if hasattr(self._api_key, "get_secret_value"):
@@ -81,15 +228,21 @@ class OpenAIProvider(BaseAIProvider):
                 return False
 
             # Get model preference
-            self._model = getattr(self._config, "openai_model", "gpt-4-turbo-preview")
-
-            # Create aiohttp session
-            self._session = aiohttp.ClientSession(
-                headers={
-                    "Authorization": f"Bearer {self._api_key}",
-                    "Content-Type": "application/json",
-                }
-            )
+            self._model = getattr(self.config, "openai_model", "gpt-4-turbo-preview")
+            # Request defaults are resolved once instead of on every call
+            self._default_params = {"model": self._model, **OPENAI_DEFAULT_PARAMS}
+            self._capabilities = None  # Reported model may have changed
+
+            # Auth is sent per request so the session can be shared
+            self._headers = {
+                "Authorization": f"Bearer {self._api_key}",
+                "Content-Type": "application/json",
+            }
+
+            # Create aiohttp session unless a shared one was provided
+            if self._session is None or self._session.closed:
+                self._session = create_http_session()
+                self._owns_session = True
 
             self.status = ProviderStatus.READY
             logger.info(f"OpenAI provider initialized with model: {self._model}")
@@ -130,108 +283,101 @@ class OpenAIProvider(BaseAIProvider):
 
         try:
             # Build messages array
-            messages = []
-
-            # Add system prompt
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
-            else:
-                # Default system prompt for coding
-                messages.append(
-                    {
-                        "role": "system",
-                        "content": (
-                            f"You are an expert coding assistant. "
-                            f"Working directory: {working_directory}\n"
-                            f"Provide high-quality, well-documented code that follows best practices."
-                        ),
-                    }
-                )
-
-            # Add user message
-            messages.append({"role": "user", "content": prompt})
+            messages = self._build_messages(prompt, working_directory, system_prompt)
 
             # Prepare request payload
-            payload = {
-                "model": kwargs.get("model", self._model),
-                "messages": messages,
-                "max_tokens": kwargs.get("max_tokens", 2048),
-                "temperature": kwargs.get("temperature", 0.7),
-                "top_p": kwargs.get("top_p", 1.0),
-            }
+            payload = self._build_payload(messages, kwargs)
 
             # Add function calling if supported
             if kwargs.get("functions"):
                 payload["functions"] = kwargs["functions"]
 
+            # Serve repeated deterministic requests from the caches;
+            # paraphrases only match under the same model and system prompt
+            cache_keys = self._caches.make_keys(
+                payload["temperature"],
+                payload,
+                {**payload, "messages": messages[:-1]},
+            )
+            cached = await self._caches.get(cache_keys, prompt, session_id)
+            if cached is not None:
+                self.status = ProviderStatus.READY
+                return cached
+
             # Send request to OpenAI
-            async with self._session.post(
-                self._api_url, json=payload, timeout=aiohttp.ClientTimeout(total=60)
-            ) as response:
-                if response.status == 401:
-                    raise RuntimeError(
-                        "Invalid OpenAI API key. Get one from https://platform.openai.com/api-keys"
-                    )
-                elif response.status == 429:
-                    raise RuntimeError(
-                        "OpenAI rate limit exceeded. Please try again later or upgrade your plan."
-                    )
-                elif response.status != 200:
-                    error_text = await response.text()
-                    raise RuntimeError(
-                        f"OpenAI API returned status {response.status}: {error_text}"
-                    )
+            async with self._throttle:
+                async with self._session.post(
+                    self._api_url,
+                    data=serialization.dumps(payload),
+                    headers=self._headers,
+                    timeout=aiohttp.ClientTimeout(total=60),
+                ) as response:
+                    if response.status == 401:
+                        raise RuntimeError(
+                            "Invalid OpenAI API key. Get one from https://platform.openai.com/api-keys"
+                        )
+                    elif response.status == 429:
+                        raise RuntimeError(
+                            "OpenAI rate limit exceeded. Please try again later or upgrade your plan."
+                        )
+                    elif response.status != 200:
+                        error_text = await response.text()
+                        raise RuntimeError(
+                            f"OpenAI API returned status {response.status}: {error_text}"
+                        )
 
-                # Parse response
-                data = await response.json()
-                choice = data.get("choices", [{}])[0]
-                message = choice.get("message", {})
-                content = message.get("content", "")
+                    # Parse response
+                    data = serialization.loads(await response.read())
+                    choice = data.get("choices", [{}])[0]
+                    message = choice.get("message", {})
+                    content = message.get("content", "")
 
-                if not content:
-                    content = "No response generated. Please try again."
+                    if not content:
+                        content = "No response generated. Please try again."
 
-                # Extract usage stats
-                usage = data.get("usage", {})
-                tokens_used = usage.get("total_tokens", 0)
-                prompt_tokens = usage.get("prompt_tokens", 0)
-                completion_tokens = usage.get("completion_tokens", 0)
+                    # Extract usage stats
+                    usage = data.get("usage", {})
+                    tokens_used = usage.get("total_tokens", 0)
+                    prompt_tokens = usage.get("prompt_tokens", 0)
+                    completion_tokens = usage.get("completion_tokens", 0)
 
-                # Calculate cost based on model
-                cost = self._calculate_cost(
-                    self._model, prompt_tokens, completion_tokens
-                )
+                    # Calculate cost based on model
+                    cost = self._calculate_cost(
+                        self._model, prompt_tokens, completion_tokens
+                    )
 
-                # Extract tool calls if present
-                tool_calls = []
-                if "function_call" in message:
-                    func_call = message["function_call"]
-                    tool_calls.append(
-                        ToolCall(
-                            name=func_call.get("name", "unknown"),
-                            input=json.loads(func_call.get("arguments", "{}")),
+                    # Extract tool calls if present
+                    tool_calls = []
+                    func_call = message.get("function_call")
+                    if func_call:
+                        tool_calls.append(
+                            ToolCall(
+                                name=func_call.get("name", "unknown"),
+                                input=_parse_arguments(func_call.get("arguments")),
+                            )
                         )
+
+                    # Create universal response
+                    ai_response = AIResponse(
+                        content=content,
+                        session_id=session_id or self._default_session_id,
+                        tokens_used=tokens_used,
+                        cost=cost,
+                        provider_name="openai",
+                        model_name=self._model,
+                        tool_calls=tool_calls if tool_calls else None,
+                        metadata={
+                            "working_directory": str(working_directory),
+                            "prompt_tokens": prompt_tokens,
+                            "completion_tokens": completion_tokens,
+                            "finish_reason": choice.get("finish_reason"),
+                        },
                     )
 
-                # Create universal response
-                ai_response = AIResponse(
-                    content=content,
-                    session_id=session_id or f"openai_{id(self)}",
-                    tokens_used=tokens_used,
-                    cost=cost,
-                    provider_name="openai",
-                    model_name=self._model,
-                    tool_calls=tool_calls if tool_calls else None,
-                    metadata={
-                        "working_directory": str(working_directory),
-                        "prompt_tokens": prompt_tokens,
-                        "completion_tokens": completion_tokens,
-                        "finish_reason": choice.get("finish_reason"),
-                    },
-                )
+                    await self._caches.set(cache_keys, prompt, ai_response)
 
-                self.status = ProviderStatus.READY
-                return ai_response
+                    self.status = ProviderStatus.READY
+                    return ai_response
 
         except Exception as e:
             logger.error("Error sending message to OpenAI", error=str(e))
@@ -268,66 +414,53 @@ class OpenAIProvider(BaseAIProvider):
 
         try:
             # Build messages
-            messages = []
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
-            else:
-                messages.append(
-                    {
-                        "role": "system",
-                        "content": f"You are an expert coding assistant. Working directory: {working_directory}",
-                    }
-                )
-            messages.append({"role": "user", "content": prompt})
+            messages = self._build_messages(prompt, working_directory, system_prompt)
 
             # Prepare streaming request
-            payload = {
-                "model": kwargs.get("model", self._model),
-                "messages": messages,
-                "max_tokens": kwargs.get("max_tokens", 2048),
-                "temperature": kwargs.get("temperature", 0.7),
-                "stream": True,
-            }
-
-            async with self._session.post(
-                self._api_url, json=payload, timeout=aiohttp.ClientTimeout(total=120)
-            ) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    raise RuntimeError(
-                        f"OpenAI streaming failed: {response.status} - {error_text}"
-                    )
-
-                # Process SSE stream
-                async for line in response.content:
-                    line = line.decode("utf-8").strip()
-
-                    if not line or line == "data: [DONE]":
-                        continue
+            payload = self._build_payload(messages, kwargs)
+            payload["stream"] = True
+
+            async with self._throttle:
+                async with self._session.post(
+                    self._api_url,
+                    data=serialization.dumps(payload),
+                    headers=self._headers,
+                    timeout=aiohttp.ClientTimeout(total=120),
+                ) as response:
+                    if response.status != 200:
+                        error_text = await response.text()
+                        raise RuntimeError(
+                            f"OpenAI streaming failed: {response.status} - {error_text}"
+                        )
 
-                    if line.startswith("data: "):
-                        try:
-                            data = json.loads(line[6:])
+                    # Process SSE stream from raw chunks; deltas that arrived
+                    # together are yielded as one update
+                    async for events in iter_sse_batches(response.content):
+                        deltas = []
+                        finished = False
+                        for data in events:
                             choice = data.get("choices", [{}])[0]
-                            delta = choice.get("delta", {})
-                            content_delta = delta.get("content", "")
-
+                            content_delta = choice.get("delta", {}).get("content", "")
                             if content_delta:
-                                yield AIStreamUpdate(
-                                    content_delta=content_delta,
-                                    is_complete=False,
-                                )
+                                deltas.append(content_delta)
 
                             # Check if done
                             if choice.get("finish_reason"):
-                                yield AIStreamUpdate(
-                                    content_delta="",
-                                    is_complete=True,
-                                )
+                                finished = True
                                 break
 
-                        except json.JSONDecodeError:
-                            continue
+                        if deltas:
+                            yield AIStreamUpdate(
+                                content_delta="".join(deltas),
+                                is_complete=False,
+                            )
+
+                        if finished:
+                            yield AIStreamUpdate(
+                                content_delta="",
+                                is_complete=True,
+                            )
+                            break
 
             self.status = ProviderStatus.READY
 
@@ -342,58 +475,52 @@ class OpenAIProvider(BaseAIProvider):
         Returns:
             Provider capabilities
         """
-        # Adjust based on model
-        if "gpt-4" in self._model:
-            max_tokens = 4096
-            context_window = 128000 if "turbo" in self._model else 8192
-            cost_input = 0.01 if "turbo" in self._model else 0.03
-            cost_output = 0.03 if "turbo" in self._model else 0.06
-        else:  # gpt-3.5-turbo
-            max_tokens = 4096
-            context_window = 16385
-            cost_input = 0.0005
-            cost_output = 0.0015
-
-        return ProviderCapabilities(
-            name="openai",
-            supports_streaming=True,
-            supports_tools=True,
-            supports_vision="vision" in self._model,
-            supports_code_execution=False,
-            max_tokens=max_tokens,
-            max_context_window=context_window,
-            supported_languages=[
-                "python",
-                "javascript",
-                "typescript",
-                "java",
-                "cpp",
-                "c",
-                "csharp",
-                "go",
-                "rust",
-                "ruby",
-                "php",
-                "swift",
-                "kotlin",
-                "scala",
-                "r",
-                "julia",
-                "dart",
-                "lua",
-                "perl",
-                "shell",
-            ],
-            cost_per_1k_input_tokens=cost_input,
-            cost_per_1k_output_tokens=cost_output,
-            rate_limit_requests_per_minute=60,
-            metadata={
-                "model": self._model,
-                "provider": "openai",
-                "supports_function_calling": True,
-                "organization": getattr(self._config, "openai_org_id", None),
-            },
-        )
+        # Capabilities depend only on the model, fixed until re-initialization
+        if self._capabilities is None:
+            # Limits and prices come from the per-model tables
+            cost_input, cost_output = _resolve_pricing(self._model)
+
+            self._capabilities = ProviderCapabilities(
+                name="openai",
+                supports_streaming=True,
+                supports_tools=True,
+                supports_vision="vision" in self._model,
+                supports_code_execution=False,
+                max_tokens=OPENAI_MAX_OUTPUT_TOKENS,
+                max_context_window=_resolve_context_window(self._model),
+                supported_languages=[
+                    "python",
+                    "javascript",
+                    "typescript",
+                    "java",
+                    "cpp",
+                    "c",
+                    "csharp",
+                    "go",
+                    "rust",
+                    "ruby",
+                    "php",
+                    "swift",
+                    "kotlin",
+                    "scala",
+                    "r",
+                    "julia",
+                    "dart",
+                    "lua",
+                    "perl",
+                    "shell",
+                ],
+                cost_per_1k_input_tokens=cost_input,
+                cost_per_1k_output_tokens=cost_output,
+                rate_limit_requests_per_minute=OPENAI_REQUESTS_PER_MINUTE,
+                metadata={
+                    "model": self._model,
+                    "provider": "openai",
+                    "supports_function_calling": True,
+                    "organization": getattr(self.config, "openai_org_id", None),
+                },
+            )
+        return self._capabilities
 
     async def health_check(self) -> bool:
         """Check if OpenAI is accessible.
@@ -416,7 +543,10 @@ class OpenAIProvider(BaseAIProvider):
             }
 
             async with self._session.post(
-                self._api_url, json=payload, timeout=aiohttp.ClientTimeout(total=5)
+                self._api_url,
+                data=serialization.dumps(payload),
+                headers=self._headers,
+                timeout=aiohttp.ClientTimeout(total=5),
             ) as response:
                 return response.status in [200, 429]  # 429 = rate limited but API is up
 
@@ -424,6 +554,45 @@ class OpenAIProvider(BaseAIProvider):
             logger.error("OpenAI health check failed", error=str(e))
             return False
 
+    @staticmethod
+    def _build_messages(
+        prompt: str,
+        working_directory: Path,
+        system_prompt: Optional[str] = None,
+    ) -> List[Dict[str, str]]:
+        """Build the chat messages of a request.
+
+        Args:
+            prompt: User message
+            working_directory: Working directory (for context)
+            system_prompt: Optional system instructions
+
+        Returns:
+            Reused system message followed by the user message
+        """
+        return [
+            _system_message(str(working_directory), system_prompt),
+            {"role": "user", "content": prompt},
+        ]
+
+    def _build_payload(
+        self, messages: List[Dict[str, str]], params: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Build a chat completion request body.
+
+        Args:
+            messages: Chat messages
+            params: Additional request parameters
+
+        Returns:
+            OpenAI request payload
+        """
+        payload = {**self._default_params, "messages": messages}
+        # Only known request parameters may override the defaults
+        for key in self._default_params.keys() & params.keys():
+            payload[key] = params[key]
+        return payload
+
     def _calculate_cost(
         self, model: str, prompt_tokens: int, completion_tokens: int
     ) -> float:
@@ -437,33 +606,21 @@ class OpenAIProvider(BaseAIProvider):
         Returns:
             Cost in USD
         """
-        # Pricing per 1K tokens (as of 2025)
-        pricing = {
-            "gpt-4-turbo-preview": (0.01, 0.03),
-            "gpt-4-turbo": (0.01, 0.03),
-            "gpt-4": (0.03, 0.06),
-            "gpt-4-32k": (0.06, 0.12),
-            "gpt-3.5-turbo": (0.0005, 0.0015),
-            "gpt-3.5-turbo-16k": (0.003, 0.004),
-        }
-
-        # Find matching pricing
-        cost_in = 0.01
-        cost_out = 0.03
-        for model_key, (in_price, out_price) in pricing.items():
-            if model_key in model:
-                cost_in = in_price
-                cost_out = out_price
-                break
-
-        return (prompt_tokens / 1000 * cost_in) + (completion_tokens / 1000 * cost_out)
+        # Nothing is billed when the API reports no usage
+        if not prompt_tokens and not completion_tokens:
+            return 0.0
+
+        # Pricing is resolved once per model name
+        cost_in, cost_out = _resolve_pricing(model)
+        return (prompt_tokens * cost_in + completion_tokens * cost_out) / 1000
 
     async def shutdown(self) -> None:
         """Shutdown OpenAI provider."""
         logger.info("Shutting down OpenAI provider")
 
-        if self._session:
+        if self._session and self._owns_session:
             await self._session.close()
-            self._session = None
+        self._session = None
+        self._owns_session = False
 
         await super().shutdown()
@@ -10,14 +10,15 @@ For production use:
 """
 
 import asyncio
-import json
+import uuid
 from pathlib import Path
-from typing import AsyncIterator, Optional
+from typing import AsyncIterator, Dict, Optional
 
 import aiohttp
 import structlog
 
 from ....config.settings import Settings
+from ... import serialization
 from ...base_provider import (
     AIMessage,
     AIResponse,
@@ -25,10 +26,33 @@ from ...base_provider import (
     BaseAIProvider,
     ProviderCapabilities,
     ProviderStatus,
+    estimate_tokens,
 )
+from ...cache import ResponseCaches
+from ...http_session import create_http_session
+from ...rate_limit import DEFAULT_MAX_CONCURRENT_REQUESTS, RequestThrottle
 
 logger = structlog.get_logger()
 
+# Request rate Windsurf allows; requests are throttled to stay under it
+WINDSURF_REQUESTS_PER_MINUTE = 60
+
+# Completion parameters used when a request does not override them
+WINDSURF_DEFAULT_PARAMS = {"language": "python", "max_tokens": 2048, "temperature": 0.7}
+
+# Fixed explanation appended to every simulated response
+WINDSURF_SIMULATION_NOTICE = (
+    "⚠️ Windsurf is running in simulation mode because:\n"
+    "- Codeium API key is not configured, or\n"
+    "- API endpoint is not accessible\n\n"
+    "To use Windsurf properly:\n"
+    "1. Get API key from: https://codeium.com/\n"
+    "2. Set CODEIUM_API_KEY in your .env file\n"
+    "3. Restart the bot\n\n"
+    "Windsurf uses Codeium's cascade architecture which intelligently\n"
+    "routes between models for optimal code generation."
+)
+
 
 class WindsurfProvider(BaseAIProvider):
     """Windsurf (Codeium) AI provider.
@@ -44,10 +68,31 @@ class WindsurfProvider(BaseAIProvider):
             config: Application settings
         """
         super().__init__(config)
-        self._config = config
         self._api_key = None
         self._api_url = "https://api.codeium.com/v1/complete"
         self._session: Optional[aiohttp.ClientSession] = None
+        # Session ID for requests without one; unlike id(self) it cannot be
+        # reused by another provider after this one is garbage collected
+        self._default_session_id = f"windsurf_{uuid.uuid4().hex}"
+        self._owns_session = False
+        self._headers: Dict[str, str] = {}
+        self._caches = ResponseCaches.from_config(config)
+        self._capabilities: Optional[ProviderCapabilities] = None
+        self._throttle = RequestThrottle(
+            WINDSURF_REQUESTS_PER_MINUTE,
+            getattr(
+                config, "ai_max_concurrent_requests", DEFAULT_MAX_CONCURRENT_REQUESTS
+            ),
+        )
+
+    def use_http_session(self, http_session: aiohttp.ClientSession) -> None:
+        """Reuse the provider manager's pooled HTTP session.
+
+        Args:
+            http_session: Shared client session
+        """
+        self._session = http_session
+        self._owns_session = False
 
     @property
     def name(self) -> str:
@@ -64,7 +109,7 @@ class WindsurfProvider(BaseAIProvider):
             logger.info("Initializing Windsurf provider")
 
             # Get API key from config
-            self._api_key = getattr(self._config, "codeium_api_key", None)
+            self._api_key = getattr(self.config, "codeium_api_key", None)
 
             if not self._api_key:
                 logger.warning(
@@ -75,13 +120,16 @@ class WindsurfProvider(BaseAIProvider):
                 self.status = ProviderStatus.OFFLINE
                 return False
 
-            # Create aiohttp session
-            self._session = aiohttp.ClientSession(
-                headers={
-                    "Authorization": f"Bearer {self._api_key}",
-                    "Content-Type": "application/json",
-                }
-            )
+            # Auth is sent per request so the session can be shared
+            self._headers = {
+                "Authorization": f"Bearer {self._api_key}",
+                "Content-Type": "application/json",
+            }
+
+            # Create aiohttp session unless a shared one was provided
+            if self._session is None or self._session.closed:
+                self._session = create_http_session()
+                self._owns_session = True
 
             self.status = ProviderStatus.READY
             logger.info("Windsurf provider initialized successfully")
@@ -126,45 +174,71 @@ class WindsurfProvider(BaseAIProvider):
 
             # Prepare request payload for Codeium API
             payload = {
+                **WINDSURF_DEFAULT_PARAMS,
                 "prompt": full_prompt,
-                "language": kwargs.get("language", "python"),
-                "max_tokens": kwargs.get("max_tokens", 2048),
-                "temperature": kwargs.get("temperature", 0.7),
                 "metadata": {
                     "working_directory": str(working_directory),
                     "session_id": session_id,
                 },
             }
+            # Only known request parameters may override the defaults
+            for key in WINDSURF_DEFAULT_PARAMS.keys() & kwargs.keys():
+                payload[key] = kwargs[key]
+
+            # Serve repeated deterministic requests from the caches; the
+            # session ID in the request metadata does not affect the answer,
+            # and paraphrases only match under the same context and settings
+            request = {**payload, "metadata": None}
+            cache_keys = self._caches.make_keys(
+                payload["temperature"],
+                request,
+                {
+                    **request,
+                    "prompt": None,
+                    "working_directory": str(working_directory),
+                    "system_prompt": system_prompt,
+                },
+            )
+            cached = await self._caches.get(cache_keys, prompt, session_id)
+            if cached is not None:
+                self.status = ProviderStatus.READY
+                return cached
 
             # Send request to Codeium
+            simulated = False
             try:
-                async with self._session.post(
-                    self._api_url, json=payload, timeout=aiohttp.ClientTimeout(total=60)
-                ) as response:
-                    if response.status == 401:
-                        raise RuntimeError(
-                            "Invalid Codeium API key. Get one from https://codeium.com/"
-                        )
-                    elif response.status != 200:
-                        error_text = await response.text()
-                        raise RuntimeError(
-                            f"Codeium API returned status {response.status}: {error_text}"
-                        )
-
-                    # Parse response
-                    data = await response.json()
-                    content = data.get("completion", "")
-
-                    if not content:
-                        content = "No response generated. Please try again."
+                async with self._throttle:
+                    async with self._session.post(
+                        self._api_url,
+                        data=serialization.dumps(payload),
+                        headers=self._headers,
+                        timeout=aiohttp.ClientTimeout(total=60),
+                    ) as response:
+                        if response.status == 401:
+                            raise RuntimeError(
+                                "Invalid Codeium API key. Get one from https://codeium.com/"
+                            )
+                        elif response.status != 200:
+                            error_text = await response.text()
+                            raise RuntimeError(
+                                f"Codeium API returned status {response.status}: {error_text}"
+                            )
+
+                        # Parse response
+                        data = serialization.loads(await response.read())
+                        content = data.get("completion", "")
+
+                        if not content:
+                            content = "No response generated. Please try again."
 
             except aiohttp.ClientError as e:
                 # Fallback to simulation mode if API not available
                 logger.warning(f"Codeium API error: {e}. Using simulation mode.")
                 content = self._simulate_response(prompt)
+                simulated = True
 
             # Estimate tokens (rough)
-            tokens_used = len(content.split()) * 1.3
+            tokens_used = estimate_tokens(content)
 
             # Codeium pricing (free for individuals, enterprise has costs)
             cost = 0.0  # Free tier
@@ -172,8 +246,8 @@ class WindsurfProvider(BaseAIProvider):
             # Create universal response
             ai_response = AIResponse(
                 content=content,
-                session_id=session_id or f"windsurf_{id(self)}",
-                tokens_used=int(tokens_used),
+                session_id=session_id or self._default_session_id,
+                tokens_used=tokens_used,
                 cost=cost,
                 provider_name="windsurf",
                 model_name="codeium-cascade",
@@ -184,6 +258,10 @@ class WindsurfProvider(BaseAIProvider):
                 },
             )
 
+            # Simulated fallbacks are never cached
+            if not simulated:
+                await self._caches.set(cache_keys, prompt, ai_response)
+
             self.status = ProviderStatus.READY
             return ai_response
 
@@ -234,47 +312,50 @@ class WindsurfProvider(BaseAIProvider):
         Returns:
             Provider capabilities
         """
-        return ProviderCapabilities(
-            name="windsurf",
-            supports_streaming=True,
-            supports_tools=False,  # Not in current API
-            supports_vision=False,
-            supports_code_execution=False,
-            max_tokens=4096,
-            max_context_window=16384,  # Codeium has good context
-            supported_languages=[
-                "python",
-                "javascript",
-                "typescript",
-                "java",
-                "cpp",
-                "c",
-                "csharp",
-                "go",
-                "rust",
-                "ruby",
-                "php",
-                "swift",
-                "kotlin",
-                "scala",
-                "r",
-                "julia",
-                "dart",
-                "lua",
-                "perl",
-                "shell",
-            ],
-            cost_per_1k_input_tokens=0.0,  # Free for individuals
-            cost_per_1k_output_tokens=0.0,
-            rate_limit_requests_per_minute=60,
-            metadata={
-                "model": "codeium-cascade",
-                "provider": "codeium",
-                "cascade_architecture": True,
-                "windsurf_compatible": True,
-                "free_tier": True,
-            },
-        )
+        # Capabilities are static for the provider's lifetime
+        if self._capabilities is None:
+            self._capabilities = ProviderCapabilities(
+                name="windsurf",
+                supports_streaming=True,
+                supports_tools=False,  # Not in current API
+                supports_vision=False,
+                supports_code_execution=False,
+                max_tokens=4096,
+                max_context_window=16384,  # Codeium has good context
+                supported_languages=[
+                    "python",
+                    "javascript",
+                    "typescript",
+                    "java",
+                    "cpp",
+                    "c",
+                    "csharp",
+                    "go",
+                    "rust",
+                    "ruby",
+                    "php",
+                    "swift",
+                    "kotlin",
+                    "scala",
+                    "r",
+                    "julia",
+                    "dart",
+                    "lua",
+                    "perl",
+                    "shell",
+                ],
+                cost_per_1k_input_tokens=0.0,  # Free for individuals
+                cost_per_1k_output_tokens=0.0,
+                rate_limit_requests_per_minute=WINDSURF_REQUESTS_PER_MINUTE,
+                metadata={
+                    "model": "codeium-cascade",
+                    "provider": "codeium",
+                    "cascade_architecture": True,
+                    "windsurf_compatible": True,
+                    "free_tier": True,
+                },
+            )
+        return self._capabilities
 
     async def health_check(self) -> bool:
         """Check if Windsurf is accessible.
@@ -293,7 +374,8 @@ class WindsurfProvider(BaseAIProvider):
             try:
                 async with self._session.post(
                     self._api_url,
-                    json={"prompt": "test", "max_tokens": 1},
+                    data=serialization.dumps({"prompt": "test", "max_tokens": 1}),
+                    headers=self._headers,
                     timeout=aiohttp.ClientTimeout(total=5),
                 ) as response:
                     return response.status in [
@@ -355,26 +437,20 @@ class WindsurfProvider(BaseAIProvider):
         Returns:
             Simulated response
         """
+        # Only the echoed prompt varies between simulated responses
         return (
             f"# Windsurf AI Response (Simulation Mode)\n\n"
             f"I received your request: '{prompt[:100]}...'\n\n"
-            f"⚠️ Windsurf is running in simulation mode because:\n"
-            f"- Codeium API key is not configured, or\n"
-            f"- API endpoint is not accessible\n\n"
-            f"To use Windsurf properly:\n"
-            f"1. Get API key from: https://codeium.com/\n"
-            f"2. Set CODEIUM_API_KEY in your .env file\n"
-            f"3. Restart the bot\n\n"
-            f"Windsurf uses Codeium's cascade architecture which intelligently\n"
-            f"routes between models for optimal code generation."
+            f"{WINDSURF_SIMULATION_NOTICE}"
         )
 
     async def shutdown(self) -> None:
         """Shutdown Windsurf provider."""
         logger.info("Shutting down Windsurf provider")
 
-        if self._session:
+        if self._session and self._owns_session:
             await self._session.close()
-            self._session = None
+        self._session = None
+        self._owns_session = False
 
         await super().shutdown()
@@ -0,0 +1,107 @@
+"""Client-side throttling for AI provider API calls.
+
+Providers advertise a request rate in their capabilities; ``RequestThrottle``
+keeps them under it proactively instead of reacting to HTTP 429 storms.
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+DEFAULT_MAX_CONCURRENT_REQUESTS = 16
+
+# How often a rate limited (HTTP 429) request is retried
+RATE_LIMIT_MAX_RETRIES = 3
+
+# Longest ``Retry-After`` wait honoured; a longer hint fails the request
+RATE_LIMIT_MAX_DELAY_SECONDS = 30.0
+
+
+class AsyncTokenBucket:
+    """Token bucket that waits for a token instead of rejecting."""
+
+    def __init__(self, rate: int, per: float = 60.0):
+        """Initialize a full bucket.
+
+        Args:
+            rate: Tokens granted per period (also the burst capacity)
+            per: Period length in seconds
+        """
+        self.capacity = rate
+        self.tokens = float(rate)
+        self.refill_rate = rate / per
+        self._last_update = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        """Add the tokens accrued since the last update."""
+        now = time.monotonic()
+        elapsed = now - self._last_update
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+        self._last_update = now
+
+    async def acquire(self) -> None:
+        """Take one token, waiting until one is available."""
+        # Serialize waiters so tokens are handed out in arrival order
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.refill_rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class RequestThrottle:
+    """Bound in-flight requests and pace them with a token bucket.
+
+    Use as an async context manager around each API call; the concurrency
+    slot is held for the duration of the block.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT_REQUESTS,
+    ):
+        """Initialize the throttle.
+
+        Args:
+            requests_per_minute: Sustained request rate to stay under
+            max_concurrent: Maximum number of requests in flight
+        """
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._bucket = AsyncTokenBucket(requests_per_minute, per=60.0)
+
+    async def __aenter__(self) -> "RequestThrottle":
+        await self._semaphore.acquire()
+        try:
+            await self._bucket.acquire()
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._semaphore.release()
+
+
+def retry_delay(retry_after: Optional[str], attempt: int) -> Optional[float]:
+    """Get how long to wait before retrying a rate limited request.
+
+    Args:
+        retry_after: Value of the ``Retry-After`` response header, if any
+        attempt: Zero-based number of the attempt that was rate limited
+
+    Returns:
+        Seconds to wait: the server's hint, else exponential backoff; None
+        if the hint exceeds ``RATE_LIMIT_MAX_DELAY_SECONDS`` and the request
+        should not be retried
+    """
+    if retry_after:
+        try:
+            delay = max(float(retry_after), 0.0)
+        except ValueError:
+            pass  # HTTP-date form, fall back to backoff
+        else:
+            return delay if delay <= RATE_LIMIT_MAX_DELAY_SECONDS else None
+    return float(2**attempt)
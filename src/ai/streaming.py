@@ -0,0 +1,162 @@
+"""Incremental parsers for streamed provider responses.
+
+Streaming endpoints deliver events split arbitrarily across network
+chunks. Providers append received bytes to a ``bytearray`` and call these
+parsers, which decode every complete line in place and report how many
+bytes were consumed so the caller can drop them with ``del buffer[:n]``.
+That keeps reassembly linear in the response size. ``iter_sse_events``,
+``iter_ndjson`` and their ``*_batches`` variants wrap that loop around an
+aiohttp response body.
+"""
+
+from typing import Any, AsyncIterator, Callable, Dict, List, Tuple
+
+import aiohttp
+
+from . import serialization
+
+# SSE framing sentinels. They are matched in place with bytes.find and
+# bytes.startswith, which run in C over the buffer, so no regex or
+# automaton is needed for these fixed prefixes.
+SSE_DATA_PREFIX = b"data: "
+SSE_DONE_MARKER = b"[DONE]"
+
+
+def parse_sse_events(buffer: bytearray) -> Tuple[List[Dict[str, Any]], int]:
+    """Decode the complete ``data:`` lines of a server-sent event stream.
+
+    Works on the raw bytes without decoding or copying each line; only the
+    JSON payloads are parsed. Other fields, ``[DONE]`` and malformed
+    payloads are skipped.
+
+    Args:
+        buffer: Received bytes not yet consumed
+
+    Returns:
+        Decoded event payloads and the number of bytes consumed (up to the
+        end of the last complete line)
+    """
+    events = []
+    start = 0
+    with memoryview(buffer) as view:
+        while (end := buffer.find(b"\n", start)) != -1:
+            line_end = end - 1 if end > start and buffer[end - 1] == 0x0D else end
+            payload = start + len(SSE_DATA_PREFIX)
+            if buffer.startswith(SSE_DATA_PREFIX, start, line_end) and not (
+                buffer.startswith(SSE_DONE_MARKER, payload, line_end)
+            ):
+                try:
+                    events.append(serialization.loads(view[payload:line_end]))
+                except serialization.JSONDecodeError:
+                    pass
+            start = end + 1
+    return events, start
+
+
+def parse_ndjson_lines(buffer: bytearray) -> Tuple[List[Dict[str, Any]], int]:
+    """Decode the complete lines of a newline-delimited JSON stream.
+
+    Blank and malformed lines are skipped.
+
+    Args:
+        buffer: Received bytes not yet consumed
+
+    Returns:
+        Decoded objects and the number of bytes consumed (up to the end of
+        the last complete line)
+    """
+    objects = []
+    start = 0
+    with memoryview(buffer) as view:
+        while (end := buffer.find(b"\n", start)) != -1:
+            if end > start:
+                try:
+                    objects.append(serialization.loads(view[start:end]))
+                except serialization.JSONDecodeError:
+                    pass
+            start = end + 1
+    return objects, start
+
+
+async def iter_sse_events(
+    content: aiohttp.StreamReader,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Yield the decoded events of a server-sent event response body.
+
+    Args:
+        content: Response body stream
+
+    Yields:
+        Decoded ``data:`` payloads
+    """
+    async for batch in iter_sse_batches(content):
+        for event in batch:
+            yield event
+
+
+async def iter_sse_batches(
+    content: aiohttp.StreamReader,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Yield the events of a server-sent event body grouped by arrival.
+
+    Each batch holds the events completed by one network chunk, so callers
+    can merge events that arrived together instead of handling each alone.
+
+    Args:
+        content: Response body stream
+
+    Yields:
+        Non-empty lists of decoded ``data:`` payloads
+    """
+    async for batch in _iter_batches(content, parse_sse_events):
+        yield batch
+
+
+async def iter_ndjson(content: aiohttp.StreamReader) -> AsyncIterator[Dict[str, Any]]:
+    """Yield the decoded objects of a newline-delimited JSON response body.
+
+    Args:
+        content: Response body stream
+
+    Yields:
+        Decoded objects
+    """
+    async for batch in iter_ndjson_batches(content):
+        for obj in batch:
+            yield obj
+
+
+async def iter_ndjson_batches(
+    content: aiohttp.StreamReader,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Yield the objects of a newline-delimited JSON body grouped by arrival.
+
+    Args:
+        content: Response body stream
+
+    Yields:
+        Non-empty lists of decoded objects completed by one network chunk
+    """
+    async for batch in _iter_batches(content, parse_ndjson_lines):
+        yield batch
+
+
+async def _iter_batches(
+    content: aiohttp.StreamReader,
+    parse: Callable[[bytearray], Tuple[List[Dict[str, Any]], int]],
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Feed response chunks through a line parser as they arrive."""
+    buffer = bytearray()
+    async for chunk in content.iter_any():
+        buffer += chunk
+        items, consumed = parse(buffer)
+        del buffer[:consumed]
+        if items:
+            yield items
+
+    # The body may end without a final newline
+    if buffer:
+        buffer += b"\n"
+        items = parse(buffer)[0]
+        if items:
+            yield items
@@ -116,6 +116,7 @@ class ClaudeResponse:
     is_error: bool = False
     error_type: Optional[str] = None
     tools_used: List[Dict[str, Any]] = field(default_factory=list)
+    tokens_used: int = 0
 
 
 @dataclass
@@ -132,6 +132,46 @@ class Settings(BaseSettings):
     enabled_ai_providers: List[str] = Field(
         default=["claude"], description="List of enabled AI providers"
     )
+    ai_batch_window_ms: int = Field(
+        0,
+        description="Window for coalescing concurrent AI requests (0 disables)",
+        ge=0,
+    )
+    ai_health_check_ttl_seconds: float = Field(
+        2.0,
+        description="How long AI provider health check results are cached",
+        ge=0,
+    )
+    ai_health_check_timeout_seconds: float = Field(
+        5.0,
+        description="How long a single AI provider health check may take",
+        gt=0,
+    )
+    ai_max_concurrent_requests: int = Field(
+        16, description="Max in-flight API requests per AI provider", ge=1
+    )
+    ai_response_cache_size: int = Field(
+        256,
+        description="Max cached responses to deterministic AI requests (0 disables)",
+        ge=0,
+    )
+    ai_response_cache_ttl_seconds: int = Field(
+        3600, description="How long cached AI responses stay valid", ge=1
+    )
+    ai_semantic_cache_enabled: bool = Field(
+        False,
+        description="Also reuse responses to similar prompts (needs sentence-transformers)",
+    )
+    ai_semantic_cache_threshold: float = Field(
+        0.92,
+        description="Minimum prompt embedding cosine similarity for a semantic cache hit",
+        gt=0,
+        le=1,
+    )
+    ai_semantic_cache_model: str = Field(
+        "sentence-transformers/all-MiniLM-L6-v2",
+        description="sentence-transformers model used for semantic cache embeddings",
+    )
 
     # Gemini settings
     gemini_api_key: Optional[SecretStr] = Field(
@@ -169,6 +209,10 @@ class Settings(BaseSettings):
         "codellama",
         description="Ollama model to use (codellama, llama2, mistral, deepseek-coder, etc.)",
     )
+    ollama_keep_alive: str = Field(
+        "30m",
+        description="How long Ollama keeps the model loaded after a request",
+    )
 
     # DeepSeek settings
     deepseek_api_key: Optional[SecretStr] = Field(
@@ -178,6 +222,9 @@ class Settings(BaseSettings):
         "deepseek-coder",
         description="DeepSeek model to use (deepseek-coder, deepseek-chat)",
     )
+    deepseek_compress_requests: bool = Field(
+        True, description="Gzip large DeepSeek request bodies before upload"
+    )
 
     # Groq settings
     groq_api_key: Optional[SecretStr] = Field(
@@ -0,0 +1 @@
+"""Tests for the multi-AI provider layer."""
@@ -0,0 +1,11 @@
+"""Fixtures shared by the AI provider tests."""
+
+import pytest
+
+from .fakes import FakeSession
+
+
+@pytest.fixture
+def session():
+    """Fake HTTP session returning a fixed chat completion."""
+    return FakeSession()
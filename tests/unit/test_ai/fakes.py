@@ -0,0 +1,120 @@
+"""Fake ``aiohttp`` objects and stream builders shared by provider tests."""
+
+import asyncio
+from typing import List, Optional
+
+from src.ai import serialization
+
+COMPLETION = {
+    "choices": [{"message": {"content": "print(1)"}, "finish_reason": "stop"}],
+    "usage": {"total_tokens": 30, "prompt_tokens": 20, "completion_tokens": 10},
+}
+
+
+class FakeStreamReader:
+    """Stand-in for ``aiohttp.StreamReader`` yielding fixed chunks."""
+
+    def __init__(self, chunks: List[bytes]):
+        self._chunks = chunks
+
+    async def iter_any(self):
+        for chunk in self._chunks:
+            yield chunk
+
+    async def iter_chunked(self, size: int):
+        for chunk in self._chunks:
+            yield chunk
+
+
+class FakeResponse:
+    """Stand-in for an ``aiohttp`` response context manager."""
+
+    def __init__(
+        self,
+        status: int,
+        data=None,
+        headers: Optional[dict] = None,
+        chunks: List[bytes] = (),
+        gate: Optional[asyncio.Event] = None,
+    ):
+        self.status = status
+        self._data = data
+        self._gate = gate
+        self.headers = headers or {}
+        self.content = FakeStreamReader(list(chunks))
+
+    async def json(self):
+        return self._data
+
+    async def text(self):
+        return str(self._data)
+
+    async def read(self):
+        if isinstance(self._data, bytes):
+            return self._data
+        return serialization.dumps(self._data)
+
+    async def __aenter__(self):
+        if self._gate is not None:
+            await self._gate.wait()
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+
+class FakeSession:
+    """Stand-in for ``aiohttp.ClientSession`` recording requests."""
+
+    def __init__(
+        self,
+        status: int = 200,
+        data=COMPLETION,
+        chunks: Optional[List[bytes]] = None,
+        get_data=None,
+    ):
+        self.status = status
+        self.data = data
+        self.chunks = chunks or []
+        # Body of GET responses (model listings and health checks)
+        self.get_data = {"data": []} if get_data is None else get_data
+        self.requests = []
+        self.closed = False
+        # Raised by ``post`` instead of responding, when set
+        self.error = None
+        # Statuses returned before falling back to ``status``
+        self.queued_statuses = []
+        self.retry_after = "0"
+        # When set, responses are held back until the event fires
+        self.gate = None
+
+    def get(self, url, **kwargs):
+        self.requests.append((url, kwargs))
+        return FakeResponse(self.status, self.get_data)
+
+    def post(self, url, **kwargs):
+        self.requests.append((url, kwargs))
+        if self.error:
+            raise self.error
+        if self.queued_statuses:
+            return FakeResponse(
+                self.queued_statuses.pop(0),
+                {},
+                headers={"Retry-After": self.retry_after},
+            )
+        return FakeResponse(self.status, self.data, chunks=self.chunks, gate=self.gate)
+
+    async def close(self):
+        self.closed = True
+
+
+def sse_event(data: dict) -> bytes:
+    """Encode a server-sent event."""
+    return b"data: " + serialization.dumps(data) + b"\n\n"
+
+
+def delta(content: str, finish_reason: str = None) -> dict:
+    """Build a streamed chat completion chunk."""
+    return {
+        "choices": [{"delta": {"content": content}, "finish_reason": finish_reason}]
+    }
@@ -0,0 +1,74 @@
+"""Tests for shared provider helpers."""
+
+import pytest
+
+from src.ai.base_provider import (
+    AIResponse,
+    AIStreamUpdate,
+    ToolCall,
+    collect_stream,
+    estimate_tokens,
+)
+
+
+class TestEstimateTokens:
+    """Test rough token estimation."""
+
+    def test_empty_text(self):
+        """Test empty text has no tokens."""
+        assert estimate_tokens("") == 0
+
+    @pytest.mark.parametrize(
+        "text,expected",
+        [
+            ("hi", 1),
+            ("hello world", 3),
+            ("def foo():\n    return 1", 6),
+        ],
+    )
+    def test_rounds_up_per_four_characters(self, text, expected):
+        """Test estimate is one token per started block of 4 characters."""
+        assert estimate_tokens(text) == expected
+
+
+class TestCollectStream:
+    """Test concatenating streamed responses."""
+
+    async def test_joins_deltas_and_drains_stream(self):
+        """Test all deltas are joined and the stream runs to its end."""
+        finished = []
+
+        async def updates():
+            yield AIStreamUpdate(content_delta="print(")
+            yield AIStreamUpdate(content_delta="")
+            yield AIStreamUpdate(content_delta="1)")
+            yield AIStreamUpdate(is_complete=True)
+            finished.append(True)
+
+        assert await collect_stream(updates()) == "print(1)"
+        assert finished == [True]
+
+
+class TestValueObjects:
+    """Test per-request value objects."""
+
+    @pytest.mark.parametrize(
+        "obj",
+        [
+            AIResponse(content="hi", session_id="s", tokens_used=1, cost=0.0),
+            AIStreamUpdate(content_delta="hi"),
+            ToolCall(name="Read", input={}),
+        ],
+    )
+    def test_value_objects_use_slots(self, obj):
+        """Test no per-instance __dict__ is allocated."""
+        assert not hasattr(obj, "__dict__")
+
+    def test_default_metadata_not_shared(self):
+        """Test each response gets its own metadata dict."""
+        first = AIResponse(content="a", session_id="s", tokens_used=0, cost=0.0)
+        second = AIResponse(content="b", session_id="s", tokens_used=0, cost=0.0)
+
+        first.metadata["key"] = "value"
+
+        assert second.metadata == {}
@@ -0,0 +1,201 @@
+"""Tests for the Blackbox AI provider."""
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from src.ai.base_provider import ProviderStatus
+from src.ai.providers.blackbox.provider import BlackboxProvider, _encode_payload
+
+from .fakes import FakeResponse, FakeSession, FakeStreamReader
+
+
+@pytest.fixture
+def provider():
+    """Blackbox provider marked ready with no session attached."""
+    provider = BlackboxProvider(config=None)
+    provider.status = ProviderStatus.READY
+    return provider
+
+
+class TestBlackboxStreaming:
+    """Test Blackbox response streaming."""
+
+    async def test_stream_yields_chunks_as_they_arrive(self, provider):
+        """Test each body chunk becomes a stream update."""
+        provider.use_http_session(FakeSession(chunks=[b"def ", b"foo():"]))
+
+        updates = [
+            update async for update in provider.stream_message("hi", Path("/tmp"))
+        ]
+
+        assert [u.content_delta for u in updates[:-1]] == ["def ", "foo():"]
+        assert updates[-1].is_complete is True
+        assert provider.status == ProviderStatus.READY
+
+    async def test_stream_handles_split_multibyte_characters(self, provider):
+        """Test UTF-8 characters split across chunks decode correctly."""
+        encoded = "čau".encode("utf-8")
+        provider.use_http_session(FakeSession(chunks=[encoded[:1], encoded[1:]]))
+
+        content = "".join(
+            [
+                update.content_delta
+                async for update in provider.stream_message("hi", Path("/tmp"))
+            ]
+        )
+
+        assert content == "čau"
+
+    async def test_send_message_concatenates_stream(self, provider):
+        """Test send_message assembles the streamed body."""
+        provider.use_http_session(FakeSession(chunks=[b"  print(", b"1)\n"]))
+
+        response = await provider.send_message("hi", Path("/tmp"))
+
+        assert response.content == "print(1)"
+        assert response.provider_name == "blackbox"
+        assert provider.status == ProviderStatus.READY
+
+    async def test_payload_sent_as_encoded_json(self, provider):
+        """Test the request body is pre-encoded JSON containing the prompt."""
+        session = FakeSession(chunks=[b"ok"])
+        provider.use_http_session(session)
+
+        await provider.send_message("write a test", Path("/tmp"))
+
+        _, kwargs = session.requests[0]
+        payload = json.loads(kwargs["data"])
+        assert "write a test" in payload["messages"][0]["content"]
+        assert payload["codeModelMode"] is True
+        assert kwargs["headers"]["Content-Type"] == "application/json"
+
+    async def test_request_constants_are_shared(self, provider):
+        """Test headers and timeout are reused rather than rebuilt per call."""
+        session = FakeSession(chunks=[b"ok"])
+        provider.use_http_session(session)
+
+        await provider.send_message("one", Path("/tmp"))
+        await provider.send_message("two", Path("/tmp"))
+
+        (_, first), (_, second) = session.requests
+        assert first["headers"] is second["headers"] is BlackboxProvider._POST_HEADERS
+        assert first["timeout"] is second["timeout"] is BlackboxProvider._POST_TIMEOUT
+
+    async def test_error_status_marks_provider_errored(self, provider):
+        """Test non-200 responses raise and flag the provider."""
+        provider.use_http_session(FakeSession(status=500))
+
+        with pytest.raises(RuntimeError):
+            await provider.send_message("hi", Path("/tmp"))
+
+        assert provider.status == ProviderStatus.ERROR
+
+    async def test_closing_stream_early_keeps_provider_ready(self, provider):
+        """Test a stream abandoned mid-response does not leave the provider BUSY."""
+        provider.use_http_session(FakeSession(chunks=[b"def ", b"foo():"]))
+
+        stream = provider.stream_message("hi", Path("/tmp"))
+        await stream.__anext__()
+        await stream.aclose()
+
+        assert provider.status == ProviderStatus.READY
+        response = await provider.send_message("again", Path("/tmp"))
+        assert response.content == "def foo():"
+
+    async def test_cancelled_stream_keeps_provider_ready(self, provider):
+        """Test cancelling the consuming task does not leave the provider BUSY."""
+        started = asyncio.Event()
+
+        class SlowStreamReader(FakeStreamReader):
+            async def iter_chunked(self, size: int):
+                yield b"partial"
+                started.set()
+                await asyncio.sleep(3600)
+
+        class SlowSession(FakeSession):
+            def post(self, url, **kwargs):
+                response = FakeResponse(200)
+                response.content = SlowStreamReader([])
+                return response
+
+        session = SlowSession()
+        provider.use_http_session(session)
+
+        async def consume():
+            async for _ in provider.stream_message("hi", Path("/tmp")):
+                pass
+
+        task = asyncio.create_task(consume())
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert provider.status == ProviderStatus.READY
+
+    async def test_shared_session_not_closed_on_shutdown(self, provider):
+        """Test shutdown leaves a manager-owned session open."""
+        session = FakeSession()
+        provider.use_http_session(session)
+
+        await provider.shutdown()
+
+        assert session.closed is False
+
+
+class TestBlackboxCapabilities:
+    """Test Blackbox capability reporting."""
+
+    async def test_capabilities_are_cached(self, provider):
+        """Test repeated calls return the same capabilities object."""
+        first = await provider.get_capabilities()
+        second = await provider.get_capabilities()
+
+        assert first is second
+        assert first.supports_streaming is True
+
+
+class TestBlackboxPrompt:
+    """Test Blackbox prompt construction."""
+
+    def test_prompt_without_system_prompt(self, provider):
+        """Test the context preamble precedes the user prompt."""
+        prompt = provider._build_prompt("fix it", Path("/work"))
+
+        assert prompt == (
+            "Working Directory: /work\n\n"
+            "You are a code generation AI assistant. "
+            "Provide concise, working code solutions.\n\n\n"
+            "fix it"
+        )
+
+    def test_prompt_with_system_prompt(self, provider):
+        """Test the system prompt is placed first."""
+        prompt = provider._build_prompt("fix it", Path("/work"), "Be brief")
+
+        assert prompt.startswith("System: Be brief\n\nWorking Directory: /work\n\n")
+        assert prompt.endswith("\n\n\nfix it")
+
+
+class TestBlackboxPayload:
+    """Test the pre-serialized request template."""
+
+    def test_encoded_payload_matches_full_request(self):
+        """Test splicing the prompt yields the complete request document."""
+        content = 'print("čau")\n\t{}'
+
+        payload = json.loads(_encode_payload(content))
+
+        assert payload == {
+            "messages": [{"role": "user", "content": content}],
+            "previewToken": None,
+            "codeModelMode": True,
+            "agentMode": {},
+            "trendingAgentMode": {},
+            "isMicMode": False,
+            "isChromeExt": False,
+            "githubToken": None,
+        }
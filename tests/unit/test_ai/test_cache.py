@@ -0,0 +1,249 @@
+"""Tests for the AI response cache."""
+
+import asyncio
+import sys
+import time
+from types import SimpleNamespace
+
+from src.ai.base_provider import AIResponse, ToolCall
+from src.ai.cache import (
+    DEFAULT_EMBEDDING_MODEL,
+    CacheKeys,
+    LLMCache,
+    MemoryBackend,
+    ResponseCaches,
+    SemanticCache,
+    _sentence_transformer_embedder,
+)
+
+VOCABULARY = ("capital", "france", "paris", "sort", "list", "python")
+
+
+async def bag_of_words(text: str):
+    """Embed a text as word counts over a tiny fixed vocabulary."""
+    words = text.lower().replace("?", "").replace("'s", "").split()
+    return [float(words.count(word)) for word in VOCABULARY]
+
+
+def make_response(content: str) -> AIResponse:
+    return AIResponse(content=content, session_id="s", tokens_used=5, cost=0.1)
+
+
+def request_keys(caches, prompt, scope="m", temperature=0):
+    return caches.make_keys(
+        temperature, {"model": scope, "prompt": prompt}, {"model": scope}
+    )
+
+
+class TestMemoryBackend:
+    """Test the in-memory LRU backend."""
+
+    async def test_evicts_least_recently_used(self):
+        """Test the oldest untouched entry is dropped when full."""
+        backend = MemoryBackend(maxsize=2)
+        await backend.set("a", {"v": 1}, ttl=60)
+        await backend.set("b", {"v": 2}, ttl=60)
+        await backend.get("a")
+        await backend.set("c", {"v": 3}, ttl=60)
+
+        assert await backend.get("a") == {"v": 1}
+        assert await backend.get("b") is None
+        assert len(backend) == 2
+
+    async def test_expired_entries_are_misses(self):
+        """Test entries past their TTL are not returned."""
+        backend = MemoryBackend()
+        await backend.set("a", {"v": 1}, ttl=0)
+
+        assert await backend.get("a") is None
+        assert len(backend) == 0
+
+
+class TestLLMCache:
+    """Test response caching."""
+
+    def test_key_ignores_argument_order(self):
+        """Test equal requests produce equal keys."""
+        assert LLMCache.make_key(model="m", temperature=0) == LLMCache.make_key(
+            temperature=0, model="m"
+        )
+        assert LLMCache.make_key(model="m") != LLMCache.make_key(model="n")
+
+    def test_only_zero_temperature_is_cacheable(self):
+        """Test sampled requests are never cached."""
+        assert LLMCache.is_cacheable(0)
+        assert not LLMCache.is_cacheable(0.7)
+        assert not LLMCache.is_cacheable(None)
+
+    def test_from_config_can_disable_cache(self):
+        """Test a zero cache size disables caching."""
+        assert LLMCache.from_config(SimpleNamespace(ai_response_cache_size=0)) is None
+        assert isinstance(LLMCache.from_config(None), LLMCache)
+
+    async def test_round_trips_response(self):
+        """Test a cached response is rebuilt with the caller's session."""
+        cache = LLMCache()
+        response = AIResponse(
+            content="answer",
+            session_id="first",
+            tokens_used=10,
+            cost=0.5,
+            tool_calls=[ToolCall(name="Read", input={"path": "x"})],
+            metadata={"finish_reason": "stop"},
+            provider_name="deepseek",
+        )
+        await cache.set_response("key", response)
+
+        cached = await cache.get_response("key", session_id="second")
+
+        assert cached.content == "answer"
+        assert cached.session_id == "second"
+        assert cached.tokens_used == 10
+        assert cached.cost == 0.0
+        assert cached.tool_calls == response.tool_calls
+        assert cached.timestamp == response.timestamp
+        assert cached.metadata == {"finish_reason": "stop", "cache_hit": True}
+        assert "cache_hit" not in response.metadata
+
+
+class TestSemanticCache:
+    """Test similarity-based response caching."""
+
+    async def test_paraphrase_hits(self):
+        """Test a reworded prompt reuses the earlier answer."""
+        cache = SemanticCache(bag_of_words, threshold=0.9)
+        await cache.set_response("m", "capital of france?", make_response("Paris"))
+
+        cached = await cache.get_response("m", "France's capital?", session_id="new")
+
+        assert cached.content == "Paris"
+        assert cached.session_id == "new"
+        assert cached.metadata["cache_hit"] is True
+        assert cached.metadata["similarity"] >= 0.9
+
+    async def test_dissimilar_prompt_misses(self):
+        """Test unrelated prompts are not served from the cache."""
+        cache = SemanticCache(bag_of_words, threshold=0.9)
+        await cache.set_response("m", "capital of france?", make_response("Paris"))
+
+        assert await cache.get_response("m", "sort a python list") is None
+
+    async def test_scopes_are_isolated(self):
+        """Test entries only match within their own scope."""
+        cache = SemanticCache(bag_of_words)
+        await cache.set_response("a", "capital of france?", make_response("Paris"))
+
+        assert await cache.get_response("b", "capital of france?") is None
+
+    async def test_size_and_expiry_are_bounded(self):
+        """Test old and expired entries are dropped."""
+        cache = SemanticCache(bag_of_words, maxsize=1)
+        await cache.set_response("m", "capital of france?", make_response("Paris"))
+        await cache.set_response("m", "sort a python list", make_response("sorted"))
+
+        assert len(cache) == 1
+        assert await cache.get_response("m", "capital of france?") is None
+
+        cache.ttl = 0
+        await cache.set_response("m", "capital of france?", make_response("Paris"))
+        assert await cache.get_response("m", "capital of france?") is None
+
+    def test_disabled_by_default(self):
+        """Test the semantic cache is opt-in."""
+        assert SemanticCache.from_config(None) is None
+
+    async def test_caches_share_one_loaded_model(self, monkeypatch):
+        """Test every cache of a model name loads the model only once."""
+        loads = []
+
+        class FakeModel:
+            def __init__(self, name):
+                time.sleep(0.01)  # Widen the window for a racing load
+                loads.append(name)
+
+            def encode(self, text):
+                return SimpleNamespace(tolist=lambda: [1.0, 0.0])
+
+        monkeypatch.setitem(
+            sys.modules,
+            "sentence_transformers",
+            SimpleNamespace(SentenceTransformer=FakeModel),
+        )
+        _sentence_transformer_embedder.cache_clear()
+        config = SimpleNamespace(ai_semantic_cache_enabled=True)
+        try:
+            first = SemanticCache.from_config(config)
+            second = SemanticCache.from_config(config)
+            await asyncio.gather(first.embed("a"), second.embed("b"))
+        finally:
+            _sentence_transformer_embedder.cache_clear()
+
+        assert first._embed is second._embed
+        assert loads == [DEFAULT_EMBEDDING_MODEL]
+
+
+class TestResponseCaches:
+    """Test the lookup and store sequence shared by providers."""
+
+    async def test_repeated_request_hits_exact_cache(self):
+        """Test an identical request is answered from the exact cache."""
+        caches = ResponseCaches(LLMCache(), None)
+        keys = request_keys(caches, "capital of france?")
+        await caches.set(keys, "capital of france?", make_response("Paris"))
+
+        cached = await caches.get(keys, "capital of france?", session_id="new")
+
+        assert keys.semantic_scope is None
+        assert cached.content == "Paris"
+        assert cached.session_id == "new"
+
+    async def test_paraphrase_hits_semantic_cache_in_same_scope(self):
+        """Test a reworded prompt matches only under the same scope."""
+        caches = ResponseCaches(LLMCache(), SemanticCache(bag_of_words))
+        keys = request_keys(caches, "capital of france?")
+        await caches.set(keys, "capital of france?", make_response("Paris"))
+
+        paraphrase = request_keys(caches, "France's capital?")
+        cached = await caches.get(paraphrase, "France's capital?")
+        other = request_keys(caches, "France's capital?", scope="n")
+
+        assert paraphrase.request != keys.request
+        assert cached.content == "Paris"
+        assert cached.metadata["cache_hit"] is True
+        assert await caches.get(other, "France's capital?") is None
+
+    async def test_miss_and_store_embed_prompt_once(self):
+        """Test a semantic miss reuses its lookup embedding when storing."""
+        calls = []
+
+        async def counting_embed(text):
+            calls.append(text)
+            return await bag_of_words(text)
+
+        caches = ResponseCaches(None, SemanticCache(counting_embed))
+        for prompt in ("capital of france?", "sort a python list"):
+            keys = request_keys(caches, prompt)
+            assert await caches.get(keys, prompt) is None
+            await caches.set(keys, prompt, make_response("answer"))
+
+        assert calls == ["capital of france?", "sort a python list"]
+        assert len(caches.semantic) == 2
+
+    async def test_sampled_request_is_never_cached(self):
+        """Test a non-zero temperature bypasses both caches."""
+        caches = ResponseCaches(LLMCache(), SemanticCache(bag_of_words))
+        keys = request_keys(caches, "capital of france?", temperature=0.7)
+        await caches.set(keys, "capital of france?", make_response("Paris"))
+
+        assert keys == CacheKeys()
+        assert len(caches.semantic) == 0
+        assert await caches.get(keys, "capital of france?") is None
+
+    async def test_disabled_caches_miss(self):
+        """Test lookups and stores are no-ops with both caches disabled."""
+        caches = ResponseCaches.from_config(SimpleNamespace(ai_response_cache_size=0))
+        keys = request_keys(caches, "capital of france?")
+        await caches.set(keys, "capital of france?", make_response("Paris"))
+
+        assert caches.exact is None and caches.semantic is None
+        assert await caches.get(keys, "capital of france?") is None
@@ -0,0 +1,68 @@
+"""Tests for the Claude AI provider wrapper."""
+
+from unittest.mock import patch
+
+import pytest
+
+from src.ai.providers.claude.provider import ClaudeProvider
+from src.claude.integration import ClaudeResponse
+from src.config.loader import create_test_config
+
+
+@pytest.fixture
+def provider(tmp_path):
+    """Claude provider with the facade patched out."""
+    config = create_test_config(approved_directory=str(tmp_path))
+    with patch("src.ai.providers.claude.provider.ClaudeFacade"):
+        yield ClaudeProvider(config)
+
+
+@pytest.fixture
+def claude_response():
+    """Sample Claude integration response."""
+    return ClaudeResponse(
+        content="Done",
+        session_id="session-1",
+        cost=0.02,
+        duration_ms=1500,
+        num_turns=2,
+        tools_used=[{"name": "Read", "timestamp": 1.0}],
+    )
+
+
+class TestConvertClaudeResponse:
+    """Test conversion to the universal response format."""
+
+    def test_metadata_uses_structured_fields(self, provider, claude_response):
+        """Test metadata carries cheap structured fields, not a raw dump."""
+        response = provider._convert_claude_response(claude_response)
+
+        assert "raw_response" not in response.metadata
+        assert response.metadata["num_turns"] == 2
+        assert response.metadata["duration_ms"] == 1500
+        assert response.metadata["is_error"] is False
+        assert response.content == "Done"
+        assert response.session_id == "session-1"
+
+    def test_reported_cost_is_used(self, provider, claude_response):
+        """Test the cost reported by Claude takes precedence."""
+        response = provider._convert_claude_response(claude_response)
+
+        assert response.cost == 0.02
+
+    def test_cost_falls_back_to_blended_rate(self, provider, claude_response):
+        """Test token-based cost is a single blended-rate multiply."""
+        claude_response.cost = 0.0
+        claude_response.tokens_used = 1001
+
+        response = provider._convert_claude_response(claude_response)
+
+        assert response.tokens_used == 1001
+        assert response.cost == pytest.approx(1001 * 0.009 / 1000)
+
+    def test_executed_tools_are_not_tool_calls(self, provider, claude_response):
+        """Test tools Claude already ran are reported by name only."""
+        response = provider._convert_claude_response(claude_response)
+
+        assert response.tool_calls is None
+        assert response.metadata["tools_used"] == ["Read"]
@@ -0,0 +1,588 @@
+"""Tests for the DeepSeek AI provider."""
+
+import asyncio
+import gzip
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from src.ai import serialization
+from src.ai.base_provider import ProviderStatus
+from src.ai.providers.deepseek.provider import (
+    DEEPSEEK_SYSTEM_PROMPT,
+    GZIP_MIN_BODY_BYTES,
+    HEALTH_CHECK_TTL_SECONDS,
+    DeepSeekProvider,
+)
+from src.ai.rate_limit import RATE_LIMIT_MAX_RETRIES
+
+from .fakes import COMPLETION, FakeResponse, FakeSession, delta, sse_event
+
+
+@pytest.fixture
+def provider(session):
+    """DeepSeek provider marked ready with a fake session attached."""
+    provider = DeepSeekProvider(config=None)
+    provider._session = session
+    provider.status = ProviderStatus.READY
+    return provider
+
+
+class TestDeepSeekResponseCache:
+    """Test caching of deterministic DeepSeek requests."""
+
+    async def test_repeated_deterministic_request_is_cached(self, provider, session):
+        """Test a temperature=0 repeat is served without an API call."""
+        first = await provider.send_message("hi", Path("/tmp"), temperature=0)
+        second = await provider.send_message("hi", Path("/tmp"), temperature=0)
+
+        assert len(session.requests) == 1
+        assert second.content == first.content == "print(1)"
+        assert second.metadata["cache_hit"] is True
+        assert provider.status == ProviderStatus.READY
+
+    async def test_sampled_requests_are_not_cached(self, provider, session):
+        """Test requests with the default temperature always hit the API."""
+        await provider.send_message("hi", Path("/tmp"))
+        await provider.send_message("hi", Path("/tmp"))
+
+        assert len(session.requests) == 2
+
+    async def test_failed_requests_are_not_cached(self, provider, session):
+        """Test error responses are not stored."""
+        session.status = 500
+        with pytest.raises(RuntimeError):
+            await provider.send_message("hi", Path("/tmp"), temperature=0)
+
+        session.status = 200
+        provider.status = ProviderStatus.READY
+        await provider.send_message("hi", Path("/tmp"), temperature=0)
+
+        assert len(session.requests) == 2
+
+
+class TestDeepSeekRequestCoalescing:
+    """Test sharing identical in-flight requests."""
+
+    async def send_concurrently(self, provider, session, **kwargs):
+        session.gate = asyncio.Event()
+        tasks = [
+            asyncio.create_task(
+                provider.send_message("hi", Path("/tmp"), session_id=sid, **kwargs)
+            )
+            for sid in ("a", "b")
+        ]
+        await asyncio.sleep(0)
+        session.gate.set()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def test_identical_requests_share_one_call(self, provider, session):
+        """Test a concurrent duplicate waits for the running request."""
+        first, second = await self.send_concurrently(provider, session, temperature=0)
+
+        assert len(session.requests) == 1
+        assert first.content == second.content == "print(1)"
+        assert (first.session_id, second.session_id) == ("a", "b")
+        assert second.metadata["coalesced"] is True
+        assert "coalesced" not in first.metadata
+        assert provider._inflight == {}
+
+    async def test_sampled_requests_are_not_shared(self, provider, session):
+        """Test non-deterministic duplicates each reach the API."""
+        await self.send_concurrently(provider, session)
+
+        assert len(session.requests) == 2
+
+    async def test_failure_is_shared(self, provider, session):
+        """Test followers receive the leader's error."""
+        session.status = 500
+
+        results = await self.send_concurrently(provider, session, temperature=0)
+
+        assert len(session.requests) == 1
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert provider._inflight == {}
+
+    async def test_leader_cancellation_fails_followers(self, provider, session):
+        """Test followers get an error, not a cancellation, if the leader stops."""
+        session.gate = asyncio.Event()
+        leader = asyncio.create_task(
+            provider.send_message("hi", Path("/tmp"), temperature=0)
+        )
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(
+            provider.send_message("hi", Path("/tmp"), temperature=0)
+        )
+        await asyncio.sleep(0)
+
+        leader.cancel()
+
+        with pytest.raises(RuntimeError, match="cancelled"):
+            await follower
+        assert leader.cancelled()
+
+
+class TestDeepSeekConcurrentStatus:
+    """Test the shared status while several calls run at once."""
+
+    async def open_stream(self, provider, session):
+        session.chunks = [sse_event(delta("a")), sse_event(delta("b"))]
+        stream = provider.stream_message("hi", Path("/tmp"))
+        await stream.__anext__()
+        return stream
+
+    async def test_busy_until_last_call_finishes(self, provider, session):
+        """Test a finished call does not mark the provider ready early."""
+        stream = await self.open_stream(provider, session)
+
+        await provider.send_message("hi", Path("/tmp"))
+        assert provider.status == ProviderStatus.BUSY
+
+        await stream.aclose()
+        assert provider.status == ProviderStatus.READY
+
+    async def test_stream_starts_while_send_is_running(self, provider, session):
+        """Test streaming is accepted while the provider is busy."""
+        session.gate = asyncio.Event()
+        send = asyncio.create_task(provider.send_message("hi", Path("/tmp")))
+        await asyncio.sleep(0)
+        assert provider.status == ProviderStatus.BUSY
+
+        session.gate.set()
+        session.chunks = [sse_event(delta("ok", "stop"))]
+        updates = [u async for u in provider.stream_message("hi", Path("/tmp"))]
+        await send
+
+        assert "".join(u.content_delta for u in updates) == "ok"
+        assert provider.status == ProviderStatus.READY
+
+    async def test_failure_does_not_block_concurrent_calls(self, provider, session):
+        """Test one failed call leaves the provider usable for its peers."""
+        stream = await self.open_stream(provider, session)
+
+        session.status = 500
+        with pytest.raises(RuntimeError):
+            await provider.send_message("hi", Path("/tmp"))
+        assert provider.status == ProviderStatus.BUSY
+
+        session.status = 200
+        response = await provider.send_message("hi", Path("/tmp"))
+        assert response.content == "print(1)"
+
+        await stream.aclose()
+        assert provider.status == ProviderStatus.READY
+
+    async def test_failure_of_only_call_marks_error(self, provider, session):
+        """Test a failure with nothing else running still flags the provider."""
+        session.status = 500
+
+        with pytest.raises(RuntimeError):
+            await provider.send_message("hi", Path("/tmp"))
+
+        assert provider.status == ProviderStatus.ERROR
+
+
+class TestDeepSeekPromptPrefix:
+    """Test request layout for server-side prefix caching."""
+
+    async def test_default_system_prompt_is_a_constant_prefix(self, provider, session):
+        """Test the working directory follows the fixed system prompt."""
+        await provider.send_message("hi", Path("/one"))
+        await provider.send_message("hi", Path("/two"))
+
+        first, second = [
+            serialization.loads(kwargs["data"])["messages"]
+            for _, kwargs in session.requests
+        ]
+        assert (
+            first[0]
+            == second[0]
+            == {
+                "role": "system",
+                "content": DEEPSEEK_SYSTEM_PROMPT,
+            }
+        )
+        assert first[1]["content"] == "Working directory: /one"
+        assert second[1]["content"] == "Working directory: /two"
+        assert first[2] == {"role": "user", "content": "hi"}
+
+    async def test_custom_system_prompt_replaces_default(self, provider, session):
+        """Test an explicit system prompt is sent on its own."""
+        await provider.send_message("hi", Path("/one"), system_prompt="Be brief")
+
+        messages = serialization.loads(session.requests[0][1]["data"])["messages"]
+        assert messages == [
+            {"role": "system", "content": "Be brief"},
+            {"role": "user", "content": "hi"},
+        ]
+
+
+class TestDeepSeekHttpSession:
+    """Test sharing the manager's HTTP session."""
+
+    async def test_initialize_keeps_shared_session(self, session):
+        """Test a shared session is used with per-request auth headers."""
+        provider = DeepSeekProvider(SimpleNamespace(deepseek_api_key="sk-test"))
+        provider.use_http_session(session)
+
+        assert await provider.initialize() is True
+        await provider.send_message("hi", Path("/tmp"))
+
+        assert provider._session is session
+        headers = session.requests[0][1]["headers"]
+        assert headers["Authorization"] == "Bearer sk-test"
+
+        await provider.shutdown()
+        assert session.closed is False
+
+    async def test_initialize_creates_own_session(self):
+        """Test a private pooled session is created and closed on shutdown."""
+        provider = DeepSeekProvider(SimpleNamespace(deepseek_api_key="sk-test"))
+
+        assert await provider.initialize() is True
+        own_session = provider._session
+
+        await provider.shutdown()
+        assert own_session.closed is True
+
+
+class TestDeepSeekRateLimiting:
+    """Test handling of DeepSeek rate limits."""
+
+    async def test_rate_limited_request_is_retried(self, provider, session):
+        """Test a 429 response is retried after Retry-After."""
+        session.queued_statuses = [429, 429]
+
+        response = await provider.send_message("hi", Path("/tmp"))
+
+        assert response.content == "print(1)"
+        assert len(session.requests) == 3
+
+    async def test_gives_up_after_max_retries(self, provider, session):
+        """Test persistent rate limiting surfaces an error."""
+        session.queued_statuses = [429] * (RATE_LIMIT_MAX_RETRIES + 1)
+
+        with pytest.raises(RuntimeError, match="rate limit"):
+            await provider.send_message("hi", Path("/tmp"))
+
+        assert len(session.requests) == RATE_LIMIT_MAX_RETRIES + 1
+        assert provider.status == ProviderStatus.ERROR
+
+    async def test_long_retry_after_fails_without_waiting(self, provider, session):
+        """Test a Retry-After beyond the longest honoured wait is not slept."""
+        session.queued_statuses = [429]
+        session.retry_after = "3600"
+
+        with pytest.raises(RuntimeError, match="rate limit"):
+            await asyncio.wait_for(provider.send_message("hi", Path("/tmp")), 1)
+
+        assert len(session.requests) == 1
+
+
+class FakeBatchSession(FakeSession):
+    """Fake session implementing the files/batches endpoints."""
+
+    def __init__(self, final_status: str = "completed"):
+        super().__init__()
+        self.final_status = final_status
+        self.polls = 0
+        self.uploaded = None
+        # Result lines per file, as split by the batch API
+        self.files = {
+            "file-out": [
+                {
+                    "custom_id": "1",
+                    "response": {"status_code": 200, "body": COMPLETION},
+                },
+            ],
+            "file-err": [
+                {
+                    "custom_id": "0",
+                    "response": {"status_code": 400, "body": {}},
+                    "error": {"message": "bad request"},
+                },
+            ],
+        }
+
+    def request(self, method, url, **kwargs):
+        self.requests.append((method, url, kwargs))
+        if url.endswith("/files"):
+            self.uploaded = kwargs["data"]
+            return FakeResponse(200, {"id": "file-in"})
+        if url.endswith("/batches"):
+            return FakeResponse(200, {"id": "batch-1", "status": "validating"})
+        self.polls += 1
+        status = "in_progress" if self.polls < 2 else self.final_status
+        batch = {"id": "batch-1", "status": status}
+        if "file-out" in self.files:
+            batch["output_file_id"] = "file-out"
+        if "file-err" in self.files:
+            batch["error_file_id"] = "file-err"
+        return FakeResponse(200, batch)
+
+    def get(self, url, **kwargs):
+        self.requests.append(("GET", url, kwargs))
+        file_id = url.split("/")[-2]
+        if file_id not in self.files:
+            return FakeResponse(404, b"")
+        output = b"\n".join(serialization.dumps(line) for line in self.files[file_id])
+        return FakeResponse(200, output)
+
+
+class TestDeepSeekOfflineBatch:
+    """Test bulk requests through the batch API."""
+
+    @pytest.fixture
+    def batch_session(self, provider):
+        session = FakeBatchSession()
+        provider._session = session
+        provider._headers = {"Authorization": "Bearer sk-test"}
+        return session
+
+    async def test_results_are_returned_in_request_order(self, provider, batch_session):
+        """Test results are matched to requests by custom_id."""
+        results = await provider.send_offline_batch(
+            [
+                {"prompt": "first", "working_directory": Path("/tmp")},
+                {"prompt": "second", "working_directory": Path("/tmp")},
+            ],
+            poll_interval=0,
+        )
+
+        assert isinstance(results[0], RuntimeError)
+        assert "bad request" in str(results[0])
+        assert results[1].content == "print(1)"
+        assert results[1].metadata["batch_id"] == "batch-1"
+        assert batch_session.polls == 2
+        assert provider.status == ProviderStatus.READY
+
+    async def test_batch_without_output_file_reports_errors(
+        self, provider, batch_session
+    ):
+        """Test a batch whose requests all failed returns their errors."""
+        del batch_session.files["file-out"]
+
+        results = await provider.send_offline_batch(
+            [
+                {"prompt": "first", "working_directory": Path("/tmp")},
+                {"prompt": "second", "working_directory": Path("/tmp")},
+            ],
+            poll_interval=0,
+        )
+
+        assert "bad request" in str(results[0])
+        assert "no result" in str(results[1])
+
+    async def test_failed_batch_raises(self, provider, batch_session):
+        """Test a failed batch job surfaces an error."""
+        batch_session.final_status = "failed"
+
+        with pytest.raises(RuntimeError, match="failed"):
+            await provider.send_offline_batch(
+                [{"prompt": "first", "working_directory": Path("/tmp")}],
+                poll_interval=0,
+            )
+
+
+class TestDeepSeekStreaming:
+    """Test parsing of DeepSeek's server-sent event stream."""
+
+    async def collect(self, provider):
+        return [update async for update in provider.stream_message("hi", Path("/tmp"))]
+
+    async def test_stream_sends_same_payload_as_send(self, provider, session):
+        """Test streaming reuses the send_message request skeleton."""
+        session.chunks = [sse_event(delta("", "stop"))]
+
+        await provider.send_message("hi", Path("/tmp"))
+        await self.collect(provider)
+
+        sent, streamed = [serialization.loads(kw["data"]) for _, kw in session.requests]
+        assert streamed.pop("stream") is True
+        assert streamed == sent
+
+    async def test_stream_yields_deltas_until_finished(self, provider, session):
+        """Test each event delta becomes an update and finish completes."""
+        session.chunks = [
+            sse_event(delta("def ")),
+            sse_event(delta("foo():")),
+            sse_event(delta("", "stop")),
+            sse_event(delta("ignored")),
+        ]
+
+        updates = await self.collect(provider)
+
+        assert [u.content_delta for u in updates] == ["def ", "foo():", ""]
+        assert updates[-1].is_complete is True
+        assert provider.status == ProviderStatus.READY
+
+    async def test_events_split_across_chunks(self, provider, session):
+        """Test events and multi-byte characters split across reads."""
+        body = sse_event(delta("čau")) + b": keep-alive\r\n\r\n" + sse_event(delta("!"))
+        session.chunks = [body[:9], body[9:20], body[20:]]
+
+        updates = await self.collect(provider)
+
+        assert "".join(u.content_delta for u in updates) == "čau!"
+
+    async def test_last_event_without_trailing_newline(self, provider, session):
+        """Test an event cut off by the end of the body is still delivered."""
+        session.chunks = [
+            sse_event(delta("def ")),
+            sse_event(delta("foo():")).rstrip(b"\r\n"),
+        ]
+
+        updates = await self.collect(provider)
+
+        assert "".join(u.content_delta for u in updates) == "def foo():"
+
+    async def test_done_and_malformed_events_are_skipped(self, provider, session):
+        """Test [DONE] and invalid JSON do not break the stream."""
+        session.chunks = [
+            b"data: {not json\n\n",
+            sse_event(delta("ok")),
+            b"data: [DONE]\r\n\r\n",
+        ]
+
+        updates = await self.collect(provider)
+
+        assert [u.content_delta for u in updates] == ["ok"]
+
+
+class TestDeepSeekEncoding:
+    """Test request encoding."""
+
+    async def test_payload_sent_as_encoded_json(self, provider, session):
+        """Test the request body is pre-encoded JSON bytes."""
+        provider._headers = {"Content-Type": "application/json"}
+
+        await provider.send_message("hi", Path("/tmp"), max_tokens=10)
+
+        kwargs = session.requests[0][1]
+        assert isinstance(kwargs["data"], bytes)
+        assert "json" not in kwargs
+        assert serialization.loads(kwargs["data"])["max_tokens"] == 10
+        assert kwargs["headers"]["Content-Type"] == "application/json"
+        assert "Content-Encoding" not in kwargs["headers"]
+
+    async def test_defaults_fill_unset_parameters(self, provider, session):
+        """Test defaults apply and only known parameters override them."""
+        await provider.send_message("hi", Path("/tmp"), top_p=0.5, stream_id="x")
+
+        payload = serialization.loads(session.requests[0][1]["data"])
+        assert payload["model"] == "deepseek-coder"
+        assert payload["max_tokens"] == 4096
+        assert payload["temperature"] == 0.7
+        assert payload["top_p"] == 0.5
+        assert "stream_id" not in payload
+
+    async def test_initialize_sets_default_model(self, session):
+        """Test the configured model becomes the request default."""
+        provider = DeepSeekProvider(
+            SimpleNamespace(deepseek_api_key="sk-test", deepseek_model="deepseek-chat")
+        )
+        provider.use_http_session(session)
+        await provider.initialize()
+
+        await provider.send_message("hi", Path("/tmp"))
+
+        payload = serialization.loads(session.requests[0][1]["data"])
+        assert payload["model"] == "deepseek-chat"
+
+    async def test_large_payload_is_gzipped(self, session):
+        """Test bodies over the threshold are sent gzip-compressed."""
+        provider = DeepSeekProvider(SimpleNamespace(deepseek_api_key="sk-test"))
+        provider.use_http_session(session)
+        await provider.initialize()
+        prompt = "x = 1\n" * GZIP_MIN_BODY_BYTES
+
+        await provider.send_message(prompt, Path("/tmp"))
+
+        kwargs = session.requests[0][1]
+        assert kwargs["headers"]["Content-Encoding"] == "gzip"
+        assert kwargs["headers"]["Authorization"] == "Bearer sk-test"
+        assert len(kwargs["data"]) < len(prompt)
+        payload = serialization.loads(gzip.decompress(kwargs["data"]))
+        assert payload["messages"][-1]["content"] == prompt
+
+    async def test_compression_can_be_disabled(self, session):
+        """Test large bodies are sent as-is when compression is off."""
+        provider = DeepSeekProvider(
+            SimpleNamespace(
+                deepseek_api_key="sk-test", deepseek_compress_requests=False
+            )
+        )
+        provider.use_http_session(session)
+        await provider.initialize()
+
+        await provider.send_message("x" * GZIP_MIN_BODY_BYTES, Path("/tmp"))
+
+        kwargs = session.requests[0][1]
+        assert "Content-Encoding" not in kwargs["headers"]
+        assert serialization.loads(kwargs["data"])["model"] == "deepseek-coder"
+
+
+class TestDeepSeekCapabilities:
+    """Test DeepSeek capability reporting."""
+
+    async def test_capabilities_are_cached(self, provider):
+        """Test repeated calls return the same capabilities object."""
+        first = await provider.get_capabilities()
+
+        assert await provider.get_capabilities() is first
+        assert first.rate_limit_requests_per_minute == 60
+
+    async def test_initialize_refreshes_reported_model(self, session):
+        """Test a configured model replaces cached capabilities."""
+        provider = DeepSeekProvider(
+            SimpleNamespace(deepseek_api_key="sk-test", deepseek_model="deepseek-chat")
+        )
+        provider.use_http_session(session)
+        stale = await provider.get_capabilities()
+
+        await provider.initialize()
+        fresh = await provider.get_capabilities()
+
+        assert stale.metadata["model"] == "deepseek-coder"
+        assert fresh.metadata["model"] == "deepseek-chat"
+
+
+class TestDeepSeekHealthCheck:
+    """Test DeepSeek health checks."""
+
+    @pytest.fixture(autouse=True)
+    def api_key(self, provider):
+        provider._api_key = "sk-test"
+
+    async def test_lists_models_instead_of_completing(self, provider, session):
+        """Test the probe is a free GET of the models endpoint."""
+        assert await provider.health_check() is True
+
+        url, _ = session.requests[0]
+        assert url.endswith("/models")
+
+    async def test_result_is_cached(self, provider, session):
+        """Test a fresh result is reused without another request."""
+        await provider.health_check()
+        await provider.health_check()
+
+        assert len(session.requests) == 1
+
+    async def test_concurrent_checks_share_one_request(self, provider, session):
+        """Test simultaneous callers collapse into one probe."""
+        results = await asyncio.gather(*(provider.health_check() for _ in range(5)))
+
+        assert results == [True] * 5
+        assert len(session.requests) == 1
+
+    async def test_stale_result_is_refreshed(self, provider, session):
+        """Test an expired result triggers a new probe."""
+        session.status = 401
+        assert await provider.health_check() is False
+
+        provider._last_health = (time.monotonic() - HEALTH_CHECK_TTL_SECONDS, False)
+        session.status = 200
+        assert await provider.health_check() is True
+        assert len(session.requests) == 2
@@ -0,0 +1,211 @@
+"""Tests for the Google Gemini AI provider."""
+
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from src.ai.base_provider import ProviderStatus
+from src.ai.providers.gemini.provider import (
+    GEMINI_PROMPT_PREAMBLE,
+    GeminiProvider,
+    _build_prompt_cached,
+)
+
+
+class FakeModel:
+    """Stand-in for ``genai.GenerativeModel`` recording calls."""
+
+    def __init__(self, text: str = "print(1)"):
+        self.text = text
+        self.calls = []
+        self.usage_metadata = None
+
+    async def generate_content_async(self, prompt, stream=False, **kwargs):
+        self.calls.append((prompt, kwargs))
+        if stream:
+            return self._stream()
+        return SimpleNamespace(text=self.text, usage_metadata=self.usage_metadata)
+
+    async def _stream(self):
+        for word in self.text.split(" "):
+            await asyncio.sleep(0)  # Waiting on the network
+            yield SimpleNamespace(text=word)
+
+
+@pytest.fixture
+def model():
+    """Fake Gemini model."""
+    return FakeModel()
+
+
+@pytest.fixture
+def provider(model):
+    """Gemini provider marked ready with a fake model attached."""
+    provider = GeminiProvider(config=None)
+    provider._model = model
+    provider.status = ProviderStatus.READY
+    return provider
+
+
+class TestGeminiResponseCache:
+    """Test caching of deterministic Gemini requests."""
+
+    async def test_repeated_deterministic_request_is_cached(self, provider, model):
+        """Test a temperature=0 repeat is served without calling the model."""
+        await provider.send_message("hi", Path("/tmp"), temperature=0)
+        second = await provider.send_message("hi", Path("/tmp"), temperature=0)
+
+        assert len(model.calls) == 1
+        assert model.calls[0][1] == {"generation_config": {"temperature": 0}}
+        assert second.metadata["cache_hit"] is True
+
+    async def test_default_requests_are_not_cached(self, provider, model):
+        """Test requests without an explicit temperature are not cached."""
+        await provider.send_message("hi", Path("/tmp"))
+        await provider.send_message("hi", Path("/tmp"))
+
+        assert len(model.calls) == 2
+        assert model.calls[0][1] == {}
+
+
+class TestGeminiPromptPrefix:
+    """Test prompt layout for implicit prefix caching."""
+
+    def test_prompt_starts_with_constant_preamble(self, provider):
+        """Test request-specific context follows the fixed instructions."""
+        prompt = provider._build_prompt("fix it", Path("/work"), "Be brief")
+
+        assert prompt.startswith(GEMINI_PROMPT_PREAMBLE)
+        assert prompt.index("Be brief") < prompt.index("/work") < prompt.index("fix it")
+        assert prompt.endswith("\nUser: fix it")
+
+    @pytest.mark.parametrize("system_prompt", [None, "Be brief"])
+    def test_prompt_layout_is_unchanged(self, provider, system_prompt):
+        """Test the single-expression prompt matches the original layout."""
+        parts = [GEMINI_PROMPT_PREAMBLE]
+        if system_prompt:
+            parts.append(f"System Instructions: {system_prompt}\n")
+        parts.append("Working Directory: /work\n")
+        parts.append("\nUser: fix it")
+
+        prompt = provider._build_prompt("fix it", Path("/work"), system_prompt)
+
+        assert prompt == "\n".join(parts)
+
+    def test_repeated_prompt_is_memoized(self, provider):
+        """Test identical inputs reuse the assembled prompt."""
+        _build_prompt_cached.cache_clear()
+
+        first = provider._build_prompt("fix it", Path("/work"))
+        second = provider._build_prompt("fix it", "/work")
+
+        assert second is first
+        assert _build_prompt_cached.cache_info().hits == 1
+
+
+class TestGeminiAsyncApi:
+    """Test Gemini requests use the SDK's async API."""
+
+    async def test_send_awaits_async_generation(self, provider, model):
+        """Test send_message uses generate_content_async."""
+        response = await provider.send_message("hi", Path("/tmp"))
+
+        assert response.content == "print(1)"
+        assert provider.status == ProviderStatus.READY
+
+    async def test_stream_iterates_async_chunks(self, provider, model):
+        """Test stream_message yields each async chunk."""
+        model.text = "a b"
+
+        updates = [
+            update async for update in provider.stream_message("hi", Path("/tmp"))
+        ]
+
+        assert [u.content_delta for u in updates] == ["a", "b", ""]
+        assert updates[-1].is_complete is True
+        assert provider.status == ProviderStatus.READY
+
+    async def test_stream_does_not_block_event_loop(self, provider, model):
+        """Test other tasks run while chunks are awaited."""
+        model.text = "a b c"
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(len(ticks))
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        try:
+            async for update in provider.stream_message("hi", Path("/tmp")):
+                if update.content_delta:
+                    assert ticks, "ticker starved while streaming"
+                    ticks.clear()
+        finally:
+            task.cancel()
+
+
+class TestGeminiCapabilities:
+    """Test Gemini capability reporting."""
+
+    async def test_capabilities_are_cached(self, provider):
+        """Test repeated calls return the same capabilities object."""
+        first = await provider.get_capabilities()
+
+        assert await provider.get_capabilities() is first
+        assert first.supports_streaming is True
+
+
+class TestGeminiTokenUsage:
+    """Test token accounting."""
+
+    async def test_uses_reported_usage_metadata(self, provider, model):
+        """Test token counts come from the API's usage metadata."""
+        model.usage_metadata = SimpleNamespace(
+            prompt_token_count=12, candidates_token_count=30, total_token_count=42
+        )
+
+        response = await provider.send_message("hi", Path("/tmp"))
+
+        assert response.tokens_used == 42
+        assert response.metadata["prompt_tokens"] == 12
+        assert response.metadata["completion_tokens"] == 30
+
+    async def test_estimates_without_usage_metadata(self, provider, model):
+        """Test a missing usage report falls back to an estimate."""
+        model.text = "x" * 40
+
+        response = await provider.send_message("hi", Path("/tmp"))
+
+        assert response.tokens_used == 10
+        assert response.metadata["prompt_tokens"] == 0
+
+
+class TestGeminiInitialization:
+    """Test provider start-up."""
+
+    async def test_missing_sdk_marks_offline(self):
+        """Test initialization fails cleanly without google-generativeai."""
+        provider = GeminiProvider(SimpleNamespace(gemini_api_key="key"))
+
+        with patch("src.ai.providers.gemini.provider.genai", None):
+            assert await provider.initialize() is False
+
+        assert provider.status == ProviderStatus.OFFLINE
+
+    async def test_configures_module_level_sdk(self, model):
+        """Test the SDK imported at module load is configured and used."""
+        genai = SimpleNamespace(
+            configure=lambda api_key: None,
+            GenerativeModel=lambda name: model,
+        )
+        provider = GeminiProvider(SimpleNamespace(gemini_api_key="key"))
+
+        with patch("src.ai.providers.gemini.provider.genai", genai):
+            assert await provider.initialize() is True
+
+        assert provider._model is model
+        assert provider.status == ProviderStatus.READY
@@ -0,0 +1,254 @@
+"""Tests for the Groq AI provider."""
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from src.ai import serialization
+from src.ai.base_provider import ProviderStatus
+from src.ai.providers.groq.provider import GroqProvider, _system_message
+
+from .fakes import delta, sse_event
+
+
+@pytest.fixture
+def provider(session):
+    """Groq provider marked ready with a fake session attached."""
+    provider = GroqProvider(config=None)
+    provider._session = session
+    provider.status = ProviderStatus.READY
+    return provider
+
+
+class TestGroqResponseCache:
+    """Test caching of deterministic Groq requests."""
+
+    async def test_repeated_deterministic_request_is_cached(self, provider, session):
+        """Test a temperature=0 repeat is served without an API call."""
+        first = await provider.send_message("hi", Path("/tmp"), temperature=0)
+        second = await provider.send_message(
+            "hi", Path("/tmp"), session_id="s2", temperature=0
+        )
+
+        assert len(session.requests) == 1
+        assert second.content == first.content == "print(1)"
+        assert second.metadata["cache_hit"] is True
+        assert second.session_id == "s2"
+        assert provider.status == ProviderStatus.READY
+
+    async def test_sampled_requests_are_not_cached(self, provider, session):
+        """Test requests with the default temperature always hit the API."""
+        await provider.send_message("hi", Path("/tmp"))
+        await provider.send_message("hi", Path("/tmp"))
+
+        assert len(session.requests) == 2
+
+    async def test_failed_requests_are_not_cached(self, provider, session):
+        """Test error responses are not stored."""
+        session.status = 500
+        with pytest.raises(RuntimeError):
+            await provider.send_message("hi", Path("/tmp"), temperature=0)
+
+        session.status = 200
+        provider.status = ProviderStatus.READY
+        await provider.send_message("hi", Path("/tmp"), temperature=0)
+
+        assert len(session.requests) == 2
+
+
+class TestGroqSystemPrompt:
+    """Test the default system prompt."""
+
+    async def test_send_and_stream_share_default_prompt(self, provider, session):
+        """Test both request kinds send the same per-directory prompt."""
+        await provider.send_message("hi", Path("/work"))
+        provider.status = ProviderStatus.READY
+        async for _ in provider.stream_message("hi", Path("/work")):
+            pass
+
+        sent, streamed = [
+            serialization.loads(kwargs["data"])["messages"][0]
+            for _, kwargs in session.requests
+        ]
+        assert sent == streamed
+        assert sent["role"] == "system"
+        assert "Working directory: /work" in sent["content"]
+
+    def test_system_message_is_reused(self, provider):
+        """Test requests in the same context share one system message."""
+        _system_message.cache_clear()
+
+        first = provider._build_messages("one", Path("/work"))
+        second = provider._build_messages("two", Path("/work"))
+
+        assert first[0] is second[0]
+        assert first[1] == {"role": "user", "content": "one"}
+        assert _system_message.cache_info().hits == 1
+
+    def test_custom_system_prompt_replaces_default(self, provider):
+        """Test an explicit system prompt is sent on its own."""
+        messages = provider._build_messages("hi", Path("/work"), "Be brief")
+
+        assert messages == [
+            {"role": "system", "content": "Be brief"},
+            {"role": "user", "content": "hi"},
+        ]
+
+
+class TestGroqEncoding:
+    """Test request encoding."""
+
+    async def test_timeouts_are_shared(self, provider, session):
+        """Test requests reuse the class-level timeout objects."""
+        await provider.send_message("hi", Path("/tmp"))
+        await provider.send_message("hi", Path("/tmp"))
+
+        first, second = [kwargs for _, kwargs in session.requests]
+        assert first["timeout"] is second["timeout"] is GroqProvider._SEND_TIMEOUT
+
+    async def test_payload_sent_as_encoded_json(self, provider, session):
+        """Test the request body is pre-encoded JSON bytes."""
+        provider._headers = {"Content-Type": "application/json"}
+
+        await provider.send_message("hi", Path("/tmp"), max_tokens=10)
+
+        kwargs = session.requests[0][1]
+        assert isinstance(kwargs["data"], bytes)
+        assert "json" not in kwargs
+        assert serialization.loads(kwargs["data"])["max_tokens"] == 10
+        assert kwargs["headers"]["Content-Type"] == "application/json"
+
+
+class TestGroqDefaults:
+    """Test request defaults resolved at setup."""
+
+    def test_defaults_resolved_once(self, provider):
+        """Test the payload starts from the precomputed defaults."""
+        payload = provider._build_payload([], {})
+
+        assert payload["model"] == provider._model
+        assert payload["max_tokens"] == 8192
+        assert payload["top_p"] == 1.0
+
+    def test_only_known_params_override(self, provider):
+        """Test request parameters override defaults without adding fields."""
+        payload = provider._build_payload([], {"temperature": 0.0, "unknown": 1})
+
+        assert payload["temperature"] == 0.0
+        assert "unknown" not in payload
+        assert provider._default_params["temperature"] == 0.7
+
+    async def test_stream_payload_uses_defaults(self, provider, session):
+        """Test streamed requests share the resolved defaults."""
+        session.chunks = [sse_event(delta("a", "stop")), b"data: [DONE]\n\n"]
+
+        async for _ in provider.stream_message("hi", Path("/tmp")):
+            pass
+
+        body = serialization.loads(session.requests[0][1]["data"])
+        assert body["stream"] is True
+        assert body["max_tokens"] == 8192
+        assert body["top_p"] == 1.0
+
+
+class TestGroqCapabilities:
+    """Test Groq capability reporting."""
+
+    async def test_capabilities_are_cached(self, provider):
+        """Test repeated calls return the same capabilities object."""
+        first = await provider.get_capabilities()
+
+        assert await provider.get_capabilities() is first
+
+    async def test_initialize_refreshes_reported_model(self, session):
+        """Test a configured model replaces cached capabilities."""
+        provider = GroqProvider(
+            SimpleNamespace(groq_api_key="gsk-test", groq_model="mixtral-8x7b-32768")
+        )
+        provider.use_http_session(session)
+        stale = await provider.get_capabilities()
+
+        await provider.initialize()
+        fresh = await provider.get_capabilities()
+
+        assert stale.metadata["model"] != "mixtral-8x7b-32768"
+        assert fresh.metadata["model"] == "mixtral-8x7b-32768"
+        assert fresh.max_context_window == 32768
+
+
+class TestGroqHttpSession:
+    """Test sharing the manager's HTTP session."""
+
+    async def test_initialize_keeps_shared_session(self, session):
+        """Test a shared session is used with per-request auth headers."""
+        provider = GroqProvider(SimpleNamespace(groq_api_key="gsk-test"))
+        provider.use_http_session(session)
+
+        assert await provider.initialize() is True
+        await provider.send_message("hi", Path("/tmp"))
+
+        assert provider._session is session
+        headers = session.requests[0][1]["headers"]
+        assert headers["Authorization"] == "Bearer gsk-test"
+
+        await provider.shutdown()
+        assert session.closed is False
+
+    async def test_initialize_creates_own_session(self):
+        """Test a private pooled session is created and closed on shutdown."""
+        provider = GroqProvider(SimpleNamespace(groq_api_key="gsk-test"))
+
+        assert await provider.initialize() is True
+        own_session = provider._session
+
+        await provider.shutdown()
+        assert own_session.closed is True
+
+
+class TestGroqStreaming:
+    """Test parsing of Groq's server-sent event stream."""
+
+    async def collect(self, provider):
+        return [update async for update in provider.stream_message("hi", Path("/tmp"))]
+
+    async def test_stream_yields_deltas_until_finish(self, provider, session):
+        """Test content deltas are yielded and finish_reason ends the stream."""
+        session.chunks = [
+            b": keep-alive\n",
+            b"\n",
+            sse_event(delta("print(")),
+            b"data: {broken\n",
+            sse_event(delta("1)\r")),
+            sse_event(delta("", "stop")),
+            sse_event(delta("ignored")),
+        ]
+
+        updates = await self.collect(provider)
+
+        assert [u.content_delta for u in updates] == ["print(", "1)\r", ""]
+        assert updates[-1].is_complete is True
+        assert provider.status == ProviderStatus.READY
+
+    async def test_stream_skips_done_marker(self, provider, session):
+        """Test the [DONE] sentinel and CRLF framing are handled."""
+        session.chunks = [
+            sse_event(delta("ok")).replace(b"\n", b"\r\n"),
+            b"data: [DONE]\r\n",
+        ]
+
+        updates = await self.collect(provider)
+
+        assert [u.content_delta for u in updates] == ["ok"]
+
+    async def test_deltas_in_one_chunk_are_merged(self, provider, session):
+        """Test events received together are yielded as one update."""
+        session.chunks = [
+            sse_event(delta("a")) + sse_event(delta("b")),
+            sse_event(delta("c")) + sse_event(delta("", "stop")),
+        ]
+
+        updates = await self.collect(provider)
+
+        assert [u.content_delta for u in updates] == ["ab", "c", ""]
+        assert updates[-1].is_complete is True
@@ -0,0 +1,255 @@
+"""Tests for the Ollama AI provider."""
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from src.ai import serialization
+from src.ai.base_provider import ProviderStatus
+from src.ai.providers.ollama.provider import (
+    OLLAMA_DEFAULT_OPTIONS,
+    OllamaProvider,
+    _prompt_prefix,
+)
+
+from .fakes import FakeSession
+
+GENERATION = {
+    "model": "codellama",
+    "response": "print(1)",
+    "done": True,
+    "eval_count": 10,
+    "prompt_eval_count": 20,
+}
+
+
+@pytest.fixture
+def session():
+    """Fake HTTP session returning a fixed generation."""
+    return FakeSession(
+        data=GENERATION, get_data={"models": [{"name": "codellama:latest"}]}
+    )
+
+
+@pytest.fixture
+def provider(session):
+    """Ollama provider marked ready with a fake session attached."""
+    provider = OllamaProvider(config=None)
+    provider._session = session
+    provider.status = ProviderStatus.READY
+    return provider
+
+
+class TestOllamaResponseCache:
+    """Test caching of deterministic Ollama requests."""
+
+    async def test_repeated_deterministic_request_is_cached(self, provider, session):
+        """Test a temperature=0 repeat is served without a generation."""
+        first = await provider.send_message("hi", Path("/tmp"), temperature=0)
+        second = await provider.send_message("hi", Path("/tmp"), temperature=0)
+
+        assert len(session.requests) == 1
+        assert second.content == first.content == "print(1)"
+        assert second.metadata["cache_hit"] is True
+        assert provider.status == ProviderStatus.READY
+
+    async def test_different_options_are_cached_separately(self, provider, session):
+        """Test generation options are part of the cache key."""
+        await provider.send_message("hi", Path("/tmp"), temperature=0)
+        await provider.send_message("hi", Path("/tmp"), temperature=0, max_tokens=5)
+
+        assert len(session.requests) == 2
+
+    async def test_sampled_requests_are_not_cached(self, provider, session):
+        """Test requests with the default temperature always generate."""
+        await provider.send_message("hi", Path("/tmp"))
+        await provider.send_message("hi", Path("/tmp"))
+
+        assert len(session.requests) == 2
+
+
+class TestOllamaPrompt:
+    """Test prompt assembly."""
+
+    @pytest.mark.parametrize("system_prompt", [None, "Be brief"])
+    def test_prompt_layout_is_unchanged(self, provider, system_prompt):
+        """Test the cached prefix keeps the original section layout."""
+        parts = []
+        if system_prompt:
+            parts.append(f"### System\n{system_prompt}\n\n")
+        parts.append("### Context\nWorking Directory: /work\n\n")
+        parts.append("### Instruction\nfix it\n\n")
+        parts.append("### Response\n")
+
+        prompt = provider._build_prompt("fix it", Path("/work"), system_prompt)
+
+        assert prompt == "".join(parts)
+
+    def test_prefix_is_reused_across_prompts(self, provider):
+        """Test only the instruction is rebuilt for the same context."""
+        _prompt_prefix.cache_clear()
+
+        provider._build_prompt("one", Path("/work"))
+        provider._build_prompt("two", Path("/work"))
+
+        assert _prompt_prefix.cache_info().hits == 1
+
+
+class TestOllamaEncoding:
+    """Test request encoding."""
+
+    async def test_timeouts_are_shared(self, provider, session):
+        """Test requests reuse the class-level timeout objects."""
+        await provider.send_message("hi", Path("/tmp"))
+        await provider.send_message("hi", Path("/tmp"))
+
+        first, second = [kwargs for _, kwargs in session.requests]
+        assert first["timeout"] is second["timeout"] is OllamaProvider._SEND_TIMEOUT
+
+    async def test_payload_sent_as_encoded_json(self, provider, session):
+        """Test the request body is pre-encoded JSON bytes."""
+        await provider.send_message("hi", Path("/tmp"), max_tokens=10)
+
+        kwargs = session.requests[0][1]
+        assert isinstance(kwargs["data"], bytes)
+        assert "json" not in kwargs
+        assert serialization.loads(kwargs["data"])["options"]["num_predict"] == 10
+        assert kwargs["headers"]["Content-Type"] == "application/json"
+
+
+class TestOllamaDefaults:
+    """Test request defaults."""
+
+    def test_max_tokens_maps_to_num_predict(self, provider):
+        """Test request parameters map onto Ollama option names."""
+        payload = provider._build_payload(
+            "hi", {"max_tokens": 64, "unknown": 1}, stream=False
+        )
+
+        assert payload["options"] == {
+            "temperature": 0.7,
+            "num_predict": 64,
+            "top_p": 0.9,
+        }
+
+    def test_defaults_are_not_mutated(self, provider):
+        """Test per-request overrides leave the shared defaults untouched."""
+        provider._build_payload("hi", {"temperature": 0.0}, stream=True)
+
+        assert OLLAMA_DEFAULT_OPTIONS["temperature"] == 0.7
+
+
+class TestOllamaCapabilities:
+    """Test Ollama capability reporting."""
+
+    async def test_capabilities_are_cached(self, provider):
+        """Test repeated calls return the same capabilities object."""
+        first = await provider.get_capabilities()
+
+        assert await provider.get_capabilities() is first
+
+    async def test_initialize_refreshes_reported_model(self, session):
+        """Test a configured model replaces cached capabilities."""
+        provider = OllamaProvider(SimpleNamespace(ollama_model="mistral"))
+        provider.use_http_session(session)
+        stale = await provider.get_capabilities()
+
+        await provider.initialize()
+        fresh = await provider.get_capabilities()
+
+        assert stale.metadata["model"] != "mistral"
+        assert fresh.metadata["model"] == "mistral"
+
+
+class TestOllamaHttpSession:
+    """Test sharing the manager's HTTP session."""
+
+    async def test_initialize_keeps_shared_session(self, session):
+        """Test a shared session is probed and left open on shutdown."""
+        provider = OllamaProvider(SimpleNamespace(ollama_host="http://ollama:11434"))
+        provider.use_http_session(session)
+
+        assert await provider.initialize() is True
+
+        assert provider._session is session
+        assert session.requests[0][0] == "http://ollama:11434/api/tags"
+
+        await provider.shutdown()
+        assert session.closed is False
+
+
+class TestOllamaWarmUp:
+    """Test loading the model ahead of the first request."""
+
+    async def test_initialize_loads_model_in_background(self, session):
+        """Test an empty keep-alive generation is sent after the probe."""
+        provider = OllamaProvider(SimpleNamespace(ollama_keep_alive="1h"))
+        provider.use_http_session(session)
+
+        assert await provider.initialize() is True
+        await provider._warmup_task
+
+        url, kwargs = session.requests[-1]
+        assert url == "http://localhost:11434/api/generate"
+        assert serialization.loads(kwargs["data"]) == {
+            "model": "codellama",
+            "prompt": "",
+            "keep_alive": "1h",
+        }
+
+    async def test_warm_up_failure_is_not_fatal(self, provider, session):
+        """Test a failed warm-up is logged and leaves the provider ready."""
+        session.status = 500
+
+        await provider._warm_up()
+
+        assert provider.status == ProviderStatus.READY
+
+    async def test_requests_keep_model_loaded(self, provider, session):
+        """Test generations ask Ollama to keep the model resident."""
+        await provider.send_message("hi", Path("/tmp"))
+
+        payload = serialization.loads(session.requests[0][1]["data"])
+        assert payload["keep_alive"] == "30m"
+
+
+class TestOllamaStreaming:
+    """Test parsing of Ollama's newline-delimited JSON stream."""
+
+    async def test_stream_yields_responses_until_done(self, provider, session):
+        """Test each NDJSON line yields its response text."""
+        session.chunks = [
+            serialization.dumps({"response": "print(", "done": False}) + b"\n",
+            b"\n",
+            b"{broken\n",
+            serialization.dumps({"response": "1)", "done": False}) + b"\n",
+            serialization.dumps({"response": "", "done": True, "eval_count": 3})
+            + b"\n",
+        ]
+
+        updates = [
+            update async for update in provider.stream_message("hi", Path("/tmp"))
+        ]
+
+        assert [u.content_delta for u in updates] == ["print(", "1)", ""]
+        assert updates[-1].is_complete is True
+        assert updates[-1].metadata["eval_count"] == 3
+        assert provider.status == ProviderStatus.READY
+
+    async def test_responses_in_one_chunk_are_merged(self, provider, session):
+        """Test objects received together are yielded as one update."""
+        session.chunks = [
+            serialization.dumps({"response": "a", "done": False})
+            + b"\n"
+            + serialization.dumps({"response": "b", "done": False})
+            + b"\n",
+            serialization.dumps({"response": "c", "done": True}) + b"\n",
+        ]
+
+        updates = [
+            update async for update in provider.stream_message("hi", Path("/tmp"))
+        ]
+
+        assert [u.content_delta for u in updates] == ["ab", "c", ""]
+        assert updates[-1].is_complete is True
@@ -0,0 +1,410 @@
+"""Tests for the OpenAI AI provider."""
+
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from src.ai import serialization
+from src.ai.base_provider import ProviderStatus
+from src.ai.providers.openai.provider import (
+    OPENAI_PRICING,
+    OpenAIProvider,
+    _resolve_pricing,
+    _system_message,
+)
+from src.ai.rate_limit import RequestThrottle
+
+from .fakes import delta, sse_event
+
+
+@pytest.fixture
+def provider(session):
+    """OpenAI provider marked ready with a fake session attached."""
+    provider = OpenAIProvider(config=None)
+    provider._session = session
+    provider.status = ProviderStatus.READY
+    return provider
+
+
+class TestOpenAIResponseCache:
+    """Test caching of deterministic OpenAI requests."""
+
+    async def test_repeated_deterministic_request_is_cached(self, provider, session):
+        """Test a temperature=0 repeat is served without an API call."""
+        first = await provider.send_message("hi", Path("/tmp"), temperature=0)
+        second = await provider.send_message(
+            "hi", Path("/tmp"), session_id="s2", temperature=0
+        )
+
+        assert len(session.requests) == 1
+        assert second.content == first.content == "print(1)"
+        assert second.metadata["cache_hit"] is True
+        assert second.session_id == "s2"
+        assert second.cost == 0.0
+        assert provider.status == ProviderStatus.READY
+
+    async def test_sampled_requests_are_not_cached(self, provider, session):
+        """Test requests with the default temperature always hit the API."""
+        await provider.send_message("hi", Path("/tmp"))
+        await provider.send_message("hi", Path("/tmp"))
+
+        assert len(session.requests) == 2
+
+
+class TestOpenAIDecoding:
+    """Test response decoding."""
+
+    async def test_completion_decoded_from_body(self, provider):
+        """Test the completion is parsed from the raw response body."""
+        response = await provider.send_message("hi", Path("/tmp"))
+
+        assert response.content == "print(1)"
+        assert response.tokens_used == 30
+        assert provider.status == ProviderStatus.READY
+
+    async def test_default_session_id_is_stable_and_unique(self, provider):
+        """Test requests without a session share one per-provider ID."""
+        first = await provider.send_message("hi", Path("/tmp"))
+        second = await provider.send_message("hi", Path("/tmp"))
+
+        assert first.session_id == second.session_id
+        assert first.session_id.startswith("openai_")
+        assert first.session_id != OpenAIProvider(None)._default_session_id
+
+    async def test_function_call_arguments_decoded(self, provider, session):
+        """Test function call arguments are parsed into tool call input."""
+        session.data = {
+            "choices": [
+                {
+                    "message": {
+                        "content": "Calling tool",
+                        "function_call": {
+                            "name": "run",
+                            "arguments": '{"cmd": "ls", "cwd": "/tmp"}',
+                        },
+                    },
+                    "finish_reason": "function_call",
+                }
+            ],
+            "usage": {},
+        }
+
+        response = await provider.send_message("hi", Path("/tmp"))
+
+        assert response.tool_calls[0].name == "run"
+        assert response.tool_calls[0].input == {"cmd": "ls", "cwd": "/tmp"}
+
+    @pytest.mark.parametrize("arguments", ["{}", "", None])
+    async def test_parameterless_function_call(self, provider, session, arguments):
+        """Test calls without arguments get a fresh empty input."""
+        function_call = {"name": "status"}
+        if arguments is not None:
+            function_call["arguments"] = arguments
+        session.data = {
+            "choices": [{"message": {"content": "", "function_call": function_call}}]
+        }
+
+        first = await provider.send_message("hi", Path("/tmp"))
+        second = await provider.send_message("hi", Path("/tmp"))
+
+        assert first.tool_calls[0].input == {}
+        assert first.tool_calls[0].input is not second.tool_calls[0].input
+
+    async def test_null_function_call_is_ignored(self, provider, session):
+        """Test a null function_call produces no tool calls."""
+        session.data = {
+            "choices": [{"message": {"content": "ok", "function_call": None}}]
+        }
+
+        response = await provider.send_message("hi", Path("/tmp"))
+
+        assert response.tool_calls is None
+
+
+class TestOpenAIRequests:
+    """Test request construction."""
+
+    async def test_send_and_stream_share_default_prompt(self, provider, session):
+        """Test both request kinds send the same per-directory prompt."""
+        session.chunks = [sse_event(delta("a", "stop"))]
+
+        await provider.send_message("hi", Path("/work"))
+        async for _ in provider.stream_message("hi", Path("/work")):
+            pass
+
+        sent, streamed = [
+            serialization.loads(kwargs["data"]) for _, kwargs in session.requests
+        ]
+        assert sent["messages"][0] == streamed["messages"][0]
+        assert "Working directory: /work" in sent["messages"][0]["content"]
+        assert streamed["stream"] is True
+        assert streamed["top_p"] == sent["top_p"] == 1.0
+
+    def test_system_message_is_reused(self, provider):
+        """Test requests in the same context share one system message."""
+        _system_message.cache_clear()
+
+        first = provider._build_messages("one", Path("/work"))
+        second = provider._build_messages("two", Path("/work"))
+
+        assert first[0] is second[0]
+        assert first[1] == {"role": "user", "content": "one"}
+        assert _system_message.cache_info().hits == 1
+
+    def test_custom_system_prompt_replaces_default(self, provider):
+        """Test an explicit system prompt is sent on its own."""
+        messages = provider._build_messages("hi", Path("/work"), "Be brief")
+
+        assert messages[0] == {"role": "system", "content": "Be brief"}
+
+    def test_only_known_params_override(self, provider):
+        """Test request parameters override defaults without adding fields."""
+        payload = provider._build_payload([], {"max_tokens": 64, "unknown": 1})
+
+        assert payload["max_tokens"] == 64
+        assert payload["model"] == "gpt-4-turbo-preview"
+        assert "unknown" not in payload
+        assert provider._default_params["max_tokens"] == 2048
+
+
+class TestOpenAIEncoding:
+    """Test request encoding."""
+
+    async def test_payload_sent_as_encoded_json(self, provider, session):
+        """Test the request body is pre-encoded JSON bytes."""
+        provider._headers = {"Content-Type": "application/json"}
+
+        await provider.send_message("hi", Path("/tmp"), max_tokens=10)
+
+        kwargs = session.requests[0][1]
+        assert isinstance(kwargs["data"], bytes)
+        assert "json" not in kwargs
+        assert serialization.loads(kwargs["data"])["max_tokens"] == 10
+        assert kwargs["headers"]["Content-Type"] == "application/json"
+
+
+class TestOpenAICost:
+    """Test cost calculation."""
+
+    def test_cost_uses_model_pricing(self, provider):
+        """Test token counts are priced per 1K tokens for the model."""
+        assert provider._calculate_cost("gpt-4", 1000, 1000) == pytest.approx(0.09)
+        assert provider._calculate_cost("gpt-3.5-turbo", 2000, 1000) == pytest.approx(
+            0.0025
+        )
+
+    @pytest.mark.parametrize(
+        "model, cost_in, cost_out",
+        OPENAI_PRICING,
+        ids=[row[0] for row in OPENAI_PRICING],
+    )
+    def test_each_model_resolves_to_its_own_row(self, model, cost_in, cost_out):
+        """Test no pricing row is shadowed by a shorter model name."""
+        assert _resolve_pricing(model) == (cost_in, cost_out)
+
+    def test_unknown_model_uses_default_pricing(self, provider):
+        """Test unlisted models fall back to the default prices."""
+        assert provider._calculate_cost("o1-mini", 1000, 1000) == pytest.approx(0.04)
+
+    def test_no_usage_skips_pricing(self, provider):
+        """Test responses without reported usage cost nothing."""
+        _resolve_pricing.cache_clear()
+
+        assert provider._calculate_cost("gpt-4", 0, 0) == 0.0
+        assert _resolve_pricing.cache_info().currsize == 0
+
+    async def test_response_without_usage_is_free(self, provider, session):
+        """Test a completion without a usage block reports zero cost."""
+        session.data = {"choices": [{"message": {"content": "ok"}}]}
+
+        response = await provider.send_message("hi", Path("/tmp"))
+
+        assert response.cost == 0.0
+
+    def test_pricing_resolved_once_per_model(self, provider):
+        """Test repeated costs reuse the resolved model pricing."""
+        _resolve_pricing.cache_clear()
+
+        provider._calculate_cost("gpt-4-turbo", 10, 10)
+        provider._calculate_cost("gpt-4-turbo", 20, 20)
+
+        assert _resolve_pricing.cache_info().hits == 1
+
+
+class TestOpenAICapabilities:
+    """Test OpenAI capability reporting."""
+
+    async def test_capabilities_are_cached(self, provider):
+        """Test repeated calls return the same capabilities object."""
+        first = await provider.get_capabilities()
+
+        assert await provider.get_capabilities() is first
+
+    async def test_initialize_refreshes_reported_model(self, session):
+        """Test a configured model replaces cached capabilities."""
+        provider = OpenAIProvider(
+            SimpleNamespace(openai_api_key="sk-test", openai_model="gpt-3.5-turbo")
+        )
+        provider.use_http_session(session)
+        stale = await provider.get_capabilities()
+
+        await provider.initialize()
+        fresh = await provider.get_capabilities()
+
+        assert stale.metadata["model"] != "gpt-3.5-turbo"
+        assert fresh.metadata["model"] == "gpt-3.5-turbo"
+        assert fresh.max_context_window == 16385
+
+    @pytest.mark.parametrize(
+        "model, context_window, cost_input",
+        [
+            ("gpt-4-turbo-preview", 128000, 0.01),
+            ("gpt-4", 8192, 0.03),
+            ("gpt-4-32k", 8192, 0.06),
+            ("gpt-3.5-turbo", 16385, 0.0005),
+            ("gpt-3.5-turbo-16k", 16385, 0.003),
+            # Unlisted models advertise the default pricing
+            ("o1", 16385, 0.01),
+        ],
+    )
+    async def test_limits_follow_model_tables(
+        self, provider, model, context_window, cost_input
+    ):
+        """Test the reported limits and prices match the model tables."""
+        provider._model = model
+
+        capabilities = await provider.get_capabilities()
+
+        assert capabilities.max_tokens == 4096
+        assert capabilities.max_context_window == context_window
+        assert capabilities.cost_per_1k_input_tokens == cost_input
+
+
+class TestOpenAIThrottle:
+    """Test client-side request throttling."""
+
+    async def test_requests_wait_for_rate_limit(self, provider, session):
+        """Test a request waits for a token instead of hitting the API."""
+        provider._throttle = RequestThrottle(requests_per_minute=600)
+        provider._throttle._bucket.tokens = 0  # 10 per second
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await provider.send_message("hi", Path("/tmp"))
+
+        assert loop.time() - start >= 0.09
+        assert len(session.requests) == 1
+
+    async def test_streams_are_throttled(self, provider, session):
+        """Test streamed requests take a token from the same throttle."""
+        session.chunks = [sse_event(delta("a", "stop"))]
+        provider._throttle = RequestThrottle(requests_per_minute=600)
+
+        async for _ in provider.stream_message("hi", Path("/tmp")):
+            pass
+
+        assert provider._throttle._bucket.tokens < 600
+
+
+class TestOpenAIHttpSession:
+    """Test sharing the manager's HTTP session."""
+
+    async def test_initialize_keeps_shared_session(self, session):
+        """Test a shared session is used with per-request auth headers."""
+        provider = OpenAIProvider(SimpleNamespace(openai_api_key="sk-test"))
+        provider.use_http_session(session)
+
+        assert await provider.initialize() is True
+        await provider.send_message("hi", Path("/tmp"))
+
+        assert provider._session is session
+        headers = session.requests[0][1]["headers"]
+        assert headers["Authorization"] == "Bearer sk-test"
+
+        await provider.shutdown()
+        assert session.closed is False
+
+    async def test_initialize_creates_own_session(self):
+        """Test a private pooled session is created and closed on shutdown."""
+        provider = OpenAIProvider(SimpleNamespace(openai_api_key="sk-test"))
+
+        assert await provider.initialize() is True
+        own_session = provider._session
+
+        await provider.shutdown()
+        assert own_session.closed is True
+
+
+class TestOpenAIStreaming:
+    """Test parsing of OpenAI's server-sent event stream."""
+
+    async def test_stream_yields_deltas(self, provider, session):
+        """Test content deltas are yielded until the finish reason."""
+        session.chunks = [
+            sse_event(delta("print")),
+            b"\n",
+            sse_event(delta("(1)", "stop")),
+            b"data: [DONE]\n",
+        ]
+
+        updates = [u async for u in provider.stream_message("hi", Path("/tmp"))]
+
+        assert "".join(u.content_delta for u in updates) == "print(1)"
+        assert updates[-1].is_complete
+        assert provider.status == ProviderStatus.READY
+
+    async def test_stream_skips_malformed_events(self, provider, session):
+        """Test undecodable events are ignored."""
+        session.chunks = [
+            b"data: {not json\n",
+            sse_event(delta("ok", "stop")),
+        ]
+
+        updates = [u async for u in provider.stream_message("hi", Path("/tmp"))]
+
+        assert "".join(u.content_delta for u in updates) == "ok"
+
+    async def test_stream_reassembles_split_events(self, provider, session):
+        """Test events split across network chunks are parsed once whole."""
+        event = sse_event(delta("print(1)", "stop"))
+        session.chunks = [event[:10], event[10:25], event[25:]]
+
+        updates = [u async for u in provider.stream_message("hi", Path("/tmp"))]
+
+        assert "".join(u.content_delta for u in updates) == "print(1)"
+        assert updates[-1].is_complete
+
+    async def test_deltas_in_one_chunk_are_merged(self, provider, session):
+        """Test events received together are yielded as one update."""
+        session.chunks = [
+            sse_event(delta("a")) + sse_event(delta("b")),
+            sse_event(delta("c")) + sse_event(delta("", "stop")),
+        ]
+
+        updates = [u async for u in provider.stream_message("hi", Path("/tmp"))]
+
+        assert [u.content_delta for u in updates] == ["ab", "c", ""]
+        assert updates[-1].is_complete is True
+
+    async def test_large_event_across_many_chunks(self, provider, session):
+        """Test an event far larger than one network chunk is parsed whole."""
+        text = "x" * 200_000
+        event = sse_event(delta(text, "stop"))
+        session.chunks = [event[i : i + 4096] for i in range(0, len(event), 4096)]
+
+        updates = [u async for u in provider.stream_message("hi", Path("/tmp"))]
+
+        assert "".join(u.content_delta for u in updates) == text
+
+    async def test_crlf_framing(self, provider, session):
+        """Test events terminated by CRLF are parsed."""
+        session.chunks = [
+            sse_event(delta("a"))[:-1] + b"\r\n\r\n",
+            b"data: " + serialization.dumps(delta("b", "stop")) + b"\r\n",
+        ]
+
+        updates = [u async for u in provider.stream_message("hi", Path("/tmp"))]
+
+        assert "".join(u.content_delta for u in updates) == "ab"
@@ -0,0 +1,475 @@
+"""Tests for the AI provider manager."""
+
+import asyncio
+import gc
+import logging
+from pathlib import Path
+from types import SimpleNamespace
+from typing import AsyncIterator, Optional
+from unittest.mock import patch
+
+import pytest
+
+from src.ai.base_provider import (
+    AIResponse,
+    AIStreamUpdate,
+    BaseAIProvider,
+    ProviderCapabilities,
+    ProviderStatus,
+)
+from src.ai.provider_manager import AIProviderManager
+from src.exceptions import ConfigurationError
+
+
+class FakeProvider(BaseAIProvider):
+    """Minimal in-memory provider for manager tests."""
+
+    def __init__(
+        self,
+        name: str,
+        healthy: bool = True,
+        health_delay: float = 0.0,
+        health_error: Optional[Exception] = None,
+        init_delay: float = 0.0,
+        init_ok: bool = True,
+        send_delay: float = 0.0,
+        send_error: Optional[Exception] = None,
+    ):
+        super().__init__(config=None)
+        self._name = name
+        self._healthy = healthy
+        self._health_delay = health_delay
+        self._health_error = health_error
+        self._init_delay = init_delay
+        self._init_ok = init_ok
+        self._send_delay = send_delay
+        self._send_error = send_error
+        self.health_calls = 0
+        self.http_session = None
+        self.batch_sizes = []
+
+    async def send_batch(self, requests):
+        self.batch_sizes.append(len(requests))
+        return await super().send_batch(requests)
+
+    def use_http_session(self, http_session) -> None:
+        self.http_session = http_session
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    async def initialize(self) -> bool:
+        if self._init_delay:
+            await asyncio.sleep(self._init_delay)
+        self.status = ProviderStatus.READY if self._init_ok else ProviderStatus.OFFLINE
+        return self._init_ok
+
+    async def send_message(
+        self,
+        prompt: str,
+        working_directory: Path,
+        session_id: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        **kwargs,
+    ) -> AIResponse:
+        if self._send_delay:
+            self.status = ProviderStatus.BUSY
+            await asyncio.sleep(self._send_delay)
+            self.status = ProviderStatus.READY
+        if self._send_error:
+            raise self._send_error
+        return AIResponse(
+            content=f"{self._name}: {prompt}",
+            session_id=session_id or f"{self._name}_session",
+            tokens_used=len(prompt),
+            cost=0.0,
+            provider_name=self._name,
+        )
+
+    async def stream_message(
+        self,
+        prompt: str,
+        working_directory: Path,
+        session_id: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        **kwargs,
+    ) -> AsyncIterator[AIStreamUpdate]:
+        yield AIStreamUpdate(content_delta=prompt, is_complete=True)
+
+    async def get_capabilities(self) -> ProviderCapabilities:
+        return ProviderCapabilities(name=self._name)
+
+    async def health_check(self) -> bool:
+        self.health_calls += 1
+        if self._health_delay:
+            await asyncio.sleep(self._health_delay)
+        if self._health_error:
+            raise self._health_error
+        return self._healthy
+
+
+@pytest.fixture
+async def manager():
+    """Provider manager without settings."""
+    manager = AIProviderManager(config=None)
+    yield manager
+    await manager.shutdown()
+
+
+class TestProviderRegistration:
+    """Test provider registration and lookup."""
+
+    async def test_first_provider_becomes_default(self, manager):
+        """Test the first registered provider is used as default."""
+        await manager.register_provider(FakeProvider("alpha"))
+        await manager.register_provider(FakeProvider("beta"))
+
+        assert manager.default_provider == "alpha"
+        assert manager.get_provider().name == "alpha"
+        assert manager.get_provider("beta").name == "beta"
+
+    async def test_unknown_provider_raises(self, manager):
+        """Test looking up an unregistered provider fails."""
+        await manager.register_provider(FakeProvider("alpha"))
+
+        with pytest.raises(ConfigurationError):
+            manager.get_provider("missing")
+
+    async def test_register_providers_initializes_concurrently(self, manager):
+        """Test bulk registration overlaps slow initializations."""
+        providers = [FakeProvider(n, init_delay=0.1) for n in ("a", "b", "c")]
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await manager.register_providers(providers)
+        elapsed = loop.time() - start
+
+        assert elapsed < 0.25
+        assert manager.list_providers() == ["a", "b", "c"]
+        assert manager.default_provider == "a"
+
+    async def test_register_providers_skips_failures_and_sets_default(self, manager):
+        """Test failed providers are skipped and the default is honoured."""
+        providers = [
+            FakeProvider("a", init_ok=False),
+            FakeProvider("b"),
+            FakeProvider("c"),
+        ]
+
+        await manager.register_providers(providers, default="c")
+
+        assert manager.list_providers() == ["b", "c"]
+        assert manager.default_provider == "c"
+
+    def test_no_default_provider_raises(self, manager):
+        """Test lookup without any provider fails."""
+        with pytest.raises(ConfigurationError):
+            manager.get_provider()
+
+
+class TestRequestLogging:
+    """Test per-request logging on the dispatch path."""
+
+    async def test_request_events_skipped_when_info_disabled(self, manager):
+        """Test no per-request events are built when INFO is off."""
+        await manager.register_provider(FakeProvider("alpha"))
+        level_logger = logging.getLogger("src.ai.provider_manager")
+
+        with patch.object(level_logger, "isEnabledFor", return_value=False):
+            with patch("src.ai.provider_manager.logger") as mock_logger:
+                await manager.send_message("hello", Path("/tmp"))
+
+        mock_logger.info.assert_not_called()
+
+    async def test_request_events_logged_when_info_enabled(self, manager):
+        """Test send and receive events are logged when INFO is on."""
+        await manager.register_provider(FakeProvider("alpha"))
+        level_logger = logging.getLogger("src.ai.provider_manager")
+
+        with patch.object(level_logger, "isEnabledFor", return_value=True):
+            with patch("src.ai.provider_manager.logger") as mock_logger:
+                await manager.send_message("hello", Path("/tmp"))
+
+        events = [call.args[0] for call in mock_logger.info.call_args_list]
+        assert events == ["Sending message to AI provider", "Received AI response"]
+
+
+class TestHealthChecks:
+    """Test provider health checks."""
+
+    async def test_health_check_all_reports_each_provider(self, manager):
+        """Test health results are keyed by provider name."""
+        await manager.register_provider(FakeProvider("alpha", healthy=True))
+        await manager.register_provider(FakeProvider("beta", healthy=False))
+
+        results = await manager.health_check_all()
+
+        assert results == {"alpha": True, "beta": False}
+
+    async def test_health_check_all_runs_concurrently(self, manager):
+        """Test slow health checks overlap instead of running back to back."""
+        for name in ("alpha", "beta", "gamma"):
+            await manager.register_provider(FakeProvider(name, health_delay=0.1))
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        results = await manager.health_check_all()
+        elapsed = loop.time() - start
+
+        assert all(results.values())
+        assert elapsed < 0.25
+
+    async def test_health_check_all_handles_errors(self, manager):
+        """Test a raising provider is reported unhealthy."""
+        await manager.register_provider(
+            FakeProvider("alpha", health_error=RuntimeError("boom"))
+        )
+        await manager.register_provider(FakeProvider("beta"))
+
+        results = await manager.health_check_all()
+
+        assert results == {"alpha": False, "beta": True}
+
+    async def test_health_check_result_is_cached(self, manager):
+        """Test repeated checks within the TTL reuse the last result."""
+        provider = FakeProvider("alpha")
+        await manager.register_provider(provider)
+
+        assert await manager.health_check() is True
+        assert await manager.health_check("alpha") is True
+        await manager.health_check_all()
+
+        assert provider.health_calls == 1
+
+    async def test_health_check_cache_expires(self):
+        """Test checks run again once the TTL has passed."""
+        manager = AIProviderManager(
+            config=SimpleNamespace(ai_health_check_ttl_seconds=0)
+        )
+        provider = FakeProvider("alpha")
+        await manager.register_provider(provider)
+
+        await manager.health_check()
+        await manager.health_check()
+
+        assert provider.health_calls == 2
+        await manager.shutdown()
+
+    async def test_slow_health_check_times_out(self):
+        """Test a hung provider is reported unhealthy without stalling others."""
+        manager = AIProviderManager(
+            config=SimpleNamespace(ai_health_check_timeout_seconds=0.05)
+        )
+        await manager.register_provider(FakeProvider("alpha", health_delay=10))
+        await manager.register_provider(FakeProvider("beta"))
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        results = await manager.health_check_all()
+        elapsed = loop.time() - start
+
+        assert results == {"alpha": False, "beta": True}
+        assert elapsed < 1
+        await manager.shutdown()
+
+
+class TestSharedHttpSession:
+    """Test the pooled HTTP session shared across providers."""
+
+    async def test_providers_share_one_session(self, manager):
+        """Test every registered provider receives the same session."""
+        alpha = FakeProvider("alpha")
+        beta = FakeProvider("beta")
+        await manager.register_provider(alpha)
+        await manager.register_provider(beta)
+
+        assert alpha.http_session is not None
+        assert alpha.http_session is beta.http_session
+        assert alpha.http_session is manager.http_session
+
+    async def test_shutdown_closes_session(self, manager):
+        """Test shutting down the manager closes the shared session."""
+        await manager.register_provider(FakeProvider("alpha"))
+        session = manager.http_session
+
+        await manager.shutdown()
+
+        assert session.closed
+        assert manager.http_session is None
+
+
+class TestRequestBatching:
+    """Test micro-batching of concurrent send_message calls."""
+
+    @pytest.fixture
+    async def batching_manager(self):
+        """Provider manager with a 20ms batching window."""
+        manager = AIProviderManager(config=SimpleNamespace(ai_batch_window_ms=20))
+        yield manager
+        await manager.shutdown()
+
+    async def test_batching_disabled_by_default(self, manager):
+        """Test requests go straight to the provider without a window."""
+        provider = FakeProvider("alpha")
+        await manager.register_provider(provider)
+
+        response = await manager.send_message("hello", Path("/tmp"))
+
+        assert response.content == "alpha: hello"
+        assert provider.batch_sizes == []
+
+    async def test_concurrent_requests_share_one_batch(self, batching_manager):
+        """Test concurrent calls are coalesced and answered in order."""
+        provider = FakeProvider("alpha")
+        await batching_manager.register_provider(provider)
+
+        responses = await asyncio.gather(
+            *(batching_manager.send_message(p, Path("/tmp")) for p in ("a", "b", "c"))
+        )
+
+        assert [r.content for r in responses] == ["alpha: a", "alpha: b", "alpha: c"]
+        assert provider.batch_sizes == [3]
+
+    async def test_batch_errors_propagate_per_request(self, batching_manager):
+        """Test a failing request does not fail the rest of its batch."""
+        provider = FakeProvider("alpha")
+        await batching_manager.register_provider(provider)
+
+        async def send_message(prompt, working_directory, **kwargs):
+            if prompt == "bad":
+                raise RuntimeError("boom")
+            return await FakeProvider.send_message(
+                provider, prompt, working_directory, **kwargs
+            )
+
+        provider.send_message = send_message
+
+        results = await asyncio.gather(
+            batching_manager.send_message("good", Path("/tmp")),
+            batching_manager.send_message("bad", Path("/tmp")),
+            return_exceptions=True,
+        )
+
+        assert results[0].content == "alpha: good"
+        assert isinstance(results[1], RuntimeError)
+
+    async def test_short_batch_result_fails_every_request(self, batching_manager):
+        """Test callers are not left waiting when results go missing."""
+        provider = FakeProvider("alpha")
+        await batching_manager.register_provider(provider)
+
+        async def send_batch(requests):
+            return await FakeProvider.send_batch(provider, requests[:1])
+
+        provider.send_batch = send_batch
+
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                batching_manager.send_message("a", Path("/tmp")),
+                batching_manager.send_message("b", Path("/tmp")),
+                return_exceptions=True,
+            ),
+            timeout=1,
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert "1 results for 2" in str(results[0])
+
+
+class TestHedgedRequests:
+    """Test racing fallback providers against a slow primary."""
+
+    async def test_fast_primary_wins_without_hedging(self, manager):
+        """Test fallbacks are not contacted when the primary is quick."""
+        await manager.register_provider(FakeProvider("primary"))
+        fallback = FakeProvider("fallback")
+        fallback.send_message = None  # Must not be called
+        await manager.register_provider(fallback)
+
+        response = await manager.send_message_hedged(
+            "hi", Path("/tmp"), fallback_after=0.5
+        )
+
+        assert response.metadata["hedged_provider"] == "primary"
+
+    async def test_slow_primary_is_raced_by_fallback(self, manager):
+        """Test a fallback answers when the primary stalls."""
+        primary = FakeProvider("primary", send_delay=5)
+        await manager.register_provider(primary)
+        await manager.register_provider(FakeProvider("fallback"))
+
+        response = await manager.send_message_hedged(
+            "hi", Path("/tmp"), fallback_after=0.05
+        )
+
+        assert response.content == "fallback: hi"
+        assert response.metadata["hedged_provider"] == "fallback"
+        # The cancelled primary has reset its status before returning
+        assert primary.status == ProviderStatus.READY
+
+    async def test_default_races_one_fallback(self, manager):
+        """Test only the next registered provider is raced by default."""
+        await manager.register_provider(FakeProvider("primary", send_delay=5))
+        await manager.register_provider(FakeProvider("second", send_delay=0.05))
+        await manager.register_provider(FakeProvider("third"))
+
+        response = await manager.send_message_hedged(
+            "hi", Path("/tmp"), fallback_after=0.01
+        )
+
+        # The faster third provider was never started
+        assert response.metadata["hedged_provider"] == "second"
+        assert manager._next_provider_names("third") == ["primary", "second"]
+
+    async def test_failed_primary_falls_back_immediately(self, manager):
+        """Test a primary error starts fallbacks without waiting."""
+        await manager.register_provider(
+            FakeProvider("primary", send_error=RuntimeError("down"))
+        )
+        await manager.register_provider(FakeProvider("fallback"))
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        response = await manager.send_message_hedged(
+            "hi", Path("/tmp"), fallback_after=5
+        )
+
+        assert response.metadata["hedged_provider"] == "fallback"
+        assert loop.time() - start < 1
+
+    async def test_errors_finishing_with_winner_are_retrieved(self, manager):
+        """Test a leg failing alongside the winner is not reported unretrieved."""
+        await manager.register_provider(
+            FakeProvider("primary", send_error=RuntimeError("primary down"))
+        )
+        await manager.register_provider(
+            FakeProvider("bad", send_error=RuntimeError("bad down"))
+        )
+        await manager.register_provider(FakeProvider("good"))
+        unhandled = []
+        loop = asyncio.get_running_loop()
+        loop.set_exception_handler(lambda loop, context: unhandled.append(context))
+
+        try:
+            response = await manager.send_message_hedged(
+                "hi", Path("/tmp"), fallbacks=["bad", "good"], fallback_after=0
+            )
+            gc.collect()
+        finally:
+            loop.set_exception_handler(None)
+
+        assert response.metadata["hedged_provider"] == "good"
+        assert unhandled == []
+
+    async def test_all_failed_raises_last_error(self, manager):
+        """Test the error is raised when every provider fails."""
+        await manager.register_provider(
+            FakeProvider("primary", send_error=RuntimeError("primary down"))
+        )
+        await manager.register_provider(
+            FakeProvider("fallback", send_error=RuntimeError("fallback down"))
+        )
+
+        with pytest.raises(RuntimeError, match="fallback down"):
+            await manager.send_message_hedged("hi", Path("/tmp"), fallback_after=0)
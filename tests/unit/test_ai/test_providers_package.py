@@ -0,0 +1,38 @@
+"""Tests for lazy loading of provider implementations."""
+
+import importlib
+import sys
+
+import pytest
+
+
+class TestLazyProviderImports:
+    """Test providers are only imported when accessed."""
+
+    def test_package_import_does_not_load_providers(self):
+        """Test importing the package leaves provider modules unloaded."""
+        for module in [m for m in sys.modules if m.startswith("src.ai.providers")]:
+            sys.modules.pop(module)
+
+        providers = importlib.import_module("src.ai.providers")
+
+        assert "src.ai.providers.blackbox.provider" not in sys.modules
+        assert "BlackboxProvider" in providers.__all__
+
+    def test_attribute_access_loads_provider(self):
+        """Test accessing a provider class imports and caches it."""
+        providers = importlib.import_module("src.ai.providers")
+
+        provider_class = providers.BlackboxProvider
+
+        from src.ai.providers.blackbox.provider import BlackboxProvider
+
+        assert provider_class is BlackboxProvider
+        assert providers.__dict__["BlackboxProvider"] is BlackboxProvider
+
+    def test_unknown_attribute_raises(self):
+        """Test unknown names still raise AttributeError."""
+        providers = importlib.import_module("src.ai.providers")
+
+        with pytest.raises(AttributeError):
+            providers.NotAProvider
@@ -0,0 +1,81 @@
+"""Tests for AI provider request throttling."""
+
+import asyncio
+
+import pytest
+
+from src.ai.rate_limit import (
+    RATE_LIMIT_MAX_DELAY_SECONDS,
+    RequestThrottle,
+    retry_delay,
+)
+
+
+class TestRequestThrottle:
+    """Test concurrency and rate bounds."""
+
+    async def test_bounds_concurrent_requests(self):
+        """Test no more than max_concurrent blocks run at once."""
+        throttle = RequestThrottle(requests_per_minute=1000, max_concurrent=2)
+        running = 0
+        peak = 0
+
+        async def request():
+            nonlocal running, peak
+            async with throttle:
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(request() for _ in range(6)))
+
+        assert peak == 2
+
+    async def test_waits_for_tokens_when_rate_exhausted(self):
+        """Test requests beyond the bucket capacity are delayed."""
+        throttle = RequestThrottle(requests_per_minute=600)  # 10 per second
+        throttle._bucket.tokens = 0
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        async with throttle:
+            pass
+
+        assert loop.time() - start >= 0.05
+
+    async def test_cancelled_wait_releases_slot(self):
+        """Test a cancelled waiter does not leak its concurrency slot."""
+        throttle = RequestThrottle(requests_per_minute=60, max_concurrent=1)
+        throttle._bucket.tokens = 0
+
+        async def request():
+            async with throttle:
+                pass
+
+        task = asyncio.create_task(request())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert not throttle._semaphore.locked()
+
+
+class TestRetryDelay:
+    """Test rate limit retry delays."""
+
+    def test_uses_retry_after_header(self):
+        """Test the server's hint is honoured."""
+        assert retry_delay("1.5", attempt=2) == 1.5
+
+    @pytest.mark.parametrize("header", [None, "", "Wed, 21 Oct 2026 07:28:00 GMT"])
+    def test_falls_back_to_exponential_backoff(self, header):
+        """Test missing or unparsable hints back off exponentially."""
+        assert [retry_delay(header, attempt) for attempt in range(3)] == [1, 2, 4]
+
+    def test_excessive_retry_after_is_not_waited_out(self):
+        """Test a hint beyond the longest honoured wait gives up."""
+        limit = RATE_LIMIT_MAX_DELAY_SECONDS
+        assert retry_delay(str(limit), attempt=0) == limit
+        assert retry_delay("3600", attempt=0) is None
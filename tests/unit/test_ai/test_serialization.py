@@ -0,0 +1,44 @@
+"""Tests for provider JSON helpers."""
+
+import json
+
+import pytest
+
+from src.ai import serialization
+
+
+class TestSerialization:
+    """Test JSON encoding and decoding."""
+
+    def test_dumps_returns_compact_bytes(self):
+        """Test payloads are encoded as compact UTF-8 bytes."""
+        encoded = serialization.dumps({"a": 1, "b": [True, None]})
+
+        assert isinstance(encoded, bytes)
+        assert json.loads(encoded) == {"a": 1, "b": [True, None]}
+        assert b" " not in encoded
+
+    def test_dumps_keeps_non_ascii(self):
+        """Test non-ASCII text round-trips."""
+        encoded = serialization.dumps({"content": "čau 👋"})
+
+        assert serialization.loads(encoded) == {"content": "čau 👋"}
+
+    @pytest.mark.parametrize("data", [b'{"x": 1}', '{"x": 1}', memoryview(b'{"x": 1}')])
+    def test_loads_accepts_bytes_and_str(self, data):
+        """Test decoding from the buffer types providers receive."""
+        assert serialization.loads(data) == {"x": 1}
+
+    def test_loads_invalid_raises_json_decode_error(self):
+        """Test invalid documents raise the stdlib-compatible error."""
+        with pytest.raises(json.JSONDecodeError):
+            serialization.loads(b"{not json")
+
+    def test_stdlib_fallback(self, monkeypatch):
+        """Test helpers work when orjson is not installed."""
+        monkeypatch.setattr(serialization, "orjson", None)
+
+        encoded = serialization.dumps({"content": "čau"})
+
+        assert encoded == '{"content":"čau"}'.encode("utf-8")
+        assert serialization.loads(memoryview(encoded)) == {"content": "čau"}
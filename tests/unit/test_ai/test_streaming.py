@@ -0,0 +1,105 @@
+"""Tests for the streamed response parsers."""
+
+from unittest.mock import patch
+
+from src.ai import serialization
+from src.ai.streaming import (
+    iter_ndjson,
+    iter_ndjson_batches,
+    iter_sse_batches,
+    iter_sse_events,
+    parse_ndjson_lines,
+    parse_sse_events,
+)
+
+from .fakes import FakeStreamReader
+
+
+async def collect(agen) -> list:
+    return [item async for item in agen]
+
+
+class TestParseSseEvents:
+    """Test server-sent event parsing."""
+
+    def test_parses_complete_lines_only(self):
+        """Test a trailing partial line is left unconsumed."""
+        buffer = bytearray(b'data: {"a": 1}\r\n: ping\n\ndata: [DONE]\ndata: {"b"')
+
+        events, consumed = parse_sse_events(buffer)
+
+        assert events == [{"a": 1}]
+        assert buffer[consumed:] == b'data: {"b"'
+
+    def test_skips_malformed_payloads(self):
+        """Test invalid JSON does not abort parsing."""
+        events, _ = parse_sse_events(bytearray(b'data: {x\ndata: {"ok": true}\n'))
+
+        assert events == [{"ok": True}]
+
+    def test_framing_is_matched_without_decoding(self):
+        """Test only event payloads reach the parser, as undecoded bytes."""
+        buffer = bytearray(b'\n: ping\ndata: {"a": 1}\r\ndata: [DONE]\r\n')
+        seen = []
+        real_loads = serialization.loads
+
+        def loads(data):
+            seen.append(data)
+            return real_loads(data)
+
+        with patch.object(serialization, "loads", loads):
+            events, _ = parse_sse_events(buffer)
+
+        assert events == [{"a": 1}]
+        assert len(seen) == 1
+        assert isinstance(seen[0], memoryview)
+
+
+class TestParseNdjsonLines:
+    """Test newline-delimited JSON parsing."""
+
+    def test_parses_complete_lines_only(self):
+        """Test blank and partial lines are handled."""
+        buffer = bytearray(b'{"a": 1}\n\n{bad\n{"b": 2}\n{"c"')
+
+        objects, consumed = parse_ndjson_lines(buffer)
+
+        assert objects == [{"a": 1}, {"b": 2}]
+        assert buffer[consumed:] == b'{"c"'
+
+
+class TestIterators:
+    """Test parsing response bodies chunk by chunk."""
+
+    async def test_sse_events_split_across_chunks(self):
+        """Test events are reassembled regardless of chunk boundaries."""
+        body = b'data: {"n": 1}\n\ndata: {"n": 2}\n\n'
+        chunks = [body[i : i + 3] for i in range(0, len(body), 3)]
+
+        events = await collect(iter_sse_events(FakeStreamReader(chunks)))
+
+        assert events == [{"n": 1}, {"n": 2}]
+
+    async def test_ndjson_without_final_newline(self):
+        """Test the last object is parsed even without a line terminator."""
+        chunks = [b'{"n": 1}\n{"n"', b": 2}"]
+
+        objects = await collect(iter_ndjson(FakeStreamReader(chunks)))
+
+        assert objects == [{"n": 1}, {"n": 2}]
+
+    async def test_sse_batches_follow_chunks(self):
+        """Test events completed by the same chunk are batched together."""
+        chunks = [b'data: {"n": 1}\ndata: {"n": 2}\ndata: {"n"', b": 3}\n"]
+
+        batches = await collect(iter_sse_batches(FakeStreamReader(chunks)))
+
+        assert batches == [[{"n": 1}, {"n": 2}], [{"n": 3}]]
+
+    async def test_ndjson_batches_follow_chunks(self):
+        """Test objects completed by the same chunk are batched together."""
+        chunks = [b'{"n": 1}\n{"n": 2}\n{"n"', b": 3}\n"]
+
+        batches = await collect(iter_ndjson_batches(FakeStreamReader(chunks)))
+
+        assert batches == [[{"n": 1}, {"n": 2}], [{"n": 3}]]
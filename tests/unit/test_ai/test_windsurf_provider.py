@@ -0,0 +1,178 @@
+"""Tests for the Windsurf AI provider."""
+
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+
+import aiohttp
+import pytest
+
+from src.ai import serialization
+from src.ai.base_provider import ProviderStatus
+from src.ai.providers.windsurf.provider import (
+    WINDSURF_SIMULATION_NOTICE,
+    WindsurfProvider,
+)
+from src.ai.rate_limit import RequestThrottle
+
+from .fakes import FakeSession
+
+COMPLETION = {"completion": "print(1)"}
+
+
+@pytest.fixture
+def session():
+    """Fake HTTP session returning a fixed completion."""
+    return FakeSession(data=COMPLETION)
+
+
+@pytest.fixture
+def provider(session):
+    """Windsurf provider marked ready with a fake session attached."""
+    provider = WindsurfProvider(config=None)
+    provider._session = session
+    provider.status = ProviderStatus.READY
+    return provider
+
+
+class TestWindsurfResponses:
+    """Test completion handling."""
+
+    async def test_send_message_returns_completion(self, provider):
+        """Test the completion text becomes the response content."""
+        response = await provider.send_message("hi", Path("/tmp"))
+
+        assert response.content == "print(1)"
+        assert response.provider_name == "windsurf"
+        assert provider.status == ProviderStatus.READY
+        assert response.session_id == provider._default_session_id
+        assert response.session_id.startswith("windsurf_")
+
+    async def test_tokens_estimated_from_length(self, provider, session):
+        """Test token usage is estimated from the completion length."""
+        session.data = {"completion": "x = 1\n" * 100}
+
+        response = await provider.send_message("hi", Path("/tmp"))
+
+        assert response.tokens_used == 150
+
+    async def test_stream_yields_single_update(self, provider):
+        """Test streaming returns the whole completion as one update."""
+        updates = [u async for u in provider.stream_message("hi", Path("/tmp"))]
+
+        assert len(updates) == 1
+        assert updates[0].content_delta == "print(1)"
+        assert updates[0].is_complete
+
+    async def test_offline_request_is_simulated(self, provider, session):
+        """Test an unreachable API falls back to the simulated response."""
+        session.error = aiohttp.ClientError("offline")
+
+        response = await provider.send_message("x" * 500, Path("/tmp"))
+
+        assert f"'{'x' * 100}...'" in response.content
+        assert response.content.endswith(WINDSURF_SIMULATION_NOTICE)
+
+
+class TestWindsurfRequests:
+    """Test request construction."""
+
+    async def test_only_known_params_override_defaults(self, provider, session):
+        """Test request parameters override defaults without adding fields."""
+        await provider.send_message("hi", Path("/tmp"), language="go", unknown=1)
+
+        payload = serialization.loads(session.requests[0][1]["data"])
+        assert payload["language"] == "go"
+        assert payload["max_tokens"] == 2048
+        assert "unknown" not in payload
+
+    async def test_settings_read_from_config(self, session):
+        """Test the API key is read from the shared settings object."""
+        provider = WindsurfProvider(SimpleNamespace(codeium_api_key="cd-test"))
+        provider.use_http_session(session)
+
+        assert await provider.initialize() is True
+        assert provider._api_key == "cd-test"
+        assert not hasattr(provider, "_config")
+
+
+class TestWindsurfThrottle:
+    """Test client-side request throttling."""
+
+    async def test_requests_wait_for_rate_limit(self, provider, session):
+        """Test a request waits for a token instead of hitting the API."""
+        provider._throttle = RequestThrottle(requests_per_minute=600)
+        provider._throttle._bucket.tokens = 0  # 10 per second
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await provider.send_message("hi", Path("/tmp"))
+
+        assert loop.time() - start >= 0.09
+        assert len(session.requests) == 1
+
+
+class TestWindsurfResponseCache:
+    """Test caching of deterministic Windsurf requests."""
+
+    async def test_repeated_request_is_cached_across_sessions(self, provider, session):
+        """Test a temperature=0 repeat from another session skips the API."""
+        await provider.send_message("hi", Path("/tmp"), session_id="s1", temperature=0)
+        second = await provider.send_message(
+            "hi", Path("/tmp"), session_id="s2", temperature=0
+        )
+
+        assert len(session.requests) == 1
+        assert second.metadata["cache_hit"] is True
+        assert second.session_id == "s2"
+
+    async def test_simulated_responses_are_not_cached(self, provider, session):
+        """Test the offline fallback is not stored."""
+        session.error = aiohttp.ClientError("offline")
+        await provider.send_message("hi", Path("/tmp"), temperature=0)
+
+        session.error = None
+        response = await provider.send_message("hi", Path("/tmp"), temperature=0)
+
+        assert response.content == "print(1)"
+        assert len(session.requests) == 2
+
+
+class TestWindsurfCapabilities:
+    """Test Windsurf capability reporting."""
+
+    async def test_capabilities_are_cached(self, provider):
+        """Test repeated calls return the same capabilities object."""
+        first = await provider.get_capabilities()
+
+        assert await provider.get_capabilities() is first
+        assert first.name == "windsurf"
+
+
+class TestWindsurfHttpSession:
+    """Test sharing the manager's HTTP session."""
+
+    async def test_initialize_keeps_shared_session(self, session):
+        """Test a shared session is used with per-request auth headers."""
+        provider = WindsurfProvider(SimpleNamespace(codeium_api_key="cd-test"))
+        provider.use_http_session(session)
+
+        assert await provider.initialize() is True
+        await provider.send_message("hi", Path("/tmp"))
+
+        assert provider._session is session
+        headers = session.requests[0][1]["headers"]
+        assert headers["Authorization"] == "Bearer cd-test"
+
+        await provider.shutdown()
+        assert session.closed is False
+
+    async def test_initialize_creates_own_session(self):
+        """Test a private pooled session is created and closed on shutdown."""
+        provider = WindsurfProvider(SimpleNamespace(codeium_api_key="cd-test"))
+
+        assert await provider.initialize() is True
+        own_session = provider._session
+
+        await provider.shutdown()
+        assert own_session.closed is True
@@ -1,11 +1,13 @@
 """Comprehensive tests for the main bot orchestrator."""
 
 import asyncio
-from unittest.mock import AsyncMock, MagicMock, Mock, call, patch
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from unittest.mock import AsyncMock, Mock, call, patch
 
 import pytest
 from telegram import BotCommand, Update, User
-from telegram.ext import Application, CommandHandler, MessageHandler
 
 from src.bot.core import ClaudeCodeBot
 from src.config.settings import Settings
@@ -17,11 +19,61 @@ from src.exceptions import (
     SecurityError,
 )
 
+# Keep this module on one pytest-xdist worker (``-n auto --dist loadgroup``) so
+# its module- and class-scoped mocks are built once
+pytestmark = pytest.mark.xdist_group("bot_core")
+
+# Attribute lists for mock specs, computed once instead of per construction
+_SETTINGS_SPEC = dir(Settings)
+_UPDATE_SPEC = dir(Update)
+_USER_SPEC = dir(User)
+
+
+@lru_cache(maxsize=1)
+def _builder_spec():
+    """Return the ApplicationBuilder attribute list, importing it on first use."""
+    from telegram.ext import ApplicationBuilder
+
+    return dir(ApplicationBuilder)
+
+
+@dataclass(frozen=True)
+class _BotAccount:
+    """Read-only stand-in for the User returned by Bot.get_me()."""
+
+    username: str = "test_bot"
+    first_name: str = "Test Bot"
+    id: int = 987654321
+    can_join_groups: bool = True
+    can_read_all_group_messages: bool = True
+    supports_inline_queries: bool = False
+
+
+_BOT_ME = _BotAccount()
+
+# Commands the bot menu must always offer
+EXPECTED_COMMAND_NAMES = frozenset(
+    {
+        "start",
+        "help",
+        "new",
+        "continue",
+        "ls",
+        "cd",
+        "pwd",
+        "projects",
+        "status",
+        "export",
+        "actions",
+        "git",
+    }
+)
 
-@pytest.fixture
+
+@pytest.fixture(scope="module")
 def mock_settings():
-    """Create mock settings."""
-    settings = Mock(spec=Settings)
+    """Create mock settings shared by the module (reset per test by ``bot``)."""
+    settings = Mock(spec=_SETTINGS_SPEC)
     settings.telegram_token_str = "test_token_123"
     settings.webhook_url = None
     settings.webhook_port = 8443
@@ -29,9 +81,9 @@ def mock_settings():
     return settings
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_dependencies():
-    """Create mock dependencies."""
+    """Create mock dependencies shared by the module (reset per test by ``bot``)."""
     return {
         "storage": AsyncMock(),
         "security": AsyncMock(),
@@ -41,40 +93,100 @@ def mock_dependencies():
 
 @pytest.fixture
 def bot(mock_settings, mock_dependencies):
-    """Create bot instance."""
-    return ClaudeCodeBot(mock_settings, mock_dependencies)
+    """Create bot instance, resetting the shared settings and dependencies."""
+    mock_settings.reset_mock()
+    mock_settings.webhook_url = None
+    mock_settings.webhook_port = 8443
+    mock_settings.webhook_path = "/webhook"
+    for dependency in mock_dependencies.values():
+        dependency.reset_mock()
+    # The bot adds entries (e.g. "features"), so give it its own dict
+    return ClaudeCodeBot(mock_settings, dict(mock_dependencies))
+
+
+@pytest.fixture(scope="class")
+def error_bot(mock_settings, mock_dependencies):
+    """Create one bot per test class for tests that never mutate it."""
+    return ClaudeCodeBot(mock_settings, dict(mock_dependencies))
+
+
+@pytest.fixture(scope="class")
+async def set_my_commands(mock_settings, mock_dependencies):
+    """Run _set_bot_commands once per class and return the mocked API call."""
+    bot = ClaudeCodeBot(mock_settings, dict(mock_dependencies))
+    bot.app = Mock()
+    bot.app.bot = AsyncMock()
+    await bot._set_bot_commands()
+    return bot.app.bot.set_my_commands
+
+
+class _FakeApplication:
+    """Minimal stand-in for the Telegram Application used by ClaudeCodeBot."""
+
+    def __init__(self):
+        self.bot = AsyncMock()
+        self.updater = AsyncMock()
+        self.updater.running = True
+        self.add_handler = Mock()
+        self.add_error_handler = Mock()
+        self.initialize = AsyncMock()
+        self.start = AsyncMock()
+        self.stop = AsyncMock()
+        self.shutdown = AsyncMock()
+        self.run_webhook = AsyncMock()
 
 
 @pytest.fixture
 def mock_application():
     """Create mock Telegram application."""
-    app = AsyncMock(spec=Application)
-    app.bot = AsyncMock()
-    app.bot.set_my_commands = AsyncMock()
-    app.bot.get_me = AsyncMock()
-    app.updater = AsyncMock()
-    app.updater.running = True
-    app.add_handler = Mock()
-    app.add_error_handler = Mock()
-    return app
+    return _FakeApplication()
 
 
-@pytest.fixture
-def mock_update():
-    """Create mock Telegram update."""
-    update = Mock(spec=Update)
-    update.effective_user = Mock(spec=User)
+def _make_update():
+    """Build a mock Telegram update from a known user."""
+    update = Mock(spec=_UPDATE_SPEC)
+    update.effective_user = Mock(spec=_USER_SPEC)
     update.effective_user.id = 123456789
     update.effective_user.first_name = "TestUser"
-    update.effective_message = AsyncMock()
+    # Only reply_text is awaited, so the message itself can be a plain Mock
+    update.effective_message = Mock()
     update.effective_message.reply_text = AsyncMock()
     return update
 
 
+@pytest.fixture
+def mock_app_builder(mock_application):
+    """Create an Application builder whose chained setters return itself."""
+    builder = Mock(spec=_builder_spec())
+    for method in (
+        "token",
+        "connect_timeout",
+        "read_timeout",
+        "write_timeout",
+        "pool_timeout",
+    ):
+        getattr(builder, method).return_value = builder
+    builder.build.return_value = mock_application
+    return builder
+
+
+@pytest.fixture
+def mock_update():
+    """Create mock Telegram update."""
+    return _make_update()
+
+
+@pytest.fixture(scope="class")
+def error_update():
+    """Create one update per test class; reply_text is reset per test."""
+    return _make_update()
+
+
 @pytest.fixture
 def mock_context():
     """Create mock context."""
-    context = AsyncMock()
+    # Nothing on the context is awaited; a plain Mock avoids AsyncMock setup
+    context = Mock()
     context.bot_data = {}
     context.error = None
     return context
@@ -93,19 +205,10 @@ class TestBotInitialization:
         assert bot.is_running is False
         assert bot.feature_registry is None
 
-    @pytest.mark.asyncio
-    async def test_initialize_success(self, bot, mock_application):
+    async def test_initialize_success(self, bot, mock_application, mock_app_builder):
         """Test successful bot initialization."""
         with patch("src.bot.core.Application") as mock_app_class:
-            # Setup Application builder mock
-            mock_builder = MagicMock()
-            mock_app_class.builder.return_value = mock_builder
-            mock_builder.token.return_value = mock_builder
-            mock_builder.connect_timeout.return_value = mock_builder
-            mock_builder.read_timeout.return_value = mock_builder
-            mock_builder.write_timeout.return_value = mock_builder
-            mock_builder.pool_timeout.return_value = mock_builder
-            mock_builder.build.return_value = mock_application
+            mock_app_class.builder.return_value = mock_app_builder
 
             # Mock FeatureRegistry
             with patch("src.bot.core.FeatureRegistry") as mock_feature_registry:
@@ -115,11 +218,11 @@ class TestBotInitialization:
                 await bot.initialize()
 
                 # Verify Application was built correctly
-                mock_builder.token.assert_called_once_with("test_token_123")
-                mock_builder.connect_timeout.assert_called_once_with(30)
-                mock_builder.read_timeout.assert_called_once_with(30)
-                mock_builder.write_timeout.assert_called_once_with(30)
-                mock_builder.pool_timeout.assert_called_once_with(30)
+                mock_app_builder.token.assert_called_once_with("test_token_123")
+                mock_app_builder.connect_timeout.assert_called_once_with(30)
+                mock_app_builder.read_timeout.assert_called_once_with(30)
+                mock_app_builder.write_timeout.assert_called_once_with(30)
+                mock_app_builder.pool_timeout.assert_called_once_with(30)
 
                 # Verify app was set
                 assert bot.app == mock_application
@@ -135,95 +238,61 @@ class TestBotInitialization:
                 # Verify bot commands were set
                 mock_application.bot.set_my_commands.assert_called_once()
 
-    @pytest.mark.asyncio
-    async def test_set_bot_commands(self, bot, mock_application):
+    def test_set_bot_commands(self, set_my_commands):
         """Test bot commands are set correctly."""
-        bot.app = mock_application
-
-        await bot._set_bot_commands()
-
         # Verify set_my_commands was called
-        mock_application.bot.set_my_commands.assert_called_once()
+        set_my_commands.assert_called_once()
 
         # Verify commands list
-        commands_arg = mock_application.bot.set_my_commands.call_args[0][0]
+        commands_arg = set_my_commands.call_args[0][0]
         assert isinstance(commands_arg, list)
         assert len(commands_arg) > 0
 
-        # Check specific commands
-        command_names = [cmd.command for cmd in commands_arg]
-        assert "start" in command_names
-        assert "help" in command_names
-        assert "new" in command_names
-        assert "continue" in command_names
-        assert "ls" in command_names
-        assert "cd" in command_names
-        assert "pwd" in command_names
-        assert "projects" in command_names
-        assert "status" in command_names
-        assert "export" in command_names
-        assert "actions" in command_names
-        assert "git" in command_names
-
         # Verify they are BotCommand instances
         for cmd in commands_arg:
             assert isinstance(cmd, BotCommand)
             assert cmd.command
             assert cmd.description
 
+    @pytest.mark.parametrize("name", sorted(EXPECTED_COMMAND_NAMES))
+    def test_command_present(self, set_my_commands, name):
+        """Test each expected command is in the bot menu."""
+        commands_arg = set_my_commands.call_args[0][0]
+        assert name in {cmd.command for cmd in commands_arg}
+
 
 class TestHandlerRegistration:
     """Test handler registration."""
 
-    @pytest.mark.asyncio
     async def test_register_handlers(self, bot, mock_application):
         """Test all handlers are registered."""
+        from telegram.ext import CommandHandler, MessageHandler
+
         bot.app = mock_application
 
-        with patch("src.bot.handlers.command") as mock_command:
-            with patch("src.bot.handlers.message") as mock_message:
-                with patch("src.bot.handlers.callback") as mock_callback:
-                    # Mock handler functions
-                    mock_command.start_command = AsyncMock()
-                    mock_command.help_command = AsyncMock()
-                    mock_command.new_session = AsyncMock()
-                    mock_command.continue_session = AsyncMock()
-                    mock_command.end_session = AsyncMock()
-                    mock_command.list_files = AsyncMock()
-                    mock_command.change_directory = AsyncMock()
-                    mock_command.print_working_directory = AsyncMock()
-                    mock_command.show_projects = AsyncMock()
-                    mock_command.session_status = AsyncMock()
-                    mock_command.export_session = AsyncMock()
-                    mock_command.quick_actions = AsyncMock()
-                    mock_command.git_command = AsyncMock()
-                    mock_message.handle_text_message = AsyncMock()
-                    mock_message.handle_document = AsyncMock()
-                    mock_message.handle_photo = AsyncMock()
-                    mock_callback.handle_callback_query = AsyncMock()
-
-                    bot._register_handlers()
-
-                    # Verify handlers were added
-                    assert mock_application.add_handler.call_count >= 16
-
-                    # Verify CommandHandler was used for commands
-                    command_handler_calls = [
-                        call
-                        for call in mock_application.add_handler.call_args_list
-                        if isinstance(call[0][0], CommandHandler)
-                    ]
-                    assert len(command_handler_calls) == 13  # 13 command handlers
+        # AsyncMock modules hand out AsyncMock attributes, so every handler
+        # function is awaitable without being assigned one by one
+        with (
+            patch("src.bot.handlers.command", new_callable=AsyncMock),
+            patch("src.bot.handlers.message", new_callable=AsyncMock),
+            patch("src.bot.handlers.callback", new_callable=AsyncMock),
+        ):
+            bot._register_handlers()
 
-                    # Verify MessageHandler was used for messages
-                    message_handler_calls = [
-                        call
-                        for call in mock_application.add_handler.call_args_list
-                        if isinstance(call[0][0], MessageHandler)
-                    ]
-                    assert len(message_handler_calls) >= 3  # text, document, photo
+            # Verify handlers were added
+            assert mock_application.add_handler.call_count >= 16
+
+            # Count registered handler types in a single pass
+            handler_counts = Counter(
+                type(call[0][0]) for call in mock_application.add_handler.call_args_list
+            )
+
+            # Verify CommandHandler was used for commands
+            assert handler_counts[CommandHandler] == 13  # 13 command handlers
+
+            # Verify MessageHandler was used for messages
+            assert handler_counts[MessageHandler] >= 3  # text, document, photo
 
-    @pytest.mark.asyncio
     async def test_inject_deps(self, bot, mock_update, mock_context):
         """Test dependency injection wrapper."""
         # Create a simple handler
@@ -238,8 +307,7 @@ class TestHandlerRegistration:
         # Verify dependencies were injected
         assert "settings" in mock_context.bot_data
         assert mock_context.bot_data["settings"] == bot.settings
-        for key, value in bot.deps.items():
-            assert mock_context.bot_data[key] == value
+        assert bot.deps.items() <= mock_context.bot_data.items()
 
         # Verify original handler was called
         mock_handler.assert_called_once_with(mock_update, mock_context)
@@ -249,7 +317,6 @@ class TestHandlerRegistration:
 class TestMiddleware:
     """Test middleware functionality."""
 
-    @pytest.mark.asyncio
     async def test_add_middleware(self, bot, mock_application):
         """Test middleware is added correctly."""
         bot.app = mock_application
@@ -278,7 +345,6 @@ class TestMiddleware:
                     assert -2 in groups  # auth
                     assert -1 in groups  # rate_limit
 
-    @pytest.mark.asyncio
     async def test_create_middleware_handler(self, bot, mock_update, mock_context):
         """Test middleware handler wrapper."""
         # Create a mock middleware function
@@ -292,8 +358,7 @@ class TestMiddleware:
 
         # Verify dependencies were injected
         assert mock_context.bot_data["settings"] == bot.settings
-        for key, value in bot.deps.items():
-            assert mock_context.bot_data[key] == value
+        assert bot.deps.items() <= mock_context.bot_data.items()
 
         # Verify middleware was called
         mock_middleware.assert_called_once()
@@ -306,7 +371,6 @@ class TestMiddleware:
 class TestBotLifecycle:
     """Test bot start and stop lifecycle."""
 
-    @pytest.mark.asyncio
     async def test_start_polling_mode(self, bot, mock_application):
         """Test starting bot in polling mode."""
         bot.settings.webhook_url = None
@@ -314,23 +378,23 @@ class TestBotLifecycle:
         async def mock_initialize():
             bot.app = mock_application
 
-        async def mock_sleep(seconds):
-            # Stop the bot immediately without actually sleeping
+        async def mock_start_polling(**kwargs):
+            # Stop the bot before it enters the keep-alive sleep loop
             bot.is_running = False
 
+        mock_application.updater.start_polling.side_effect = mock_start_polling
+
         with patch.object(bot, "initialize", side_effect=mock_initialize) as mock_init:
-            with patch("asyncio.sleep", side_effect=mock_sleep):
-                await bot.start()
+            await bot.start()
 
-                # Verify initialization was called
-                mock_init.assert_called_once()
+            # Verify initialization was called
+            mock_init.assert_called_once()
 
-                # Verify polling was started
-                mock_application.initialize.assert_called_once()
-                mock_application.start.assert_called_once()
-                mock_application.updater.start_polling.assert_called_once()
+            # Verify polling was started
+            mock_application.initialize.assert_called_once()
+            mock_application.start.assert_called_once()
+            mock_application.updater.start_polling.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_start_webhook_mode(self, bot, mock_application):
         """Test starting bot in webhook mode."""
         bot.settings.webhook_url = "https://example.com/webhook"
@@ -358,35 +422,48 @@ class TestBotLifecycle:
             assert call_kwargs["webhook_url"] == "https://example.com/webhook"
             assert call_kwargs["drop_pending_updates"] is True
 
-    @pytest.mark.asyncio
-    async def test_start_already_running(self, bot):
-        """Test starting bot when already running."""
-        bot.is_running = True
+    @pytest.mark.parametrize(
+        "method, is_running",
+        [("start", True), ("stop", False)],
+        ids=["start_already_running", "stop_not_running"],
+    )
+    async def test_lifecycle_noop(self, bot, mock_application, method, is_running):
+        """Test start/stop return early when the bot is already in that state."""
+        bot.app = mock_application
+        bot.is_running = is_running
 
         with patch.object(bot, "initialize") as mock_init:
-            await bot.start()
+            await getattr(bot, method)()
 
-            # Verify initialization was not called
+            # Verify nothing was initialized, started or stopped
             mock_init.assert_not_called()
-
-    @pytest.mark.asyncio
-    async def test_start_with_error(self, bot, mock_application):
-        """Test bot start with initialization error."""
-
-        # Initialize happens before try block, so error in app.start() is what gets wrapped
+            mock_application.start.assert_not_called()
+            mock_application.stop.assert_not_called()
+            assert bot.is_running is is_running
+
+    @pytest.mark.parametrize(
+        "method, message",
+        [("start", "Failed to start bot"), ("stop", "Failed to stop bot")],
+    )
+    async def test_lifecycle_error(self, bot, mock_application, method, message):
+        """Test start/stop wrap application errors."""
+
+        # Initialize happens before the try block in start(), so the error
+        # raised by app.start()/app.stop() is what gets wrapped
         async def mock_initialize():
             bot.app = mock_application
 
-        mock_application.start.side_effect = Exception("Start failed")
+        bot.app = mock_application
+        bot.is_running = method == "stop"
+        getattr(mock_application, method).side_effect = Exception("boom")
 
         with patch.object(bot, "initialize", side_effect=mock_initialize):
             with pytest.raises(ClaudeCodeTelegramError) as exc_info:
-                await bot.start()
+                await getattr(bot, method)()
 
-            assert "Failed to start bot" in str(exc_info.value)
+            assert message in str(exc_info.value)
             assert bot.is_running is False
 
-    @pytest.mark.asyncio
     async def test_stop_success(self, bot, mock_application):
         """Test graceful bot shutdown."""
         bot.app = mock_application
@@ -403,28 +480,6 @@ class TestBotLifecycle:
         mock_application.shutdown.assert_called_once()
         assert bot.is_running is False
 
-    @pytest.mark.asyncio
-    async def test_stop_not_running(self, bot):
-        """Test stopping bot when not running."""
-        bot.is_running = False
-
-        await bot.stop()
-
-        # Should return without error
-
-    @pytest.mark.asyncio
-    async def test_stop_with_error(self, bot, mock_application):
-        """Test bot stop with error."""
-        bot.app = mock_application
-        bot.is_running = True
-        mock_application.stop.side_effect = Exception("Stop failed")
-
-        with pytest.raises(ClaudeCodeTelegramError) as exc_info:
-            await bot.stop()
-
-        assert "Failed to stop bot" in str(exc_info.value)
-
-    @pytest.mark.asyncio
     async def test_stop_without_updater_running(self, bot, mock_application):
         """Test stopping bot when updater is not running."""
         bot.app = mock_application
@@ -441,104 +496,59 @@ class TestBotLifecycle:
 class TestErrorHandler:
     """Test global error handler."""
 
-    @pytest.mark.asyncio
-    async def test_error_handler_authentication_error(
-        self, bot, mock_update, mock_context
+    @pytest.fixture(autouse=True)
+    def reset_error_update(self, error_update):
+        """Clear reply_text calls and side effects left by the previous test."""
+        error_update.effective_message.reply_text.reset_mock(side_effect=True)
+
+    @pytest.mark.parametrize(
+        "error, expected_text, expected_emoji",
+        [
+            (AuthenticationError("Auth failed"), "Authentication required", "🔒"),
+            (SecurityError("Security violation"), "Security violation", "🛡️"),
+            (RateLimitExceeded("Too many requests"), "Rate limit exceeded", "⏱️"),
+            (ConfigurationError("Bad config"), "Configuration error", "⚙️"),
+            (asyncio.TimeoutError(), "timed out", "⏰"),
+            (ValueError("Unknown error"), "unexpected error", "❌"),
+        ],
+        ids=["auth", "security", "rate_limit", "config", "timeout", "unknown"],
+    )
+    async def test_error_handler_user_message(
+        self,
+        error_bot,
+        error_update,
+        mock_context,
+        error,
+        expected_text,
+        expected_emoji,
     ):
-        """Test error handler with AuthenticationError."""
-        mock_context.error = AuthenticationError("Auth failed")
-
-        await bot._error_handler(mock_update, mock_context)
-
-        # Verify user was notified
-        mock_update.effective_message.reply_text.assert_called_once()
-        message = mock_update.effective_message.reply_text.call_args[0][0]
-        assert "Authentication required" in message
-        assert "🔒" in message
-
-    @pytest.mark.asyncio
-    async def test_error_handler_security_error(self, bot, mock_update, mock_context):
-        """Test error handler with SecurityError."""
-        mock_context.error = SecurityError("Security violation")
+        """Test error handler replies with the message for each error type."""
+        mock_context.error = error
 
-        await bot._error_handler(mock_update, mock_context)
+        await error_bot._error_handler(error_update, mock_context)
 
         # Verify user was notified
-        mock_update.effective_message.reply_text.assert_called_once()
-        message = mock_update.effective_message.reply_text.call_args[0][0]
-        assert "Security violation" in message
-        assert "🛡️" in message
+        error_update.effective_message.reply_text.assert_called_once()
+        message = error_update.effective_message.reply_text.call_args[0][0]
+        assert expected_text in message
+        assert expected_emoji in message
 
-    @pytest.mark.asyncio
-    async def test_error_handler_rate_limit_error(self, bot, mock_update, mock_context):
-        """Test error handler with RateLimitExceeded."""
-        mock_context.error = RateLimitExceeded("Too many requests")
-
-        await bot._error_handler(mock_update, mock_context)
-
-        # Verify user was notified
-        mock_update.effective_message.reply_text.assert_called_once()
-        message = mock_update.effective_message.reply_text.call_args[0][0]
-        assert "Rate limit exceeded" in message
-        assert "⏱️" in message
-
-    @pytest.mark.asyncio
-    async def test_error_handler_config_error(self, bot, mock_update, mock_context):
-        """Test error handler with ConfigurationError."""
-        mock_context.error = ConfigurationError("Bad config")
-
-        await bot._error_handler(mock_update, mock_context)
-
-        # Verify user was notified
-        mock_update.effective_message.reply_text.assert_called_once()
-        message = mock_update.effective_message.reply_text.call_args[0][0]
-        assert "Configuration error" in message
-        assert "⚙️" in message
-
-    @pytest.mark.asyncio
-    async def test_error_handler_timeout_error(self, bot, mock_update, mock_context):
-        """Test error handler with TimeoutError."""
-        mock_context.error = asyncio.TimeoutError()
-
-        await bot._error_handler(mock_update, mock_context)
-
-        # Verify user was notified
-        mock_update.effective_message.reply_text.assert_called_once()
-        message = mock_update.effective_message.reply_text.call_args[0][0]
-        assert "timed out" in message
-        assert "⏰" in message
-
-    @pytest.mark.asyncio
-    async def test_error_handler_unknown_error(self, bot, mock_update, mock_context):
-        """Test error handler with unknown error type."""
-        mock_context.error = ValueError("Unknown error")
-
-        await bot._error_handler(mock_update, mock_context)
-
-        # Verify generic error message
-        mock_update.effective_message.reply_text.assert_called_once()
-        message = mock_update.effective_message.reply_text.call_args[0][0]
-        assert "unexpected error" in message
-        assert "❌" in message
-
-    @pytest.mark.asyncio
-    async def test_error_handler_no_update(self, bot, mock_context):
+    async def test_error_handler_no_update(self, error_bot, mock_context):
         """Test error handler with no update."""
         mock_context.error = Exception("Error")
 
         # Should not raise exception
-        await bot._error_handler(None, mock_context)
+        await error_bot._error_handler(None, mock_context)
 
-    @pytest.mark.asyncio
     async def test_error_handler_with_audit_logger(
-        self, bot, mock_update, mock_context
+        self, error_bot, error_update, mock_context
     ):
         """Test error handler logs to audit system."""
         mock_audit_logger = AsyncMock()
         mock_context.bot_data["audit_logger"] = mock_audit_logger
         mock_context.error = SecurityError("Security issue")
 
-        await bot._error_handler(mock_update, mock_context)
+        await error_bot._error_handler(error_update, mock_context)
 
         # Verify audit log was created
         mock_audit_logger.log_security_violation.assert_called_once()
@@ -547,9 +557,8 @@ class TestErrorHandler:
         assert call_kwargs["violation_type"] == "system_error"
         assert "SecurityError" in call_kwargs["details"]
 
-    @pytest.mark.asyncio
     async def test_error_handler_audit_logging_fails(
-        self, bot, mock_update, mock_context
+        self, error_bot, error_update, mock_context
     ):
         """Test error handler when audit logging fails."""
         mock_audit_logger = AsyncMock()
@@ -558,96 +567,66 @@ class TestErrorHandler:
         mock_context.error = SecurityError("Security issue")
 
         # Should not raise exception
-        await bot._error_handler(mock_update, mock_context)
+        await error_bot._error_handler(error_update, mock_context)
 
-    @pytest.mark.asyncio
-    async def test_error_handler_reply_fails(self, bot, mock_update, mock_context):
+    async def test_error_handler_reply_fails(
+        self, error_bot, error_update, mock_context
+    ):
         """Test error handler when replying to user fails."""
         mock_context.error = Exception("Test error")
-        mock_update.effective_message.reply_text.side_effect = Exception("Reply failed")
+        error_update.effective_message.reply_text.side_effect = Exception(
+            "Reply failed"
+        )
 
         # Should not raise exception
-        await bot._error_handler(mock_update, mock_context)
+        await error_bot._error_handler(error_update, mock_context)
 
 
 class TestBotInfo:
     """Test bot information and health check."""
 
-    @pytest.mark.asyncio
     async def test_get_bot_info_not_initialized(self, bot):
         """Test get_bot_info when bot not initialized."""
         info = await bot.get_bot_info()
 
         assert info["status"] == "not_initialized"
 
-    @pytest.mark.asyncio
-    async def test_get_bot_info_initialized(self, bot, mock_application):
-        """Test get_bot_info when bot is initialized."""
+    @pytest.mark.parametrize(
+        "is_running, webhook_url, expected_status, expected_port",
+        [
+            (False, None, "initialized", None),
+            (True, None, "running", None),
+            (False, "https://example.com/webhook", "initialized", 8443),
+        ],
+        ids=["initialized", "running", "webhook"],
+    )
+    async def test_get_bot_info(
+        self,
+        bot,
+        mock_application,
+        is_running,
+        webhook_url,
+        expected_status,
+        expected_port,
+    ):
+        """Test get_bot_info across run states and webhook configuration."""
         bot.app = mock_application
-        bot.is_running = False
-
-        # Mock bot.get_me() response
-        mock_me = Mock()
-        mock_me.username = "test_bot"
-        mock_me.first_name = "Test Bot"
-        mock_me.id = 987654321
-        mock_me.can_join_groups = True
-        mock_me.can_read_all_group_messages = True
-        mock_me.supports_inline_queries = False
-        mock_application.bot.get_me.return_value = mock_me
+        bot.is_running = is_running
+        bot.settings.webhook_url = webhook_url
+        mock_application.bot.get_me.return_value = _BOT_ME
 
         info = await bot.get_bot_info()
 
-        assert info["status"] == "initialized"
+        assert info["status"] == expected_status
         assert info["username"] == "test_bot"
         assert info["first_name"] == "Test Bot"
         assert info["id"] == 987654321
         assert info["can_join_groups"] is True
         assert info["can_read_all_group_messages"] is True
         assert info["supports_inline_queries"] is False
-        assert info["webhook_url"] is None
-
-    @pytest.mark.asyncio
-    async def test_get_bot_info_running(self, bot, mock_application):
-        """Test get_bot_info when bot is running."""
-        bot.app = mock_application
-        bot.is_running = True
-
-        mock_me = Mock()
-        mock_me.username = "test_bot"
-        mock_me.first_name = "Test Bot"
-        mock_me.id = 987654321
-        mock_me.can_join_groups = True
-        mock_me.can_read_all_group_messages = True
-        mock_me.supports_inline_queries = False
-        mock_application.bot.get_me.return_value = mock_me
-
-        info = await bot.get_bot_info()
-
-        assert info["status"] == "running"
-
-    @pytest.mark.asyncio
-    async def test_get_bot_info_with_webhook(self, bot, mock_application):
-        """Test get_bot_info with webhook configuration."""
-        bot.app = mock_application
-        bot.settings.webhook_url = "https://example.com/webhook"
-        bot.settings.webhook_port = 8443
-
-        mock_me = Mock()
-        mock_me.username = "test_bot"
-        mock_me.first_name = "Test Bot"
-        mock_me.id = 987654321
-        mock_me.can_join_groups = True
-        mock_me.can_read_all_group_messages = True
-        mock_me.supports_inline_queries = False
-        mock_application.bot.get_me.return_value = mock_me
-
-        info = await bot.get_bot_info()
-
-        assert info["webhook_url"] == "https://example.com/webhook"
-        assert info["webhook_port"] == 8443
+        assert info["webhook_url"] == webhook_url
+        assert info["webhook_port"] == expected_port
 
-    @pytest.mark.asyncio
     async def test_get_bot_info_error(self, bot, mock_application):
         """Test get_bot_info when API call fails."""
         bot.app = mock_application
@@ -658,7 +637,6 @@ class TestBotInfo:
         assert info["status"] == "error"
         assert "error" in info
 
-    @pytest.mark.asyncio
     async def test_health_check_success(self, bot, mock_application):
         """Test successful health check."""
         bot.app = mock_application
@@ -669,7 +647,6 @@ class TestBotInfo:
         assert result is True
         mock_application.bot.get_me.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_health_check_no_app(self, bot):
         """Test health check when app not initialized."""
         bot.app = None
@@ -678,7 +655,6 @@ class TestBotInfo:
 
         assert result is False
 
-    @pytest.mark.asyncio
     async def test_health_check_failure(self, bot, mock_application):
         """Test health check failure."""
         bot.app = mock_application
@@ -692,24 +668,12 @@ class TestBotInfo:
 class TestEdgeCases:
     """Test edge cases and integration scenarios."""
 
-    @pytest.mark.asyncio
-    async def test_full_initialization_sequence(self, bot):
+    async def test_full_initialization_sequence(
+        self, bot, mock_application, mock_app_builder
+    ):
         """Test complete initialization sequence."""
         with patch("src.bot.core.Application") as mock_app_class:
-            mock_builder = MagicMock()
-            mock_app = AsyncMock()
-            mock_app.bot = AsyncMock()
-            mock_app.bot.set_my_commands = AsyncMock()
-            mock_app.add_handler = Mock()
-            mock_app.add_error_handler = Mock()
-
-            mock_app_class.builder.return_value = mock_builder
-            mock_builder.token.return_value = mock_builder
-            mock_builder.connect_timeout.return_value = mock_builder
-            mock_builder.read_timeout.return_value = mock_builder
-            mock_builder.write_timeout.return_value = mock_builder
-            mock_builder.pool_timeout.return_value = mock_builder
-            mock_builder.build.return_value = mock_app
+            mock_app_class.builder.return_value = mock_app_builder
 
             with patch("src.bot.core.FeatureRegistry"):
                 await bot.initialize()
@@ -720,11 +684,10 @@ class TestEdgeCases:
                 assert "features" in bot.deps
 
                 # Verify all setup methods were called
-                mock_app.bot.set_my_commands.assert_called_once()
-                assert mock_app.add_handler.called
-                assert mock_app.add_error_handler.called
+                mock_application.bot.set_my_commands.assert_called_once()
+                assert mock_application.add_handler.called
+                assert mock_application.add_error_handler.called
 
-    @pytest.mark.asyncio
     async def test_dependency_injection_preserves_order(self, bot):
         """Test that dependency injection doesn't lose dependencies."""
         bot.deps["custom_dep"] = "custom_value"
@@ -740,11 +703,13 @@ class TestEdgeCases:
         await wrapped(mock_update, mock_context)
 
         # Verify all dependencies are present
-        assert mock_context.bot_data["custom_dep"] == "custom_value"
-        assert mock_context.bot_data["another_dep"] == 12345
-        assert mock_context.bot_data["settings"] == bot.settings
+        expected = {
+            "custom_dep": "custom_value",
+            "another_dep": 12345,
+            "settings": bot.settings,
+        }
+        assert expected.items() <= mock_context.bot_data.items()
 
-    @pytest.mark.asyncio
     async def test_multiple_start_stop_cycles(self, bot, mock_application):
         """Test multiple start/stop cycles."""
         bot.app = mock_application